@@ -0,0 +1,105 @@
+'''
+    Benchmark of the checkpoint writers: for every compression, how long the training thread is blocked by a
+    checkpoint, how long it takes until the checkpoint is on disk and how big it is.
+
+    The population is made of stand-in genomes with the same genes as the genomes of neat-python, run it with:
+    python -m neat_python_utility.example.benchmark_checkpoints
+'''
+
+
+# Models
+from neat_python_utility.neat_utility.checkpointer import AtomicCheckpointer, BackgroundCheckpointer
+
+# Utils
+from types import SimpleNamespace
+from os.path import join, getsize
+import tempfile
+import argparse
+import random
+import time
+
+
+def create_population(number_genomes, number_nodes, number_connections, seed=0):
+    random_generator = random.Random(seed)
+    population = {}
+    for genome_id in range(number_genomes):
+        nodes = {
+            node_id: SimpleNamespace(key=node_id, bias=random_generator.gauss(0.0, 1.0),
+                                     response=random_generator.gauss(1.0, 0.1), activation="sigmoid",
+                                     aggregation="sum")
+            for node_id in range(number_nodes)
+        }
+        connections = {}
+        while len(connections) < number_connections:
+            key = (random_generator.randrange(-8, number_nodes), random_generator.randrange(number_nodes))
+            connections[key] = SimpleNamespace(key=key, weight=random_generator.gauss(0.0, 1.0),
+                                               enabled=random_generator.random() < 0.9)
+        population[genome_id] = SimpleNamespace(key=genome_id, fitness=random_generator.random(), nodes=nodes,
+                                                connections=connections)
+
+    return population
+
+
+def benchmark(checkpointer, population, number_checkpoints):
+    # Returns the mean time the caller is blocked and the mean time until the checkpoint is written, in seconds.
+    # The previous checkpoint is always written when the next one is saved, like when a generation takes longer to
+    # evaluate than a checkpoint to write
+    blocked_time = 0.0
+    written_time = 0.0
+    for generation in range(number_checkpoints):
+        start = time.perf_counter()
+        checkpointer.save_checkpoint(config=None, population=population, species_set=None, generation=generation)
+        blocked_time += time.perf_counter() - start
+
+        if isinstance(checkpointer, BackgroundCheckpointer):
+            checkpointer.flush()
+        written_time += time.perf_counter() - start
+
+    if isinstance(checkpointer, BackgroundCheckpointer):
+        checkpointer.close()
+
+    return blocked_time / number_checkpoints, written_time / number_checkpoints
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint writers benchmark")
+    parser.add_argument("--genomes", type=int, default=300)
+    parser.add_argument("--nodes", type=int, default=40)
+    parser.add_argument("--connections", type=int, default=400)
+    parser.add_argument("--checkpoints", type=int, default=3)
+    arguments = parser.parse_args()
+
+    population = create_population(number_genomes=arguments.genomes, number_nodes=arguments.nodes,
+                                   number_connections=arguments.connections)
+    print("{} genomes, {} nodes and {} connections each\n".format(arguments.genomes, arguments.nodes,
+                                                                 arguments.connections))
+    print("{:<12}{:<14}{:>14}{:>14}{:>12}".format("Writer", "Compression", "Blocked (ms)", "Written (ms)",
+                                                  "Size (KB)"))
+
+    compressions = [
+        (AtomicCheckpointer.COMPRESSION_NONE, None), (AtomicCheckpointer.COMPRESSION_GZIP, 1),
+        (AtomicCheckpointer.COMPRESSION_GZIP, 5), (AtomicCheckpointer.COMPRESSION_GZIP, 9),
+        (AtomicCheckpointer.COMPRESSION_ZLIB, 6), (AtomicCheckpointer.COMPRESSION_LZMA, 1),
+        (AtomicCheckpointer.COMPRESSION_LZMA, 6),
+    ]
+    writers = [("sync", AtomicCheckpointer, {}), ("process", BackgroundCheckpointer, {"use_processes": True}),
+               ("thread", BackgroundCheckpointer, {"use_processes": False})]
+    for compression, compression_level in compressions:
+        for writer_name, checkpointer_class, options in writers:
+            with tempfile.TemporaryDirectory() as directory:
+                checkpointer = checkpointer_class(
+                    1, filename_prefix=join(directory, "neat-checkpoint-"), compression=compression,
+                    compression_level=compression_level, **options
+                )
+                blocked_time, written_time = benchmark(checkpointer=checkpointer, population=population,
+                                                       number_checkpoints=arguments.checkpoints)
+                size = getsize(join(directory, "neat-checkpoint-0"))
+
+            print("{:<12}{:<14}{:>14.1f}{:>14.1f}{:>12.0f}".format(
+                writer_name, compression + ("" if compression_level is None else " {}".format(compression_level)),
+                blocked_time * 1000, written_time * 1000, size / 1024
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,10 @@
 # Models
-from neat_python_utility.example.simulation.xor_simulation import XorGateGame
+from neat_python_utility.example.simulation.xor_simulation import XorGateGame, xor_fitness
 from neat_python_utility.example.simulation.xor_agent import XorAgent
 
 # AI
 import neat
-from neat_python_utility.neat_utility import NeatSetup
+from neat_python_utility.neat_utility import NeatSetup, RenderPolicy, GenomeAgent
 
 # utils
 from os.path import dirname, join
@@ -70,7 +70,7 @@ if __name__ == '__main__':
             pass it down.
             
         - simulation: Basically, the famous eval_genomes function. This is the function that starts the simulation.
-            It must receive a 'genomes' and 'config' parameters, respectively.
+            It must receive a 'genomes' and 'config' parameters, respectively. Only the serial evaluation mode uses it
     '''
     # EASY TO PICK UP PARAMETERS
 
@@ -89,6 +89,44 @@ if __name__ == '__main__':
 
     # Provide the equivalent of eval_genomes(genomes, config) function
     simulation = game.simulation        # Go to simulation/xor_simulation.py to check how to setup the simulation for the problem
+    # simulation = game.vectorized_simulation     # Evaluates the whole generation at once with NumPy
+
+    '''
+        Instead of a simulation, each genome can be evaluated on its own by a fitness function in parallel:
+        - evaluation_mode: NeatSetup.EVALUATION_MODE_SERIAL (default) runs the simulation.
+            NeatSetup.EVALUATION_MODE_PROCESSES evaluates the genomes with the fitness function in worker processes.
+            NeatSetup.EVALUATION_MODE_THREADS splits the genomes between threads, each one with its own simulation.
+            NeatSetup.EVALUATION_MODE_ASYNCIO awaits an 'async def' fitness function for many genomes at once.
+            NeatSetup.EVALUATION_MODE_DISTRIBUTED sends the genomes to workers on other hosts. Start them with
+            run_worker(address=coordinator_address, fitness_function=xor_fitness, config=config)
+        - fitness_function: fitness_function(genome, config) that returns the fitness of a genome
+        - simulation_factory: Function that creates a new simulation, every thread calls it once
+        - number_workers: Number of workers, pass down 'None' to use one per CPU.
+            In the asyncio mode, it is the maximum number of genomes evaluated at the same time (100 if 'None')
+        - coordinator_address: (host, port) where the distributed mode listens for workers
+        - genomes_per_task, tasks_per_worker: the distributed mode sends genomes_per_task genomes at once to a
+            worker, and a worker has at most tasks_per_worker of them at the same time
+        - heartbeat_timeout: Seconds without news after which a worker is considered dead, its genomes go to
+            the other workers
+        - no_worker_timeout: Seconds a generation waits while no worker is connected before the run stops with a
+            TimeoutError, pass down 'None' to wait forever
+        - evaluation_timeout: Seconds a generation may take in the distributed mode, 'None' for no limit
+    '''
+    evaluation_mode = NeatSetup.EVALUATION_MODE_SERIAL
+    # evaluation_mode = NeatSetup.EVALUATION_MODE_PROCESSES      # Go to simulation/xor_simulation.py to check xor_fitness
+    # evaluation_mode = NeatSetup.EVALUATION_MODE_THREADS
+    # evaluation_mode = NeatSetup.EVALUATION_MODE_DISTRIBUTED
+    # The processes, asyncio and distributed modes only return the genome of the fittest agent, switch the
+    # logging_function below to GenomeAgent.log_stats with them
+    fitness_function = xor_fitness
+    simulation_factory = lambda: XorGateGame().simulation
+    number_workers = None
+    coordinator_address = ("0.0.0.0", 5555)
+    genomes_per_task = 8
+    tasks_per_worker = 2
+    heartbeat_timeout = 10.0
+    no_worker_timeout = 60.0
+    evaluation_timeout = None
 
     '''
         These parameters may be confusing, here is some help:
@@ -101,9 +139,34 @@ if __name__ == '__main__':
             
             To check more information on how to set up your own Agent Datatype,
             go to simulation/xor_agent.py as an example
+
+            The processes, asyncio and distributed modes pass down a GenomeAgent instead, which only has the genome.
+            Use GenomeAgent.log_stats (or 'None') or a function that only reads agent.genome with them
     '''
     # CONFUSING PARAMETERS
-    logging_function = XorAgent.log_stats
+    logging_function = XorAgent.log_stats       # The serial and threads modes log our own Agent
+    # logging_function = GenomeAgent.log_stats  # The processes, asyncio and distributed modes log a GenomeAgent
+
+    # Reuses the analysis of genomes with the same topology, the analyses are kept in 'neat_analysis_cache'
+    cache_analyses = False
+
+    # Draws the fittest genome of every generation in a background process instead of blocking the generation.
+    # While the worker is busy at most 'render_queue_size' genomes wait, the oldest ones are dropped first
+    background_rendering = False
+    render_queue_size = 4
+
+    # Draws the genomes without Graphviz, nodes are placed in columns following the layers of the network.
+    # Only with 'feed_forward = True' in the configuration, recurrent genomes are drawn with Graphviz
+    native_svg = False
+
+    # Renders the fittest genome only when its drawing changed or every 50 generations, 'svg_growth/render_index.jsonl'
+    # tells which drawing shows the fittest genome of every generation. Use 'None' to render every generation
+    render_policy = RenderPolicy(every_generations=50)
+
+    # Checkpoints are compressed with 'none', 'gzip', 'lzma' or 'zlib', in a background process if
+    # background_checkpoints. Run example/benchmark_checkpoints.py to compare them
+    checkpoint_compression = "gzip"
+    background_checkpoints = False
 
     # Setting up NEAT Algorithm
     neatSetup = NeatSetup(
@@ -117,9 +180,27 @@ if __name__ == '__main__':
 
         load_checkpoint_number=load_checkpoint_number,
         config_file=config_file,
-        simulation=simulation,
+        simulation=simulation if evaluation_mode == NeatSetup.EVALUATION_MODE_SERIAL else None,
+
+        evaluation_mode=evaluation_mode,
+        fitness_function=fitness_function,
+        simulation_factory=simulation_factory,
+        number_workers=number_workers,
+        coordinator_address=coordinator_address,
+        genomes_per_task=genomes_per_task,
+        tasks_per_worker=tasks_per_worker,
+        heartbeat_timeout=heartbeat_timeout,
+        no_worker_timeout=no_worker_timeout,
+        evaluation_timeout=evaluation_timeout,
 
-        logging_function=logging_function
+        logging_function=logging_function,
+        cache_analyses=cache_analyses,
+        background_rendering=background_rendering,
+        render_queue_size=render_queue_size,
+        render_policy=render_policy,
+        native_svg=native_svg,
+        checkpoint_compression=checkpoint_compression,
+        background_checkpoints=background_checkpoints
     )
 
     # Run
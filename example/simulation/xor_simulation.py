@@ -3,6 +3,20 @@ from neat.nn import FeedForwardNetwork
 
 # Models
 from neat_python_utility.example.simulation.xor_agent import XorAgent
+from neat_python_utility.neat_utility import compile_population, AnalysisCache
+
+
+# This is the fitness_function(genome, config) of the parallel evaluation modes, it evaluates a single genome.
+# It is defined at the top level of the module so it can be sent to worker processes
+def xor_fitness(genome, config):
+    brain = FeedForwardNetwork.create(genome, config)
+
+    # Setting fitness to 4, we will maximize fitness in this example
+    fitness = 4.0
+    for xor_input, xor_output in zip(XorGateGame.INPUTS, XorGateGame.XOR_OUTPUTS):
+        fitness -= (brain.activate(xor_input)[0] - xor_output[0]) ** 2
+
+    return fitness
 
 
 class XorGateGame:
@@ -17,6 +31,9 @@ class XorGateGame:
         # THIS IS A MANDATORY VARIABLE, CREATE A GENERATION VARIABLE
         self.generation = 0
 
+        # Genomes surviving many generations are analyzed only once by the vectorized simulation
+        self.analysis_cache = AnalysisCache()
+
     @staticmethod
     def create_agent(genome, neural_network):
         return XorAgent(
@@ -63,3 +80,33 @@ class XorGateGame:
 
         # Return current generation and fittest
         return self.generation, sorted_agents[0]
+
+    # Same as simulation, but every genome of the generation is evaluated on every input at once
+    def vectorized_simulation(self, genomes, config):
+        # Increase generation counter
+        self.generation += 1
+
+        # Evaluating the whole generation: outputs are [genomes x inputs x outputs]
+        outputs = compile_population(
+            genomes=genomes, config=config, cache=self.analysis_cache
+        ).activate(XorGateGame.INPUTS)
+        losses = ((outputs - XorGateGame.XOR_OUTPUTS) ** 2).sum(axis=(1, 2))
+
+        # Create Population
+        new_generation = []
+        for (genome_id, genome), loss in zip(genomes, losses):
+            # Modify fitness, we will maximize fitness in this example
+            genome.fitness = 4.0 - loss
+
+            # Creating Agent, the whole generation has already been evaluated so it does not need a brain
+            xor_agent = XorGateGame.create_agent(genome=genome, neural_network=None)
+            xor_agent.loss = loss
+
+            # Appending agent
+            new_generation.append(xor_agent)
+
+        # Sort agents by fitness
+        sorted_agents = sorted(new_generation)
+
+        # Return current generation and fittest
+        return self.generation, sorted_agents[0]
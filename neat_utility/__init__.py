@@ -2,3 +2,13 @@ from .models import *
 from .visualize import *
 from .neat_setup import NeatSetup
 from .genome_to_json import export_genome_to_json
+from .vectorized_functions import register_activation_function, register_aggregation_function, \
+    register_config_functions
+from .genome_compiler import analyze_genome, refresh_genome, compile_genome, compile_population
+from .evaluation import GenomeAgent, ProcessPoolEvaluator, ThreadPoolEvaluator, AsyncioEvaluator
+from .distributed_evaluation import DistributedEvaluator, run_worker, genome_to_payload, payload_to_genome
+from .analysis_cache import AnalysisCache, structural_hash
+from .render_worker import RenderWorker, render_genome, render_snapshot, render_snapshot_svg
+from .render_policy import RenderPolicy, drawing_hash
+from .svg_writer import draw_net_svg
+from .checkpointer import AtomicCheckpointer, BackgroundCheckpointer, restore_checkpoint
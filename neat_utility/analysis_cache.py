@@ -0,0 +1,138 @@
+'''
+    Cache of the topology analysis of genomes, so genomes sharing a topology across generations, like elites and
+    their clones, are only analyzed once and only their weights are filled in again.
+
+    Analyses are keyed by a structural hash of the genome. Disabled connections are part of the hash: they do not
+    carry weight, but they are part of the layers deduced by GenomeAnalyzer.
+'''
+
+
+# Utils
+from collections import OrderedDict
+from os.path import join, exists
+from os import makedirs, replace
+import hashlib
+import json
+
+
+def structural_hash(id_inputs, id_outputs, connections, keep_bias_nodes=False):
+    '''
+        Canonical hash of the topology of a genome, it does not depend on the order of the inputs, outputs or
+        connections, nor on the weights.
+
+        - connections: [<GenomeConnection Object>] or [<Tuple: Connection Key>]
+        - keep_bias_nodes: analyses keeping the bias nodes (see GenomeAnalyzer) have other hashes
+    '''
+    connection_keys = sorted(
+        map(lambda x: tuple(getattr(x, "identification_number", x)), connections)
+    )
+    canonical_topology = json.dumps(
+        [sorted(id_inputs), sorted(id_outputs), connection_keys] + (["bias_nodes"] if keep_bias_nodes else []),
+        separators=(",", ":")
+    )
+
+    return hashlib.sha256(canonical_topology.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    '''
+        Bounded LRU cache of topology analyses: {<String: Structural hash>: <Dict: Topology>}, where the topology is
+        the result of GenomeAnalyzer.get_topology().
+
+        - max_entries: number of analyses kept in memory, the least recently used ones are discarded first
+        - directory: if given, analyses are also stored in this directory as JSON files named by their hash, so they
+            survive discarded entries and other runs
+    '''
+    # Values of a topology stored on disk, the indexes are rebuilt from them
+    DISK_KEYS = ["useful_connections", "layers", "inputs_per_layer"]
+
+    def __init__(self, max_entries=1024, directory=None):
+        # Sanity Check
+        assert isinstance(max_entries, int) and max_entries > 0
+
+        self.max_entries = max_entries
+        self.directory = directory
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+
+        # Create cache directory if it doesn't exist
+        if self.directory is not None and not exists(self.directory):
+            makedirs(self.directory)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (self.directory is not None and exists(self._entry_path(key)))
+
+    def _entry_path(self, key):
+        # Entries are spread in subdirectories named by the first characters of their hash
+        return join(self.directory, key[:2], "{}.json".format(key))
+
+    def _remember(self, key, topology):
+        self._entries[key] = topology
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        # Memory first
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        # Then disk
+        if self.directory is not None and exists(self._entry_path(key)):
+            with open(self._entry_path(key), "r") as infile:
+                stored_topology = json.load(infile)
+
+            topology = {
+                "useful_connections": list(map(tuple, stored_topology["useful_connections"])),
+                "layers": stored_topology["layers"],
+                "inputs_per_layer": stored_topology["inputs_per_layer"],
+            }
+            self.hits += 1
+            self._remember(key=key, topology=topology)
+            return topology
+
+        self.misses += 1
+        return None
+
+    def put(self, key, topology):
+        self._remember(key=key, topology=topology)
+
+        # Writing the entry to a temporary file first, so a half written entry is never read
+        if self.directory is not None and not exists(self._entry_path(key)):
+            entry_path = self._entry_path(key)
+            makedirs(join(self.directory, key[:2]), exist_ok=True)
+            with open(entry_path + ".tmp", "w") as outfile:
+                json.dump({disk_key: topology[disk_key] for disk_key in AnalysisCache.DISK_KEYS}, outfile)
+            replace(entry_path + ".tmp", entry_path)
+
+    def clear(self):
+        # Only the memory entries are discarded
+        self._entries.clear()
+
+
+def construct_topology(genome_analyzer, cache=None):
+    '''
+        Filters the connections and constructs the layers of a genome analyzer. If a cache is given, the analysis of
+        a genome with the same topology is reused instead.
+    '''
+    if cache is None:
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+        return
+
+    key = genome_analyzer.structural_hash()
+    topology = cache.get(key)
+    if topology is None:
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+        cache.put(key=key, topology=genome_analyzer.get_topology())
+    else:
+        genome_analyzer.apply_topology(topology=topology)
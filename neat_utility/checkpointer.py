@@ -0,0 +1,231 @@
+'''
+    Checkpoints written straight into their directory, optionally in the background and with other compressions.
+
+    A checkpoint is the pickled tuple (generation, config, population, species_set, random state), the same tuple
+    neat.Checkpointer writes, compressed with gzip, lzma, zlib or not compressed at all. restore_checkpoint detects the
+    compression of a checkpoint from its first bytes.
+'''
+
+
+# AI
+import neat
+
+# Utils
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from os import replace
+import random
+import pickle
+import gzip
+import lzma
+import zlib
+
+
+def compress(data, compression, compression_level=None):
+    if compression_level is None:
+        compression_level = AtomicCheckpointer.DEFAULT_COMPRESSION_LEVELS[compression]
+
+    if compression == AtomicCheckpointer.COMPRESSION_GZIP:
+        return gzip.compress(data, compresslevel=compression_level)
+    elif compression == AtomicCheckpointer.COMPRESSION_LZMA:
+        return lzma.compress(data, preset=compression_level)
+    elif compression == AtomicCheckpointer.COMPRESSION_ZLIB:
+        return zlib.compress(data, compression_level)
+
+    return data
+
+
+def decompress(data):
+    # The compression is deduced from the first bytes: gzip and xz have magic numbers, zlib streams start with 0x78
+    # and pickles of protocol 2 or higher start with 0x80
+    if data[:2] == b"\x1f\x8b":
+        return gzip.decompress(data)
+    elif data[:6] == b"\xfd7zXZ\x00":
+        return lzma.decompress(data)
+    elif data[:1] == b"\x78":
+        return zlib.decompress(data)
+
+    return data
+
+
+def write_checkpoint(filename, data, compression, compression_level=None):
+    '''
+        Compresses a pickled checkpoint and writes it into a temporary file, which is renamed once it is complete so
+        a checkpoint is never read while it is being written. Returns the size of the file in bytes.
+    '''
+    data = compress(data=data, compression=compression, compression_level=compression_level)
+    with open(filename + ".tmp", "wb") as checkpoint_file:
+        checkpoint_file.write(data)
+    replace(filename + ".tmp", filename)
+
+    return len(data)
+
+
+def restore_checkpoint(filename, new_config=None):
+    '''
+        Same as neat.Checkpointer.restore_checkpoint, for checkpoints of any compression.
+    '''
+    with open(filename, "rb") as checkpoint_file:
+        data = checkpoint_file.read()
+
+    # Checkpoints of neat.Checkpointer are restored by neat-python itself
+    if data[:2] == b"\x1f\x8b":
+        if new_config is None:
+            return neat.Checkpointer.restore_checkpoint(filename)
+        return neat.Checkpointer.restore_checkpoint(filename, new_config=new_config)
+
+    generation, saved_config, population, species_set, random_state = pickle.loads(decompress(data))
+    random.setstate(random_state)
+    config = saved_config if new_config is None else new_config
+
+    # Innovation numbers continue from the saved ones, for the versions of neat-python that track them
+    saved_innovation_tracker = getattr(saved_config.genome_config, "innovation_tracker", None)
+    restored_population = neat.Population(config, (population, species_set, generation))
+    if saved_innovation_tracker is not None:
+        restored_population.reproduction.innovation_tracker = saved_innovation_tracker
+        config.genome_config.innovation_tracker = saved_innovation_tracker
+
+    return restored_population
+
+
+class AtomicCheckpointer(neat.Checkpointer):
+    '''
+        neat.Checkpointer that writes every checkpoint into a temporary file and renames it once it is complete, so
+        a checkpoint is never read while it is being written. Checkpoints are restored with restore_checkpoint, gzip
+        checkpoints are also the same files neat.Checkpointer writes.
+
+        - filename_prefix: may include a directory, like 'neat_checkpoints/neat-checkpoint-'
+        - compression: none, gzip, lzma or zlib
+        - compression_level: level of gzip and zlib (0 to 9) or preset of lzma (0 to 9), a default one if None
+    '''
+    COMPRESSION_NONE = "none"
+    COMPRESSION_GZIP = "gzip"
+    COMPRESSION_LZMA = "lzma"
+    COMPRESSION_ZLIB = "zlib"
+
+    # Level used when none is given, gzip uses the level of neat.Checkpointer
+    DEFAULT_COMPRESSION_LEVELS = {COMPRESSION_NONE: None, COMPRESSION_GZIP: 5, COMPRESSION_LZMA: 6, COMPRESSION_ZLIB: 6}
+
+    def __init__(self, generation_interval, time_interval_seconds=None, filename_prefix='neat-checkpoint-',
+                 compression=COMPRESSION_GZIP, compression_level=None):
+        # Initializing super constructor
+        super().__init__(generation_interval, time_interval_seconds=time_interval_seconds,
+                         filename_prefix=filename_prefix)
+
+        # Sanity Check
+        assert compression in AtomicCheckpointer.DEFAULT_COMPRESSION_LEVELS
+        assert compression_level is None or (isinstance(compression_level, int) and 0 <= compression_level <= 9)
+
+        self.compression = compression
+        self.compression_level = compression_level
+
+    @staticmethod
+    def snapshot(config, population, species_set, generation):
+        # Pickling the state detaches it from the population, which keeps evolving
+        data = (generation, config, population, species_set, random.getstate())
+        return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        filename = '{}{}'.format(self.filename_prefix, generation)
+        print("Saving checkpoint to {}".format(filename))
+
+        write_checkpoint(
+            filename=filename,
+            data=self.snapshot(config=config, population=population, species_set=species_set, generation=generation),
+            compression=self.compression, compression_level=self.compression_level
+        )
+
+
+class BackgroundCheckpointer(AtomicCheckpointer):
+    '''
+        AtomicCheckpointer that compresses and writes checkpoints in a worker process, only the state is pickled in
+        the training thread.
+
+        - number_workers: number of worker processes (or threads)
+        - max_pending: number of checkpoints being written at the same time, saving another one waits for the
+            oldest. Checkpoints are never dropped
+        - use_processes: False writes in threads, gzip, lzma and zlib release the GIL while compressing and the
+            pickled state is not copied to another process
+
+        flush() waits until every checkpoint is written and raises the error of a checkpoint that failed, close() also
+        stops the workers.
+    '''
+    def __init__(self, generation_interval, time_interval_seconds=None, filename_prefix='neat-checkpoint-',
+                 compression=AtomicCheckpointer.COMPRESSION_GZIP, compression_level=None, number_workers=1,
+                 max_pending=2, use_processes=True):
+        # Initializing super constructor
+        super().__init__(generation_interval, time_interval_seconds=time_interval_seconds,
+                         filename_prefix=filename_prefix, compression=compression,
+                         compression_level=compression_level)
+
+        # Sanity Check
+        assert isinstance(number_workers, int) and number_workers > 0
+        assert isinstance(max_pending, int) and max_pending > 0
+        assert isinstance(use_processes, bool)
+
+        self.number_workers = number_workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+
+        # Sizes of the written checkpoints: {<String: Filename>: <Int: Bytes>}
+        self.written = {}
+
+        self._executor = None
+        self._pending = deque()
+
+    def start(self):
+        # Workers are started only once per run
+        if self._executor is None:
+            executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = executor_class(max_workers=self.number_workers)
+
+    def close(self):
+        if self._executor is not None:
+            try:
+                self.flush()
+            finally:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getstate__(self):
+        # The species set of a checkpoint holds the reporters, workers and pending writes are not pickled with it
+        state = self.__dict__.copy()
+        del state["_executor"]
+        del state["_pending"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._executor = None
+        self._pending = deque()
+
+    def _wait_oldest(self):
+        filename, future = self._pending.popleft()
+        self.written[filename] = future.result()
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        # Starting the workers, if they were not started yet
+        self.start()
+
+        filename = '{}{}'.format(self.filename_prefix, generation)
+        print("Saving checkpoint to {}".format(filename))
+
+        # Backpressure
+        while len(self._pending) >= self.max_pending:
+            self._wait_oldest()
+
+        data = self.snapshot(config=config, population=population, species_set=species_set, generation=generation)
+        self._pending.append((filename, self._executor.submit(
+            write_checkpoint, filename, data, self.compression, self.compression_level
+        )))
+
+    def flush(self):
+        while self._pending:
+            self._wait_oldest()
@@ -0,0 +1,398 @@
+'''
+    Evaluation of the genomes of a generation in worker processes running on other hosts.
+
+    The coordinator (DistributedEvaluator) listens for workers over TCP, sends them chunks of genomes as compact
+    payloads and receives their fitness back. Workers (run_worker) evaluate the genomes with a user supplied
+    fitness_function(genome, config) and send heartbeats, so the chunks of a worker that stops sending heartbeats or
+    disconnects are dispatched again to the other workers.
+
+    Every message is a JSON object preceded by its length as a 4 bytes big endian unsigned integer:
+    - Worker to coordinator: {"type": "hello"}, {"type": "heartbeat"}, {"type": "result", "task": <Int>,
+        "fitness": [<Float>]}
+    - Coordinator to worker: {"type": "task", "task": <Int>, "genomes": [<Genome Payload>]}, {"type": "shutdown"}
+'''
+
+
+# Models
+from .evaluation import GenomeAgent
+
+# Utils
+from types import SimpleNamespace
+from collections import deque
+import threading
+import socket
+import struct
+import json
+import time
+
+
+MESSAGE_HEADER = struct.Struct(">I")
+
+
+def send_message(connection, message):
+    data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    connection.sendall(MESSAGE_HEADER.pack(len(data)) + data)
+
+
+def _receive_exactly(connection, number_bytes):
+    data = bytearray()
+    while len(data) < number_bytes:
+        chunk = connection.recv(number_bytes - len(data))
+        if not chunk:
+            raise ConnectionError("The connection was closed")
+        data.extend(chunk)
+
+    return bytes(data)
+
+
+def receive_message(connection):
+    number_bytes, = MESSAGE_HEADER.unpack(_receive_exactly(connection, MESSAGE_HEADER.size))
+    return json.loads(_receive_exactly(connection, number_bytes).decode("utf-8"))
+
+
+def genome_to_payload(genome):
+    '''
+        Compact representation of a genome, only the values needed to build its network are kept:
+        {"key": <Int>, "nodes": [[key, bias, response, activation, aggregation]],
+        "connections": [[input key, output key, weight, enabled]]}
+    '''
+    return {
+        "key": genome.key,
+        "nodes": list(
+            map(lambda x: [x.key, x.bias, x.response, x.activation, x.aggregation], genome.nodes.values())
+        ),
+        "connections": list(
+            map(lambda x: [x.key[0], x.key[1], x.weight, x.enabled], genome.connections.values())
+        ),
+    }
+
+
+def payload_to_genome(payload):
+    '''
+        Rebuilds a genome from its payload. The genome has the attributes used by neat.nn.FeedForwardNetwork.create
+        and get_network_metadata: key, fitness, nodes and connections.
+    '''
+    return SimpleNamespace(
+        key=payload["key"],
+        fitness=None,
+        nodes={
+            node[0]: SimpleNamespace(key=node[0], bias=node[1], response=node[2], activation=node[3],
+                                     aggregation=node[4])
+            for node in payload["nodes"]
+        },
+        connections={
+            (connection[0], connection[1]): SimpleNamespace(
+                key=(connection[0], connection[1]), weight=connection[2], enabled=connection[3]
+            )
+            for connection in payload["connections"]
+        }
+    )
+
+
+def run_worker(address, fitness_function, config, heartbeat_interval=1.0):
+    '''
+        Connects to a coordinator and evaluates the genomes it sends until it shuts the worker down.
+
+        - address: (<String: Host>, <Int: Port>) of the coordinator
+        - fitness_function: fitness_function(genome, config) returning a number
+        - config: neat-python configuration given to the fitness function
+        - heartbeat_interval: seconds between heartbeats
+    '''
+    # Sanity Check
+    assert callable(fitness_function)
+    assert heartbeat_interval > 0
+
+    connection = socket.create_connection(address)
+    send_lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(message):
+        with send_lock:
+            send_message(connection, message)
+
+    def send_heartbeats():
+        # Heartbeats are sent while genomes are being evaluated
+        while not stopped.wait(heartbeat_interval):
+            try:
+                send({"type": "heartbeat"})
+            except OSError:
+                return
+
+    heartbeat_thread = threading.Thread(target=send_heartbeats, daemon=True)
+    try:
+        send({"type": "hello"})
+        heartbeat_thread.start()
+
+        while True:
+            message = receive_message(connection)
+            if message["type"] == "shutdown":
+                break
+
+            # Evaluating the genomes of the task
+            fitness_values = list(
+                map(lambda x: fitness_function(payload_to_genome(x), config), message["genomes"])
+            )
+            send({"type": "result", "task": message["task"], "fitness": fitness_values})
+    except ConnectionError:
+        # The coordinator is gone
+        pass
+    finally:
+        stopped.set()
+        connection.close()
+        if heartbeat_thread.is_alive():
+            heartbeat_thread.join()
+
+
+class _WorkerConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.send_lock = threading.Lock()
+        self.last_seen = time.monotonic()
+        self.tasks = set()
+        self.alive = True
+
+
+class DistributedEvaluator:
+    '''
+        Coordinator that evaluates the genomes of every generation in workers connected over TCP.
+
+        - address: (<String: Host>, <Int: Port>) to listen on, port 0 picks a free port (see self.address)
+        - genomes_per_task: number of genomes sent to a worker at once
+        - tasks_per_worker: number of tasks a worker has at the same time
+        - heartbeat_timeout: seconds without messages after which a worker is considered dead and its tasks are
+            dispatched again
+        - no_worker_timeout: seconds a generation waits while no worker is connected before evaluate raises a
+            TimeoutError, None waits until a worker connects
+        - evaluation_timeout: seconds a generation may take before evaluate raises a TimeoutError, None has no limit
+
+        The tasks of a generation that timed out are discarded, results arriving later for them are ignored.
+    '''
+    def __init__(self, address=("0.0.0.0", 0), genomes_per_task=8, tasks_per_worker=2, heartbeat_timeout=10.0,
+                 no_worker_timeout=60.0, evaluation_timeout=None):
+        # Sanity Check
+        assert isinstance(genomes_per_task, int) and genomes_per_task > 0
+        assert isinstance(tasks_per_worker, int) and tasks_per_worker > 0
+        assert heartbeat_timeout > 0
+        assert no_worker_timeout is None or no_worker_timeout > 0
+        assert evaluation_timeout is None or evaluation_timeout > 0
+
+        self.address = address
+        self.genomes_per_task = genomes_per_task
+        self.tasks_per_worker = tasks_per_worker
+        self.heartbeat_timeout = heartbeat_timeout
+        self.no_worker_timeout = no_worker_timeout
+        self.evaluation_timeout = evaluation_timeout
+
+        self.generation = 0
+
+        self._server = None
+        self._accept_thread = None
+        self._closing = threading.Event()
+
+        # State shared with the threads of the workers, guarded by the condition
+        self._condition = threading.Condition()
+        self._workers = []
+        self._next_task = 0
+        self._pending_tasks = deque()
+        # {<Int: Task ID>: [<Dict: Genome Payload>]}
+        self._tasks = {}
+        # {<Int: Task ID>: [<Float: Fitness>]}
+        self._results = {}
+
+    @property
+    def number_workers(self):
+        with self._condition:
+            return len(self._workers)
+
+    def start(self):
+        # The coordinator starts listening only once per run
+        if self._server is not None:
+            return
+
+        self._closing.clear()
+        self._server = socket.create_server(self.address)
+        self._server.settimeout(0.2)
+        self.address = self._server.getsockname()[:2]
+        self._accept_thread = threading.Thread(target=self._accept_workers, daemon=True)
+        self._accept_thread.start()
+
+    def close(self):
+        if self._server is None:
+            return
+
+        # Stop accepting workers and shut the connected ones down
+        self._closing.set()
+        self._accept_thread.join()
+        self._server.close()
+        self._server = None
+
+        with self._condition:
+            workers = list(self._workers)
+        for worker in workers:
+            try:
+                with worker.send_lock:
+                    send_message(worker.connection, {"type": "shutdown"})
+            except OSError:
+                pass
+            self._drop_worker(worker)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _accept_workers(self):
+        while not self._closing.is_set():
+            try:
+                connection, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+
+            connection.settimeout(None)
+            worker = _WorkerConnection(connection=connection)
+            with self._condition:
+                self._workers.append(worker)
+            threading.Thread(target=self._serve_worker, args=(worker,), daemon=True).start()
+
+    def _serve_worker(self, worker):
+        # Receives the messages of a worker until it disconnects
+        try:
+            while True:
+                message = receive_message(worker.connection)
+                with self._condition:
+                    worker.last_seen = time.monotonic()
+                    if message["type"] == "result" and message["task"] in worker.tasks:
+                        worker.tasks.discard(message["task"])
+                        if message["task"] in self._tasks:
+                            self._results[message["task"]] = message["fitness"]
+                            del self._tasks[message["task"]]
+                        self._condition.notify_all()
+
+                if message["type"] in ["hello", "result"]:
+                    self._dispatch_tasks()
+        except (OSError, ValueError):
+            pass
+
+        self._drop_worker(worker)
+
+    def _drop_worker(self, worker):
+        # The tasks of the worker go back to the queue, so other workers take them
+        with self._condition:
+            if not worker.alive:
+                return
+
+            worker.alive = False
+            self._workers.remove(worker)
+            for task in sorted(worker.tasks):
+                if task in self._tasks:
+                    self._pending_tasks.appendleft(task)
+            worker.tasks.clear()
+            self._condition.notify_all()
+
+        # Shutting the connection down also wakes up the thread receiving its messages
+        try:
+            worker.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        worker.connection.close()
+        self._dispatch_tasks()
+
+    def _dispatch_tasks(self):
+        # Assigning pending tasks to the workers with room for more tasks
+        assignments = []
+        with self._condition:
+            for worker in self._workers:
+                while self._pending_tasks and len(worker.tasks) < self.tasks_per_worker:
+                    task = self._pending_tasks.popleft()
+                    worker.tasks.add(task)
+                    assignments.append((worker, task, self._tasks[task]))
+
+        for worker, task, genomes in assignments:
+            try:
+                with worker.send_lock:
+                    send_message(worker.connection, {"type": "task", "task": task, "genomes": genomes})
+            except OSError:
+                self._drop_worker(worker)
+
+    def _drop_silent_workers(self):
+        with self._condition:
+            now = time.monotonic()
+            silent_workers = list(filter(lambda x: now - x.last_seen > self.heartbeat_timeout, self._workers))
+
+        for worker in silent_workers:
+            self._drop_worker(worker)
+
+    def _discard_tasks(self, tasks):
+        # Forgetting the tasks of a generation that will not be completed
+        with self._condition:
+            for task in tasks:
+                self._tasks.pop(task, None)
+                self._results.pop(task, None)
+            self._pending_tasks = deque(filter(lambda x: x not in tasks, self._pending_tasks))
+            for worker in self._workers:
+                worker.tasks.difference_update(tasks)
+
+    def evaluate(self, genomes, config):
+        # Listening for workers, if it was not started yet
+        self.start()
+
+        # Increase generation counter
+        self.generation += 1
+
+        # Creating the tasks of the generation
+        genomes = list(map(lambda x: x[1], genomes))
+        task_genomes = {}
+        with self._condition:
+            for index in range(0, len(genomes), self.genomes_per_task):
+                task = self._next_task
+                self._next_task += 1
+                task_genomes[task] = genomes[index:index + self.genomes_per_task]
+                self._tasks[task] = list(map(genome_to_payload, task_genomes[task]))
+                self._pending_tasks.append(task)
+
+        self._dispatch_tasks()
+
+        # Waiting for the results, checking the heartbeats of the workers meanwhile
+        start = time.monotonic()
+        no_worker_since = None
+        while True:
+            with self._condition:
+                if all(map(lambda x: x in self._results, task_genomes)):
+                    results = {task: self._results.pop(task) for task in task_genomes}
+                    break
+
+                # Giving up when no worker is left to evaluate the genomes, or when the generation takes too long
+                now = time.monotonic()
+                no_worker_since = None if self._workers else (now if no_worker_since is None else no_worker_since)
+                if self.no_worker_timeout is not None and no_worker_since is not None and \
+                        now - no_worker_since >= self.no_worker_timeout:
+                    error = TimeoutError("No worker connected to {} for {} seconds".format(
+                        self.address, self.no_worker_timeout
+                    ))
+                elif self.evaluation_timeout is not None and now - start >= self.evaluation_timeout:
+                    error = TimeoutError("Generation {} was not evaluated within {} seconds".format(
+                        self.generation, self.evaluation_timeout
+                    ))
+                else:
+                    error = None
+
+                if error is None:
+                    self._condition.wait(timeout=min(1.0, self.heartbeat_timeout / 2))
+
+            if error is not None:
+                self._discard_tasks(tasks=set(task_genomes))
+                raise error
+
+            self._drop_silent_workers()
+
+        # Writing fitness back
+        for task, task_genome_list in task_genomes.items():
+            for genome, fitness in zip(task_genome_list, results[task]):
+                genome.fitness = fitness
+
+        # Return current generation and fittest
+        return self.generation, min(map(lambda x: GenomeAgent(genome=x), genomes))
@@ -0,0 +1,269 @@
+'''
+    Built-in genome evaluation engines for NeatSetup.
+
+    Evaluators receive a fitness_function(genome, config) that returns the fitness of a single genome, evaluate a whole
+    generation with it, write the fitness back into the genomes and return the current generation along with the
+    fittest agent, like a simulation(genomes, config) function does.
+'''
+
+
+# Models
+from .models.neat_agent import NeatAgent
+
+# Utils
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from os import cpu_count
+import threading
+import asyncio
+import inspect
+import math
+
+
+class GenomeAgent(NeatAgent):
+    '''
+        Agent created by the evaluators, it only keeps the genome. Fitness is maximized, like in neat-python.
+    '''
+    def __init__(self, genome, neural_network=None):
+        # Initializing super constructor
+        super().__init__()
+
+        self.genome = genome
+        self.brain = neural_network
+
+    def __lt__(self, other):
+        # This is a maximization problem, so the fittest agent comes first when sorting
+        return self.genome.fitness > other.genome.fitness
+
+    def __eq__(self, other):
+        return self.genome.fitness == other.genome.fitness
+
+    @staticmethod
+    def log_stats(agent):
+        return ""
+
+
+# Fitness function and configuration of a worker process, set once when the worker starts
+_worker_fitness_function = None
+_worker_config = None
+
+
+def _initialize_worker(fitness_function, config):
+    global _worker_fitness_function, _worker_config
+    _worker_fitness_function = fitness_function
+    _worker_config = config
+
+
+def _evaluate_genomes(genomes):
+    # Runs inside a worker process
+    return list(map(lambda x: _worker_fitness_function(x, _worker_config), genomes))
+
+
+def _shard_genomes(genomes, number_chunks):
+    # Splits genomes into at most number_chunks chunks of the same size
+    chunk_size = max(1, math.ceil(len(genomes) / number_chunks))
+    return [genomes[index:index + chunk_size] for index in range(0, len(genomes), chunk_size)]
+
+
+class ProcessPoolEvaluator:
+    '''
+        Evaluates the genomes of every generation in a pool of worker processes.
+
+        The pool is started once and reused by every generation, the fitness function and the configuration are sent
+        to every worker only once when it starts. Genomes are sent in chunks to reduce the number of messages.
+
+        - fitness_function: fitness_function(genome, config) returning a number. It must be picklable,
+            so it has to be defined at the top level of a module
+        - config: neat-python configuration given to the fitness function
+        - number_workers: number of worker processes, the number of CPUs by default
+        - chunks_per_worker: number of chunks every worker receives per generation
+    '''
+    def __init__(self, fitness_function, config, number_workers=None, chunks_per_worker=4):
+        # Sanity Check
+        assert callable(fitness_function)
+        assert number_workers is None or (isinstance(number_workers, int) and number_workers > 0)
+        assert isinstance(chunks_per_worker, int) and chunks_per_worker > 0
+
+        self.fitness_function = fitness_function
+        self.config = config
+        self.number_workers = (cpu_count() or 1) if number_workers is None else number_workers
+        self.chunks_per_worker = chunks_per_worker
+
+        self.generation = 0
+        self._executor = None
+
+    def start(self):
+        # Workers are started only once per run
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.number_workers,
+                initializer=_initialize_worker,
+                initargs=(self.fitness_function, self.config)
+            )
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def evaluate(self, genomes, config):
+        # Starting the workers, if they were not started yet
+        self.start()
+
+        # Increase generation counter
+        self.generation += 1
+
+        # Sharding genomes
+        genomes = list(map(lambda x: x[1], genomes))
+        chunks = _shard_genomes(genomes=genomes, number_chunks=self.number_workers * self.chunks_per_worker)
+
+        # Writing fitness back, chunks are returned in order
+        fitness_values = [fitness for chunk_fitness in self._executor.map(_evaluate_genomes, chunks)
+                          for fitness in chunk_fitness]
+        for genome, fitness in zip(genomes, fitness_values):
+            genome.fitness = fitness
+
+        # Return current generation and fittest
+        return self.generation, min(map(lambda x: GenomeAgent(genome=x), genomes))
+
+
+class ThreadPoolEvaluator:
+    '''
+        Evaluates the genomes of every generation with simulations running in a pool of threads.
+
+        Useful when the simulation spends its time in code that releases the GIL, like NumPy or native libraries,
+        since genomes do not need to be pickled. Every thread creates its own simulation with simulation_factory,
+        so the state kept by a simulation is never shared between threads.
+
+        - simulation_factory: function without parameters that returns a simulation(genomes, config) function,
+            for example lambda: XorGateGame().simulation
+        - number_workers: number of threads, the number of CPUs by default
+        - chunks_per_worker: number of chunks every thread receives per generation
+
+        Every chunk of genomes is evaluated by a simulation, which must write the fitness of its genomes and return
+        the fittest agent of the chunk. The fittest agent of the generation is chosen by comparing those agents.
+    '''
+    def __init__(self, simulation_factory, number_workers=None, chunks_per_worker=1):
+        # Sanity Check
+        assert callable(simulation_factory)
+        assert number_workers is None or (isinstance(number_workers, int) and number_workers > 0)
+        assert isinstance(chunks_per_worker, int) and chunks_per_worker > 0
+
+        self.simulation_factory = simulation_factory
+        self.number_workers = (cpu_count() or 1) if number_workers is None else number_workers
+        self.chunks_per_worker = chunks_per_worker
+
+        self.generation = 0
+        self._executor = None
+        self._thread_data = threading.local()
+
+    def start(self):
+        # Threads are started only once per run
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.number_workers)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run_simulation(self, genomes, config):
+        # Runs inside a thread, the simulation of the thread is created the first time it is needed
+        if getattr(self._thread_data, "simulation", None) is None:
+            self._thread_data.simulation = self.simulation_factory()
+
+        _, fittest_agent = self._thread_data.simulation(genomes=genomes, config=config)
+        return fittest_agent
+
+    def evaluate(self, genomes, config):
+        # Starting the threads, if they were not started yet
+        self.start()
+
+        # Increase generation counter, simulations are called once per chunk so their counters are not used
+        self.generation += 1
+
+        # Sharding genomes
+        chunks = _shard_genomes(genomes=list(genomes), number_chunks=self.number_workers * self.chunks_per_worker)
+
+        # Fittest agents of every chunk are compared in this thread once all the simulations are done
+        fittest_agents = list(self._executor.map(lambda x: self._run_simulation(genomes=x, config=config), chunks))
+
+        # Return current generation and fittest
+        return self.generation, min(fittest_agents)
+
+
+class AsyncioEvaluator:
+    '''
+        Evaluates the genomes of every generation concurrently on an event loop.
+
+        Useful when the fitness function spends its time waiting, for example for the replies of a simulator that
+        runs in another process. The event loop is created once and reused by every generation.
+
+        - fitness_function: async def fitness_function(genome, config) returning a number
+        - max_concurrency: maximum number of genomes being evaluated at the same time
+    '''
+    def __init__(self, fitness_function, max_concurrency=100):
+        # Sanity Check
+        assert inspect.iscoroutinefunction(fitness_function)
+        assert isinstance(max_concurrency, int) and max_concurrency > 0
+
+        self.fitness_function = fitness_function
+        self.max_concurrency = max_concurrency
+
+        self.generation = 0
+        self._event_loop = None
+
+    def start(self):
+        # The event loop is created only once per run
+        if self._event_loop is None:
+            self._event_loop = asyncio.new_event_loop()
+
+    def close(self):
+        if self._event_loop is not None:
+            self._event_loop.run_until_complete(self._event_loop.shutdown_asyncgens())
+            self._event_loop.close()
+            self._event_loop = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def _evaluate_genomes(self, genomes, config):
+        # Limiting the number of genomes being evaluated at the same time
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def evaluate_genome(genome):
+            async with semaphore:
+                genome.fitness = await self.fitness_function(genome, config)
+
+        await asyncio.gather(*map(evaluate_genome, genomes))
+
+    def evaluate(self, genomes, config):
+        # Creating the event loop, if it was not created yet
+        self.start()
+
+        # Increase generation counter
+        self.generation += 1
+
+        # Evaluating and writing fitness back
+        genomes = list(map(lambda x: x[1], genomes))
+        self._event_loop.run_until_complete(self._evaluate_genomes(genomes=genomes, config=config))
+
+        # Return current generation and fittest
+        return self.generation, min(map(lambda x: GenomeAgent(genome=x), genomes))
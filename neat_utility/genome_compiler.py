@@ -0,0 +1,87 @@
+# Models
+from .models import *
+
+# Utils
+from .genome_to_json import get_network_tables, get_population_tables
+from .analysis_cache import construct_topology
+import numpy as np
+
+
+def analyze_genome(genome, config, dtype=np.float64, sparse=False, cache=None):
+    # Getting NN metadata as tables
+    id_inputs, id_outputs, nodes, connections = get_network_tables(genome=genome, config=config)
+
+    return _analyze_tables(
+        id_inputs=id_inputs, id_outputs=id_outputs, nodes=nodes, connections=connections, dtype=dtype, sparse=sparse,
+        cache=cache
+    )
+
+
+def _analyze_tables(id_inputs, id_outputs, nodes, connections, dtype, sparse, cache):
+    # Instantiating a GenomeAnalysis object. Bias nodes are kept, so the networks compute the same outputs as
+    # neat.nn.FeedForwardNetwork
+    genome_analyzer_object = GenomeAnalyzer(
+        id_inputs=id_inputs, id_outputs=id_outputs,
+        connections=connections, nodes=nodes, keep_bias_nodes=True
+    )
+
+    # Filter connections and construct layers, or reuse them from the cache, then build the NumPy matrices
+    construct_topology(genome_analyzer=genome_analyzer_object, cache=cache)
+    if sparse:
+        genome_analyzer_object.construct_sparse_matrices(dtype=dtype)
+    else:
+        genome_analyzer_object.construct_numpy_matrices(dtype=dtype)
+
+    return genome_analyzer_object
+
+
+def refresh_genome(genome_analyzer, genome, config):
+    '''
+        Fills the matrices of an analyzed genome with the weights, biases and functions of another genome with the
+        same structure, without analyzing it again.
+    '''
+    # Getting NN metadata as tables
+    _, _, nodes, connections = get_network_tables(genome=genome, config=config)
+    genome_analyzer.refresh_weights(connections=connections, nodes=nodes)
+
+    return genome_analyzer
+
+
+def compile_genome(genome, config, dtype=np.float64, cache=None):
+    return CompiledNetwork.from_genome_analyzer(
+        genome_analyzer=analyze_genome(genome=genome, config=config, dtype=dtype, cache=cache), dtype=dtype
+    )
+
+
+def compile_population(genomes, config, dtype=np.float64, block_diagonal=False, cache=None):
+    '''
+        Compiles every genome of a population so that all of them are evaluated at once.
+
+        - block_diagonal: False pads the layers of the networks (CompiledPopulation), True packs them without padding
+          into block diagonal sparse matrices (BlockDiagonalPopulation), which uses less memory when the topologies
+          are very different
+        - cache: AnalysisCache reused across generations, genomes with an already analyzed topology skip the analysis
+    '''
+    # Genomes are either genome objects or (genome_id, genome) tuples, like the ones given to the simulation
+    genomes = list(map(lambda x: x[1] if isinstance(x, tuple) else x, genomes))
+
+    # Extracting the whole population at once, every genome is analyzed on views of the population tables
+    id_inputs, id_outputs, node_table, connection_table, node_offsets, connection_offsets = get_population_tables(
+        genomes=genomes, config=config
+    )
+    genome_analyzers = list(
+        map(
+            lambda x: _analyze_tables(
+                id_inputs=id_inputs, id_outputs=id_outputs,
+                nodes=node_table.view(node_offsets[x], node_offsets[x + 1]),
+                connections=connection_table.view(connection_offsets[x], connection_offsets[x + 1]),
+                dtype=dtype, sparse=block_diagonal, cache=cache
+            ),
+            range(len(genomes))
+        )
+    )
+
+    if block_diagonal:
+        return BlockDiagonalPopulation(genome_analyzers=genome_analyzers, dtype=dtype)
+
+    return CompiledPopulation(genome_analyzers=genome_analyzers, dtype=dtype)
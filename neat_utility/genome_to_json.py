@@ -2,6 +2,8 @@
 from .models import *
 
 # Utils
+from .analysis_cache import construct_topology
+
 import json
 
 
@@ -17,25 +19,27 @@ def get_network_metadata(genome, config):
         - .aggregation: What the neuron does with the values
         - .response: Value coefficient for Weights and biases for the genetic algorithm
     '''
-    # Getting all nodes
-    nodes = set()
+    # Getting all nodes, in the order of the genome
+    nodes = []
     for node in genome.nodes.values():
         found_node = GenomeNode(
             node_id=node.key,
             bias=node.bias,
-            activation_function=node.activation
+            activation_function=node.activation,
+            aggregation_function=node.aggregation,
+            response=node.response
         )
-        nodes.add(found_node)
+        nodes.append(found_node)
 
-    # Getting all connections
-    connections = set()
+    # Getting all connections, in the order of the genome
+    connections = []
     for cg in genome.connections.values():
         found_connection = GenomeConnection(
             identification_number=cg.key,
             enabled=cg.enabled,
             weight=cg.weight
         )
-        connections.add(found_connection)
+        connections.append(found_connection)
 
     # Getting IDs of inputs
     id_inputs = set()
@@ -50,30 +54,63 @@ def get_network_metadata(genome, config):
     return id_inputs, id_outputs, nodes, connections
 
 
-def export_genome_to_json(filename, config, genome, inputs_names, outputs_names):
+def get_network_tables(genome, config):
+    '''
+        Same as get_network_metadata, but nodes and connections are returned as a NodeTable and a ConnectionTable,
+        so no object is created per node or connection. Both can be given to GenomeAnalyzer.
+    '''
+    return set(config.genome_config.input_keys), set(config.genome_config.output_keys), \
+        NodeTable.from_genome(genome=genome), ConnectionTable.from_genome(genome=genome)
+
+
+def get_population_tables(genomes, config):
+    '''
+        Nodes and connections of every genome of a population, extracted into a single NodeTable and a single
+        ConnectionTable. The nodes of genome g are the rows node_offsets[g]:node_offsets[g + 1] of the node table,
+        node_table.view(node_offsets[g], node_offsets[g + 1]) gives them without copying, and the same goes for the
+        connections.
+
+        Returns id_inputs, id_outputs, node_table, connection_table, node_offsets, connection_offsets
+    '''
+    genomes = list(genomes)
+    node_table, node_offsets = NodeTable.from_genomes(genomes=genomes)
+    connection_table, connection_offsets = ConnectionTable.from_genomes(genomes=genomes)
+
+    return set(config.genome_config.input_keys), set(config.genome_config.output_keys), node_table, \
+        connection_table, node_offsets, connection_offsets
+
+
+def export_genome_to_json(filename, config, genome, inputs_names, outputs_names, sparse=False, cache=None):
     # Getting NN metadata
     id_inputs, id_outputs, nodes, connections = get_network_metadata(genome=genome, config=config)
 
-    # Instantiating a GenomeAnalysis object
+    # Instantiating a GenomeAnalysis object. Bias nodes are kept, so the exported network computes the same outputs
+    # as neat.nn.FeedForwardNetwork
     genome_analyzer_object = GenomeAnalyzer(
         id_inputs=id_inputs, id_outputs=id_outputs,
-        connections=connections, nodes=nodes
+        connections=connections, nodes=nodes, keep_bias_nodes=True
     )
 
-    # Filter connections and get rid of useless and abandoned nodes
-    genome_analyzer_object.filter_useful_connections()
+    # Filter connections, get rid of useless and abandoned nodes, construct layers and deduce inputs per layer.
+    # The analysis of a genome with the same topology is reused if it is in the cache
+    construct_topology(genome_analyzer=genome_analyzer_object, cache=cache)
 
-    # Discover all possible paths
-    genome_analyzer_object.discover_all_connection_paths()
+    if sparse:
+        # Build weights in CSR format, biases and activation functions matrices
+        genome_analyzer_object.construct_sparse_matrices()
 
-    # Construct layers and deduce inputs per layer
-    genome_analyzer_object.construct_layers()
-
-    # Build weights, biases and activation functions matrices
-    genome_analyzer_object.construct_matrices()
+        # Get a Map of the neural network
+        neural_network_map = genome_analyzer_object.network_to_sparse_map(
+            inputs_name=inputs_names, outputs_name=outputs_names
+        )
+    else:
+        # Build weights, biases and activation functions matrices
+        genome_analyzer_object.construct_matrices()
 
-    # Get a Map of the neural network
-    neural_network_map = genome_analyzer_object.network_to_map(inputs_name=inputs_names, outputs_name=outputs_names)
+        # Get a Map of the neural network
+        neural_network_map = genome_analyzer_object.network_to_map(
+            inputs_name=inputs_names, outputs_name=outputs_names
+        )
 
     # Convert the map into a JSON and save it
     with open(filename, "w") as outfile:
@@ -1,4 +1,9 @@
 from .connection import GenomeConnection
 from .neat_agent import NeatAgent
 from .node import GenomeNode
+from .genome_tables import ConnectionTable, NodeTable
 from .genome_analyzer import GenomeAnalyzer
+from .genome_graph import GenomeGraph
+from .compiled_network import CompiledNetwork
+from .compiled_population import CompiledPopulation
+from .block_diagonal_population import BlockDiagonalPopulation
@@ -0,0 +1,210 @@
+from ..vectorized_functions import get_activation_function, get_aggregation_function
+from .compiled_population import CompiledPopulation
+import numpy as np
+
+
+class BlockDiagonalPopulation:
+    '''
+        Evaluates many feed forward networks with different topologies on a batch of inputs at once, without padding.
+
+        Every node of every network gets a column in a single global index space: the inputs of every network first,
+        then the nodes of every depth level. The layers of a network are aligned so that its output layer is the last
+        level. The weights of a level are the block diagonal concatenation of the CSR weights of that layer of every
+        network, so a level of the whole population is evaluated with a single sparse matrix product.
+
+        - segment_ids: <Int Array [columns]> index of the network owning every column
+
+        Inputs and outputs follow the CompiledNetwork ordering: input columns are sorted -1, -2, -3, ... and
+        output columns are sorted ascending.
+    '''
+    def __init__(self, genome_analyzers, dtype=np.float64):
+        # Sanity Check: Make sure every network has the same inputs and outputs
+        assert genome_analyzers
+        self.id_inputs = sorted(genome_analyzers[0].id_inputs, reverse=True)
+        self.id_outputs = sorted(genome_analyzers[0].id_outputs)
+        assert all(map(lambda x: sorted(x.id_inputs, reverse=True) == self.id_inputs, genome_analyzers))
+        assert all(map(lambda x: sorted(x.id_outputs) == self.id_outputs, genome_analyzers))
+
+        # Sanity Check: Make sure the sparse matrices have been deduced
+        assert all(map(lambda x: x.sparse_weights_arrays is not None, genome_analyzers))
+
+        self.dtype = dtype
+        self.number_networks = len(genome_analyzers)
+        number_inputs = len(self.id_inputs)
+        number_levels = max(map(lambda x: len(x.layers), genome_analyzers))
+
+        # First level of every network, so that the output layers are aligned on the last level
+        first_levels = list(map(lambda x: number_levels - len(x.layers), genome_analyzers))
+
+        # Global column of the first node of every network in every level
+        level_offsets = [self.number_networks * number_inputs]
+        network_offsets = []
+        for level_index in range(number_levels):
+            level_sizes = list(
+                map(
+                    lambda x: len(x[1].layers[level_index - x[0]]) if level_index >= x[0] else 0,
+                    zip(first_levels, genome_analyzers)
+                )
+            )
+            network_offsets.append(level_offsets[-1] + np.concatenate([[0], np.cumsum(level_sizes)[:-1]]))
+            level_offsets.append(level_offsets[-1] + sum(level_sizes))
+
+        self._number_columns = level_offsets[-1]
+        self.segment_ids = np.empty(self._number_columns, dtype=np.intp)
+        self.segment_ids[:level_offsets[0]] = np.repeat(np.arange(self.number_networks), number_inputs)
+
+        # Function names shared by every network
+        activation_function_names = []
+        aggregation_function_names = []
+        activation_codes = {}
+        aggregation_codes = {}
+
+        # Blocks of every level: [[(<Int Array: indptr>, <Int Array: global indices>, <Array: data>, ...)]]
+        level_blocks = list(map(lambda x: [], range(number_levels)))
+        self._output_columns = np.empty([self.number_networks, len(self.id_outputs)], dtype=np.intp)
+        for network_index, genome_analyzer in enumerate(genome_analyzers):
+            # Global column of every node of the network
+            node_columns = {
+                id_input: network_index * number_inputs + column for column, id_input in enumerate(self.id_inputs)
+            }
+            for layer_index, layer_nodes in enumerate(genome_analyzer.layers):
+                level_index = first_levels[network_index] + layer_index
+                first_column = network_offsets[level_index][network_index]
+                self.segment_ids[first_column:first_column + len(layer_nodes)] = network_index
+                for row, node_id in enumerate(sorted(layer_nodes)):
+                    node_columns[node_id] = first_column + row
+
+            activation_translation = CompiledPopulation._population_codes(
+                function_names=genome_analyzer.activation_functions,
+                population_codes=activation_codes, population_names=activation_function_names
+            )
+            aggregation_translation = CompiledPopulation._population_codes(
+                function_names=genome_analyzer.aggregation_functions,
+                population_codes=aggregation_codes, population_names=aggregation_function_names
+            )
+
+            for layer_index, (indptr, indices, data) in enumerate(genome_analyzer.sparse_weights_arrays):
+                # Translating the columns of the layer inputs into global columns
+                input_columns = np.array(
+                    list(map(lambda x: node_columns[x], genome_analyzer.inputs_per_layer[layer_index])),
+                    dtype=np.intp
+                )
+                level_blocks[first_levels[network_index] + layer_index].append(
+                    (
+                        indptr,
+                        input_columns[indices],
+                        data,
+                        genome_analyzer.biases_arrays[layer_index],
+                        genome_analyzer.responses_arrays[layer_index],
+                        activation_translation[genome_analyzer.activation_codes_arrays[layer_index] + 1],
+                        aggregation_translation[genome_analyzer.aggregation_codes_arrays[layer_index] + 1]
+                    )
+                )
+
+            self._output_columns[network_index] = list(map(lambda x: node_columns[x], self.id_outputs))
+
+        # Stacking the blocks of every level
+        self._levels = list(
+            map(
+                lambda x: self._compile_level(
+                    blocks=x[1], node_columns=slice(level_offsets[x[0]], level_offsets[x[0] + 1]),
+                    activation_function_names=activation_function_names,
+                    aggregation_function_names=aggregation_function_names
+                ),
+                enumerate(level_blocks)
+            )
+        )
+
+    def _compile_level(self, blocks, node_columns, activation_function_names, aggregation_function_names):
+        # Block diagonal CSR matrix of the level, rows are the nodes of the level and columns the global columns
+        block_offsets = np.cumsum([0] + list(map(lambda x: len(x[2]), blocks)))
+        indptr = np.concatenate(
+            [np.zeros(1, dtype=np.intp)] + list(map(lambda x: x[1][0][1:] + x[0], zip(block_offsets, blocks)))
+        ).astype(np.intp)
+
+        indices = np.concatenate(list(map(lambda x: x[1], blocks))).astype(np.intp)
+        data = np.concatenate(list(map(lambda x: x[2], blocks))).astype(self.dtype)
+        biases = np.concatenate(list(map(lambda x: x[3], blocks))).astype(self.dtype)
+        responses = np.concatenate(list(map(lambda x: x[4], blocks))).astype(self.dtype)
+        activation_codes = np.concatenate(list(map(lambda x: x[5], blocks)))
+        aggregation_codes = np.concatenate(list(map(lambda x: x[6], blocks)))
+
+        # Sums of a row are reduced from its first connection, rows without connections stay at 0
+        row_lengths = np.diff(indptr)
+        summed_rows = np.flatnonzero(row_lengths)
+
+        # Rows with other aggregations gather their connections into padded [rows x connections] arrays
+        aggregations = []
+        for code in np.unique(aggregation_codes):
+            if code < 0 or aggregation_function_names[code] == "sum":
+                continue
+
+            rows = np.flatnonzero(aggregation_codes == code)
+            number_connections = max(1, int(row_lengths[rows].max()))
+            mask = np.arange(number_connections)[None, :] < row_lengths[rows][:, None]
+            connections = np.where(mask, indptr[rows][:, None] + np.arange(number_connections)[None, :], 0)
+            aggregations.append(
+                (
+                    get_aggregation_function(aggregation_function_names[code]),
+                    rows,
+                    indices[connections] if len(indices) else np.zeros(mask.shape, dtype=np.intp),
+                    np.where(mask, data[connections], 0.0) if len(data) else np.zeros(mask.shape, dtype=self.dtype),
+                    mask
+                )
+            )
+
+        activations = list(
+            map(
+                lambda x: (
+                    get_activation_function(activation_function_names[x]), np.flatnonzero(activation_codes == x)
+                ),
+                filter(lambda x: x >= 0, np.unique(activation_codes))
+            )
+        )
+
+        return node_columns, indices, data, indptr[:-1][summed_rows], summed_rows, biases, responses, aggregations, \
+            activations
+
+    def activate(self, inputs):
+        '''
+            Evaluates every network on a batch of inputs and returns the outputs [networks x batch x outputs].
+
+            - inputs: [batch x inputs] shared by every network, or [networks x batch x inputs]
+        '''
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        assert inputs.shape[-1] == len(self.id_inputs) and inputs.ndim in [2, 3]
+        if inputs.ndim == 3:
+            assert inputs.shape[0] == self.number_networks
+
+        # Values of every column for every sample, [columns x batch]
+        number_samples = inputs.shape[-2]
+        values = np.zeros([self._number_columns, number_samples], dtype=self.dtype)
+        if inputs.ndim == 2:
+            values[:self.number_networks * len(self.id_inputs)] = np.tile(inputs.T, (self.number_networks, 1))
+        else:
+            values[:self.number_networks * len(self.id_inputs)] = \
+                inputs.transpose(0, 2, 1).reshape(-1, number_samples)
+
+        for node_columns, indices, data, row_starts, summed_rows, biases, responses, aggregations, activations \
+                in self._levels:
+            # Sparse matrix product: weighted inputs of every connection, summed row by row
+            level_values = np.zeros([len(biases), number_samples], dtype=self.dtype)
+            if len(summed_rows):
+                level_values[summed_rows] = np.add.reduceat(values[indices] * data[:, None], row_starts, axis=0)
+
+            # Other aggregations are applied to the weighted inputs, [batch x rows x connections]
+            for aggregation_function, rows, aggregation_indices, aggregation_data, mask in aggregations:
+                level_values[rows] = aggregation_function(
+                    (values[aggregation_indices] * aggregation_data[:, :, None]).transpose(2, 0, 1), mask[None, :, :]
+                ).T
+
+            level_values = biases[:, None] + responses[:, None] * level_values
+
+            # Applying the activation functions, nodes without one are left untouched
+            for activation_function, rows in activations:
+                level_values[rows] = activation_function(level_values[rows])
+
+            values[node_columns] = level_values
+
+        # Splitting the outputs back per network, [networks x batch x outputs]
+        return values[self._output_columns].transpose(0, 2, 1)
@@ -0,0 +1,230 @@
+from ..vectorized_functions import get_activation_function, get_aggregation_function
+import numpy as np
+import json
+
+
+class CompiledNetwork:
+    '''
+        Feed forward network that evaluates a whole batch of inputs at once, layer by layer, as matrix products.
+
+        The columns of the inputs are the input nodes sorted the same way network_to_map sorts them
+        (-1, -2, -3, ...) and the columns of the outputs are the output nodes sorted ascending.
+
+        - id_inputs: [<Int: Input Node ID>] in column order
+        - id_outputs: [<Int: Output Node ID>] in column order
+        - layers: [<Dict: Layer>] with the keys of the layers of network_to_map:
+            - id_nodes: [<Int: Node ID>]
+            - id_node_inputs: [<Int: Node ID>]
+            - weights: [nodes x inputs]
+            - biases: [nodes]
+            - afunctions: [<String: Activation function name>]
+            - aggregations (Optional, "sum" by default): [<String: Aggregation function name>]
+            - responses (Optional, 1.0 by default): [nodes]
+            - connections (Optional): [[<Int: Input Node ID>, <Int: Node ID>]] enabled connections of the layer
+            - mask (Optional, built from connections by default): [nodes x inputs] True where there is a connection.
+                Maps with neither mask nor connections fall back to the non zero weights
+
+        Every node computes activation(bias + response * aggregation(weights * inputs)), like neat-python.
+    '''
+    def __init__(self, id_inputs, id_outputs, layers, dtype=np.float64):
+        self.id_inputs = list(id_inputs)
+        self.id_outputs = list(id_outputs)
+        self.dtype = dtype
+
+        # Column of every node in the values matrix. Inputs come first, then the nodes of every layer
+        node_columns = {id_input: column for column, id_input in enumerate(self.id_inputs)}
+
+        # Compiling layers
+        self._layers = []
+        for layer in layers:
+            id_nodes = layer["id_nodes"]
+            id_node_inputs = layer["id_node_inputs"]
+            aggregation_functions = layer.get("aggregations", ["sum"] * len(id_nodes))
+            responses = layer.get("responses", [1.0] * len(id_nodes))
+
+            # Sanity Check: Make sure the layer shapes are consistent
+            weights = np.asarray(layer["weights"], dtype=dtype).reshape([len(id_nodes), len(id_node_inputs)])
+            if "mask" in layer:
+                mask = np.asarray(layer["mask"], dtype=bool)
+            elif "connections" in layer:
+                mask = CompiledNetwork._connections_mask(
+                    connections=layer["connections"], id_nodes=id_nodes, id_node_inputs=id_node_inputs
+                )
+            else:
+                mask = weights != 0
+            assert len(layer["biases"]) == len(layer["afunctions"]) == len(aggregation_functions) \
+                   == len(responses) == len(id_nodes)
+            assert mask.shape == weights.shape
+
+            # Columns read and written by the layer
+            input_columns = np.array(list(map(lambda x: node_columns[x], id_node_inputs)), dtype=np.intp)
+            first_column = len(node_columns)
+            for id_node in id_nodes:
+                node_columns[id_node] = len(node_columns)
+
+            self._layers.append(
+                (
+                    input_columns,
+                    slice(first_column, len(node_columns)),
+                    # Transposed, so a batch of inputs [batch x inputs] is multiplied from the left
+                    np.ascontiguousarray(weights.T),
+                    np.asarray(layer["biases"], dtype=dtype),
+                    np.asarray(responses, dtype=dtype),
+                    CompiledNetwork._group_functions(layer["afunctions"], get_activation_function),
+                    list(
+                        map(
+                            lambda x: (x[0], x[1], weights[x[1]], mask[x[1]]),
+                            CompiledNetwork._group_functions(
+                                aggregation_functions, get_aggregation_function, skipped_function="sum"
+                            )
+                        )
+                    )
+                )
+            )
+
+        self._number_columns = len(node_columns)
+        self._output_columns = np.array(list(map(lambda x: node_columns[x], self.id_outputs)), dtype=np.intp)
+
+    @staticmethod
+    def _connections_mask(connections, id_nodes, id_node_inputs):
+        # A connection with a weight of 0 still takes part in aggregations such as product or min
+        rows = {id_node: row for row, id_node in enumerate(id_nodes)}
+        columns = {id_input: column for column, id_input in enumerate(id_node_inputs)}
+        mask = np.zeros([len(id_nodes), len(id_node_inputs)], dtype=bool)
+        for id_input, id_node in connections:
+            mask[rows[id_node], columns[id_input]] = True
+
+        return mask
+
+    @staticmethod
+    def _group_functions(function_names, get_function, skipped_function=None):
+        # [(<Function: Vectorized function>, <Int Array: Rows of the layer using it>)]
+        rows_per_function = {}
+        for row, function_name in enumerate(function_names):
+            if function_name != skipped_function:
+                rows_per_function.setdefault(function_name, []).append(row)
+
+        return list(
+            map(
+                lambda x: (get_function(x[0]), np.array(x[1], dtype=np.intp)),
+                rows_per_function.items()
+            )
+        )
+
+    @staticmethod
+    def from_genome_analyzer(genome_analyzer, dtype=np.float64):
+        # Sanity Check: Make sure the NumPy matrices have been deduced
+        assert genome_analyzer.weights_arrays is not None
+
+        layers = []
+        for layer_index, layer_nodes in enumerate(genome_analyzer.layers):
+            layers.append(
+                {
+                    "id_nodes": sorted(layer_nodes),
+                    "id_node_inputs": genome_analyzer.inputs_per_layer[layer_index],
+                    "weights": genome_analyzer.weights_arrays[layer_index],
+                    "mask": genome_analyzer.connection_masks_arrays[layer_index],
+                    "biases": genome_analyzer.biases_arrays[layer_index],
+                    "responses": genome_analyzer.responses_arrays[layer_index],
+                    "afunctions": list(
+                        map(
+                            lambda x: genome_analyzer.activation_functions[x] if x >= 0 else "",
+                            genome_analyzer.activation_codes_arrays[layer_index]
+                        )
+                    ),
+                    "aggregations": list(
+                        map(
+                            lambda x: genome_analyzer.aggregation_functions[x] if x >= 0 else "",
+                            genome_analyzer.aggregation_codes_arrays[layer_index]
+                        )
+                    )
+                }
+            )
+
+        return CompiledNetwork(
+            id_inputs=sorted(genome_analyzer.id_inputs, reverse=True),
+            id_outputs=sorted(genome_analyzer.id_outputs),
+            layers=layers,
+            dtype=dtype
+        )
+
+    @staticmethod
+    def _parse_node_id(formatted_node):
+        # Nodes are formatted as "<Name> (<ID>)"
+        return int(formatted_node[formatted_node.rindex("(") + 1:formatted_node.rindex(")")])
+
+    @staticmethod
+    def from_network_map(neural_network_map, dtype=np.float64):
+        layers = []
+        for layer in neural_network_map["layers"]:
+            layer = dict(layer)
+            if neural_network_map.get("format") == "csr":
+                # Expanding the CSR weights, the connections are known from the indices
+                weights = np.zeros([len(layer["id_nodes"]), len(layer["id_node_inputs"])], dtype=dtype)
+                mask = np.zeros(weights.shape, dtype=bool)
+                indptr = layer["indptr"]
+                for row in range(len(layer["id_nodes"])):
+                    weights[row, layer["indices"][indptr[row]:indptr[row + 1]]] = \
+                        layer["weights"][indptr[row]:indptr[row + 1]]
+                    mask[row, layer["indices"][indptr[row]:indptr[row + 1]]] = True
+
+                layer["weights"] = weights
+                layer["mask"] = mask
+
+            layers.append(layer)
+
+        return CompiledNetwork(
+            id_inputs=list(map(CompiledNetwork._parse_node_id, neural_network_map["inputs"])),
+            id_outputs=list(map(CompiledNetwork._parse_node_id, neural_network_map["outputs"])),
+            layers=layers,
+            dtype=dtype
+        )
+
+    @staticmethod
+    def from_json(filename, dtype=np.float64):
+        # Reading a network_dump.json file
+        with open(filename, "r") as infile:
+            return CompiledNetwork.from_network_map(neural_network_map=json.load(infile), dtype=dtype)
+
+    def activate(self, inputs):
+        '''
+            Evaluates a batch of inputs [batch x inputs] and returns the outputs [batch x outputs].
+            A single sample [inputs] returns a single row of outputs [outputs].
+        '''
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        single_sample = inputs.ndim == 1
+        inputs = np.atleast_2d(inputs)
+
+        # Sanity Check
+        assert inputs.shape[1] == len(self.id_inputs)
+
+        # Values of every node for every sample
+        values = np.zeros([inputs.shape[0], self._number_columns], dtype=self.dtype)
+        values[:, :len(self.id_inputs)] = inputs
+
+        for input_columns, node_columns, weights, biases, responses, activation_functions, aggregation_functions \
+                in self._layers:
+            layer_inputs = values[:, input_columns]
+
+            # Sum aggregation is a matrix product
+            layer_values = layer_inputs @ weights
+
+            # Other aggregations are applied to the weighted inputs [batch x nodes x inputs] of their nodes
+            for aggregation_function, rows, aggregation_weights, aggregation_mask in aggregation_functions:
+                layer_values[:, rows] = aggregation_function(
+                    layer_inputs[:, None, :] * aggregation_weights[None, :, :], aggregation_mask[None, :, :]
+                )
+
+            layer_values = biases + responses * layer_values
+
+            # Applying the activation functions
+            if len(activation_functions) == 1:
+                layer_values = activation_functions[0][0](layer_values)
+            else:
+                for activation_function, rows in activation_functions:
+                    layer_values[:, rows] = activation_function(layer_values[:, rows])
+
+            values[:, node_columns] = layer_values
+
+        outputs = values[:, self._output_columns]
+        return outputs[0] if single_sample else outputs
@@ -0,0 +1,200 @@
+from ..vectorized_functions import get_activation_function, get_aggregation_function
+import numpy as np
+
+
+class CompiledPopulation:
+    '''
+        Evaluates many feed forward networks with different topologies on a batch of inputs at once.
+
+        Networks are grouped in buckets by their number of layers. Inside a bucket, the weights of every layer are
+        padded and stacked into a [networks x nodes x inputs] array, so a layer of every network in the bucket is
+        evaluated with a single batched matrix product.
+
+        Inputs and outputs follow the CompiledNetwork ordering: input columns are sorted -1, -2, -3, ... and
+        output columns are sorted ascending.
+    '''
+    def __init__(self, genome_analyzers, dtype=np.float64):
+        # Sanity Check: Make sure every network has the same inputs and outputs
+        assert genome_analyzers
+        self.id_inputs = sorted(genome_analyzers[0].id_inputs, reverse=True)
+        self.id_outputs = sorted(genome_analyzers[0].id_outputs)
+        assert all(map(lambda x: sorted(x.id_inputs, reverse=True) == self.id_inputs, genome_analyzers))
+        assert all(map(lambda x: sorted(x.id_outputs) == self.id_outputs, genome_analyzers))
+
+        self.dtype = dtype
+        self.number_networks = len(genome_analyzers)
+
+        # Grouping networks by number of layers
+        networks_per_bucket = {}
+        for network_index, genome_analyzer in enumerate(genome_analyzers):
+            # Sanity Check: Make sure the NumPy matrices have been deduced
+            assert genome_analyzer.weights_arrays is not None
+            networks_per_bucket.setdefault(len(genome_analyzer.layers), []).append(network_index)
+
+        # Function names shared by every network
+        self._activation_function_names = []
+        self._aggregation_function_names = []
+        activation_codes = {}
+        aggregation_codes = {}
+
+        self._buckets = []
+        for number_layers, network_indexes in networks_per_bucket.items():
+            self._buckets.append(
+                self._compile_bucket(
+                    genome_analyzers=list(map(lambda x: genome_analyzers[x], network_indexes)),
+                    network_indexes=np.array(network_indexes, dtype=np.intp),
+                    number_layers=number_layers,
+                    activation_codes=activation_codes,
+                    aggregation_codes=aggregation_codes
+                )
+            )
+
+        self._activation_functions = list(map(get_activation_function, self._activation_function_names))
+        self._aggregation_functions = list(map(get_aggregation_function, self._aggregation_function_names))
+
+    @staticmethod
+    def _population_codes(function_names, population_codes, population_names):
+        # Translation of the function codes of a network into codes shared by the whole population.
+        # The code of a network is translated by indexing with code + 1, so unknown nodes (-1) stay unknown
+        translation = [-1]
+        for function_name in function_names:
+            if function_name not in population_codes:
+                population_codes[function_name] = len(population_names)
+                population_names.append(function_name)
+
+            translation.append(population_codes[function_name])
+
+        return np.array(translation, dtype=np.int32)
+
+    def _compile_bucket(self, genome_analyzers, network_indexes, number_layers, activation_codes, aggregation_codes):
+        number_networks = len(genome_analyzers)
+        number_inputs = len(self.id_inputs)
+
+        # Padded number of nodes and inputs of every layer
+        layer_sizes = list(
+            map(lambda x: max(map(lambda y: len(y.layers[x]), genome_analyzers)), range(number_layers))
+        )
+        layer_input_sizes = list(
+            map(lambda x: max(map(lambda y: len(y.inputs_per_layer[x]), genome_analyzers)), range(number_layers))
+        )
+
+        # Column layout of the values: a column of zeros, the inputs, then the padded nodes of every layer
+        layer_offsets = list(np.cumsum([1 + number_inputs] + layer_sizes))
+        number_columns = layer_offsets[-1]
+
+        # Padded arrays of every layer
+        layers = []
+        for layer_index in range(number_layers):
+            layer_shape = [number_networks, layer_sizes[layer_index], layer_input_sizes[layer_index]]
+            layers.append(
+                {
+                    # Padded inputs read the column of zeros
+                    "input_columns": np.zeros(layer_shape[::2], dtype=np.intp),
+                    "weights": np.zeros(layer_shape, dtype=self.dtype),
+                    "mask": np.zeros(layer_shape, dtype=bool),
+                    "biases": np.zeros(layer_shape[:2], dtype=self.dtype),
+                    "responses": np.ones(layer_shape[:2], dtype=self.dtype),
+                    # Padded nodes use the identity with no inputs, so they stay at 0
+                    "activation_codes": np.full(layer_shape[:2], -1, dtype=np.int32),
+                    "aggregation_codes": np.full(layer_shape[:2], -1, dtype=np.int32),
+                }
+            )
+
+        output_columns = np.zeros([number_networks, len(self.id_outputs)], dtype=np.intp)
+        for bucket_index, genome_analyzer in enumerate(genome_analyzers):
+            # Column of every node of the network
+            node_columns = {id_input: column + 1 for column, id_input in enumerate(self.id_inputs)}
+            for layer_index, layer_nodes in enumerate(genome_analyzer.layers):
+                for row, node_id in enumerate(sorted(layer_nodes)):
+                    node_columns[node_id] = layer_offsets[layer_index] + row
+
+            activation_translation = CompiledPopulation._population_codes(
+                function_names=genome_analyzer.activation_functions,
+                population_codes=activation_codes, population_names=self._activation_function_names
+            )
+            aggregation_translation = CompiledPopulation._population_codes(
+                function_names=genome_analyzer.aggregation_functions,
+                population_codes=aggregation_codes, population_names=self._aggregation_function_names
+            )
+
+            # Copying the layers of the network into the padded arrays
+            for layer_index, layer in enumerate(layers):
+                number_nodes, number_layer_inputs = genome_analyzer.weights_arrays[layer_index].shape
+                layer["input_columns"][bucket_index, :number_layer_inputs] = list(
+                    map(lambda x: node_columns[x], genome_analyzer.inputs_per_layer[layer_index])
+                )
+                layer["weights"][bucket_index, :number_nodes, :number_layer_inputs] = \
+                    genome_analyzer.weights_arrays[layer_index]
+                layer["mask"][bucket_index, :number_nodes, :number_layer_inputs] = \
+                    genome_analyzer.connection_masks_arrays[layer_index]
+                layer["biases"][bucket_index, :number_nodes] = genome_analyzer.biases_arrays[layer_index]
+                layer["responses"][bucket_index, :number_nodes] = genome_analyzer.responses_arrays[layer_index]
+                layer["activation_codes"][bucket_index, :number_nodes] = \
+                    activation_translation[genome_analyzer.activation_codes_arrays[layer_index] + 1]
+                layer["aggregation_codes"][bucket_index, :number_nodes] = \
+                    aggregation_translation[genome_analyzer.aggregation_codes_arrays[layer_index] + 1]
+
+            output_columns[bucket_index] = list(map(lambda x: node_columns[x], self.id_outputs))
+
+        # Layers are evaluated with the weights transposed, [networks x inputs x nodes]
+        for layer in layers:
+            layer["transposed_weights"] = np.ascontiguousarray(layer["weights"].transpose(0, 2, 1))
+
+        return network_indexes, number_columns, layers, layer_offsets, output_columns
+
+    def _apply_functions(self, values, codes, functions):
+        # Applies, to every node, the function given by its code. Nodes with code -1 are left untouched
+        for code in np.unique(codes):
+            if code >= 0:
+                values = np.where(codes[:, None, :] == code, functions[code](values), values)
+
+        return values
+
+    def activate(self, inputs):
+        '''
+            Evaluates every network on a batch of inputs and returns the outputs [networks x batch x outputs].
+
+            - inputs: [batch x inputs] shared by every network, or [networks x batch x inputs]
+        '''
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        assert inputs.shape[-1] == len(self.id_inputs) and inputs.ndim in [2, 3]
+        if inputs.ndim == 3:
+            assert inputs.shape[0] == self.number_networks
+
+        number_samples = inputs.shape[-2]
+        outputs = np.zeros([self.number_networks, number_samples, len(self.id_outputs)], dtype=self.dtype)
+
+        for network_indexes, number_columns, layers, layer_offsets, output_columns in self._buckets:
+            # Values of every node of every network for every sample
+            values = np.zeros([len(network_indexes), number_samples, number_columns], dtype=self.dtype)
+            values[:, :, 1:1 + len(self.id_inputs)] = inputs if inputs.ndim == 2 else inputs[network_indexes]
+
+            for layer_index, layer in enumerate(layers):
+                # Inputs of the layer of every network, [networks x batch x inputs]
+                layer_inputs = np.take_along_axis(values, layer["input_columns"][:, None, :], axis=2)
+
+                # Sum aggregation is a batched matrix product, [networks x batch x nodes]
+                layer_values = np.matmul(layer_inputs, layer["transposed_weights"])
+
+                # Other aggregations are applied to the weighted inputs, [networks x batch x nodes x inputs]
+                for code in np.unique(layer["aggregation_codes"]):
+                    if code < 0 or self._aggregation_function_names[code] == "sum":
+                        continue
+
+                    aggregated_values = self._aggregation_functions[code](
+                        layer_inputs[:, :, None, :] * layer["weights"][:, None, :, :], layer["mask"][:, None, :, :]
+                    )
+                    layer_values = np.where(
+                        layer["aggregation_codes"][:, None, :] == code, aggregated_values, layer_values
+                    )
+
+                layer_values = layer["biases"][:, None, :] + layer["responses"][:, None, :] * layer_values
+                layer_values = self._apply_functions(
+                    values=layer_values, codes=layer["activation_codes"], functions=self._activation_functions
+                )
+
+                values[:, :, layer_offsets[layer_index]:layer_offsets[layer_index + 1]] = layer_values
+
+            outputs[network_indexes] = np.take_along_axis(values, output_columns[:, None, :], axis=2)
+
+        return outputs
@@ -1,4 +1,6 @@
 class GenomeConnection:
+    __slots__ = ["identification_number", "enabled", "weight"]
+
     def __init__(self, identification_number, enabled, weight):
         self.identification_number = identification_number
         self.enabled = enabled
@@ -1,13 +1,50 @@
+from ..analysis_cache import structural_hash
+from .genome_graph import GenomeGraph
+from .connection import GenomeConnection
+from .genome_tables import ConnectionTable, NodeTable
+from itertools import chain
 import numpy as np
 
 
 class GenomeAnalyzer:
-    def __init__(self, id_inputs, id_outputs, connections, nodes):
+    # Modes used to filter connections
+    FILTER_MODE_REACHABILITY = "reachability"
+    FILTER_MODE_RECURSIVE = "recursive"
+
+    # Modes used to construct layers
+    LAYERING_MODE_TOPOLOGICAL = "topological"
+    LAYERING_MODE_PATHS = "paths"
+
+    def __init__(self, id_inputs, id_outputs, connections, nodes, keep_bias_nodes=False):
+        '''
+            - connections: [<GenomeConnection Object>] or <ConnectionTable Object>
+            - nodes: [<GenomeNode Object>] or <NodeTable Object>
+            - keep_bias_nodes: nodes without incoming connections are sources like the inputs, so the ones leading
+                to an output are kept with their connections and evaluate to activation(bias), like in
+                neat.nn.FeedForwardNetwork. By default they are dropped, as they do not depend on the inputs
+
+            When a connection table is given, connections are filtered on its arrays and connection objects are only
+            created for the useful connections, so self.connections is None until the connections are filtered.
+            Weights, biases and functions are read from the arrays of the tables when building the matrices.
+        '''
+        # Tables of the genome
+        self._connection_table = None
+        self._node_table = None
+        # After a structural delta, the lists of connections and nodes are created from the graphs when needed
+        self._lists_from_graphs = False
+        if isinstance(connections, ConnectionTable):
+            self._connection_table = connections
+            connections = None
+        if isinstance(nodes, NodeTable):
+            self._node_table = nodes
+            nodes = nodes.to_nodes()
+
         # Useful Public Variables
         self.id_inputs = id_inputs
         self.id_outputs = id_outputs
         self.connections = connections
         self.nodes = nodes
+        self.keep_bias_nodes = keep_bias_nodes
 
         self.all_paths = None
 
@@ -17,6 +54,29 @@ class GenomeAnalyzer:
         self.weights_matrix = None
         self.biases_matrix = None
         self.activation_functions_matrix = None
+        self.aggregation_functions_matrix = None
+        self.responses_matrix = None
+        self.connections_matrix = None
+
+        self.weights_arrays = None
+        self.biases_arrays = None
+        self.activation_codes_arrays = None
+        self.activation_functions = None
+        self.aggregation_codes_arrays = None
+        self.aggregation_functions = None
+        self.responses_arrays = None
+        self.connection_masks_arrays = None
+
+        self.sparse_weights_arrays = None
+
+        # Adjacency index of the connections, rebuilt whenever the connections change. With a connection table, the
+        # connections are filtered on the table, so the index is only built when it is needed
+        self._graph = GenomeGraph(connections=self.connections, nodes=self.nodes) \
+            if self._connection_table is None else None
+
+        # Connections given to the analyzer, genomes refreshed later must have the same connection keys. With a
+        # connection table, they are created from the table the first time they are needed
+        self._genome_connections = connections
 
         # Parameters used to filter connections
         self._end_layer = None
@@ -29,44 +89,83 @@ class GenomeAnalyzer:
         # Parameters used to deduce layers from paths
         self._created_layers = False
 
+        # Parameters used to update the analysis incrementally
+        self._genome_graph = None
+        self._reached_from_inputs = None
+        self._reaching_outputs = None
+        self._source_node_ids = None
+        self._node_distances = None
+        self._nodes_per_distance = None
+        self._inputs_per_distance = None
+
         # Parameters used for matrices deduction
+        self._layer_nodes = None
+        self._node_positions = None
+        self._input_columns = None
+        self._connection_keys = None
+        self._connection_slots = None
+        self._connection_rows = None
+        self._node_rows = None
+        self._dense_layer_connections = None
+        self._sparse_layer_connections = None
+        self._sparse_connections_enabled = None
+        self._deduced_numpy_matrices = False
+        self._deduced_sparse_matrices = False
         self._deduced_matrices = False
 
-    def _connection_discovery_recursion(self, connection):
+    def _discover_connections(self, connection):
+        '''
+            Connections found after the given connection that lead to a node of self._end_layer.
+
+            Iterative depth first search, connections are evaluated after all the connections they lead to, and each
+            connection is explored only once.
+        '''
+        # The connection ends with a node in end_layer, so the connection is useful
         if connection.identification_number[self._analyze_connection_position] in self._end_layer:
-            # Check if the connection ends with a node in end_layer, if so, then the connection is useful
             return [connection]
-        else:
-            # Discover connections
-            connections_discovered = list(
-                filter(
-                    # Connection position is either 0 or 1
-                    lambda x: connection.identification_number[self._analyze_connection_position] ==
-                              x.identification_number[1 - self._analyze_connection_position],
-                    self.connections
-                )
-            )
 
-            if connections_discovered:
-                useful_connections = []
+        # Usefulness of every explored connection: {<Tuple: Connection Key>: <Bool>}
+        useful_connections = {}
+        pending = [(connection, False)]
+        while pending:
+            current_connection, are_children_explored = pending.pop()
+            connection_key = current_connection.identification_number
+            if connection_key in useful_connections:
+                continue
+
+            # Discover connections. Connection position is either 0 or 1
+            if connection_key[self._analyze_connection_position] in self._end_layer:
+                connections_discovered = []
+            elif self._analyze_connection_position == 1:
+                connections_discovered = self._graph.outgoing_connections(connection_key[1])
+            else:
+                connections_discovered = self._graph.incoming_connections(connection_key[0])
 
-                # More connections found, keep exploring
-                for connection_discovered in connections_discovered:
-                    result = self._connection_discovery_recursion(
-                        connection=connection_discovered
+            if are_children_explored:
+                # A connection is useful if it ends in end_layer or leads to a useful connection
+                useful_connections[connection_key] = \
+                    connection_key[self._analyze_connection_position] in self._end_layer or any(
+                        map(lambda x: useful_connections[x.identification_number], connections_discovered)
+                    )
+            else:
+                # Explore the connections it leads to first
+                pending.append((current_connection, True))
+                pending += list(
+                    map(
+                        lambda x: (x, False),
+                        filter(lambda x: x.identification_number not in useful_connections, connections_discovered)
                     )
+                )
 
-                    # Add found connections
-                    if result:
-                        result.append(connection_discovered)
-                        useful_connections += list(
-                            filter(lambda x: x not in useful_connections, result)
-                        )
+        # The given connection is not part of the result
+        del useful_connections[connection.identification_number]
 
-                return useful_connections
-            else:
-                # Dead end, connection is useless
-                return []
+        return list(
+            map(
+                self._graph.get_connection,
+                filter(lambda x: useful_connections[x], useful_connections)
+            )
+        )
 
     def _top_down_discover_connections(self, input_connection):
         # Make sure the parameters are at default values
@@ -77,7 +176,7 @@ class GenomeAnalyzer:
         self._end_layer = self.id_outputs
 
         # Filter
-        connections = self._connection_discovery_recursion(
+        connections = self._discover_connections(
             connection=input_connection
         )
 
@@ -93,10 +192,10 @@ class GenomeAnalyzer:
 
         # Setting parameters
         self._analyze_connection_position = 0
-        self._end_layer = self.id_inputs
+        self._end_layer = set(self._source_nodes(graph=self._graph))
 
         # Filter
-        connections = self._connection_discovery_recursion(
+        connections = self._discover_connections(
             connection=output_connection
         )
 
@@ -106,14 +205,11 @@ class GenomeAnalyzer:
 
         return connections
 
-    def filter_useful_connections(self):
-        # Sanity Check: Make sure connections have not been filtered yet
-        assert not self._are_connections_filtered
-
+    def _recursive_useful_connection_keys(self):
         # TOP DOWN ANALYSIS
-        initial_top_down_connections = list(
-            filter(lambda x: x.identification_number[0] in self.id_inputs, self.connections)
-        )
+        initial_top_down_connections = []
+        for id_input in self._source_nodes(graph=self._graph):
+            initial_top_down_connections += self._graph.outgoing_connections(id_input)
         top_down_useful_connections = []
 
         for connection in initial_top_down_connections:
@@ -125,12 +221,12 @@ class GenomeAnalyzer:
                 filter(lambda x: x not in top_down_useful_connections, discovered_connections)
             )
 
-        top_down_useful_connections = list(map(lambda x: x.identification_number, top_down_useful_connections))
+        top_down_useful_connections = set(map(lambda x: x.identification_number, top_down_useful_connections))
 
         # BOTTOM UP ANALYSIS
-        initial_bottom_up_connections = list(
-            filter(lambda x: x.identification_number[1] in self.id_outputs, self.connections)
-        )
+        initial_bottom_up_connections = []
+        for id_output in self.id_outputs:
+            initial_bottom_up_connections += self._graph.incoming_connections(id_output)
         bottom_up_useful_connections = []
 
         for connection in initial_bottom_up_connections:
@@ -141,74 +237,202 @@ class GenomeAnalyzer:
             bottom_up_useful_connections += list(
                 filter(lambda x: x not in bottom_up_useful_connections, discovered_connections)
             )
-        bottom_up_useful_connections = list(map(lambda x: x.identification_number, bottom_up_useful_connections))
+        bottom_up_useful_connections = set(map(lambda x: x.identification_number, bottom_up_useful_connections))
 
-        # -----
+        return top_down_useful_connections & bottom_up_useful_connections
 
-        # Obtaining the useful connections
-        useful_connections = list(
+    @property
+    def connections(self):
+        if self._connections is None and self._lists_from_graphs:
+            self._connections = list(self._graph.connections_by_key.values())
+
+        return self._connections
+
+    @connections.setter
+    def connections(self, connections):
+        self._connections = connections
+
+    @property
+    def nodes(self):
+        if self._nodes is None and self._lists_from_graphs:
+            self._nodes = list(self._genome_graph.nodes_by_id.values())
+
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes):
+        self._nodes = nodes
+
+    def _is_source_node(self, node_id, graph):
+        # Inputs, and bias nodes if they are kept: nodes with outgoing connections but no incoming ones
+        return node_id in self.id_inputs or (
+            self.keep_bias_nodes and node_id in graph.forward_adjacency and node_id not in graph.reverse_adjacency
+            and node_id not in self.id_outputs
+        )
+
+    def _source_nodes(self, graph):
+        # Nodes where the exploration of the genome starts: the inputs, then the bias nodes if they are kept
+        if not self.keep_bias_nodes:
+            return list(self.id_inputs)
+
+        return list(self.id_inputs) + sorted(
+            filter(lambda x: x not in self.id_inputs and self._is_source_node(x, graph), graph.forward_adjacency)
+        )
+
+    def _reachability_useful_connection_keys(self):
+        # Nodes reached from the inputs. Exploration stops at the outputs, like the top down analysis does
+        reached_from_inputs = self._graph.forward_reachable_nodes(
+            sources=self._source_nodes(graph=self._graph), blocked_nodes=self.id_outputs
+        )
+
+        # Nodes that reach the outputs. Exploration stops at the inputs, like the bottom up analysis does
+        reaching_outputs = self._graph.backward_reachable_nodes(
+            sources=self.id_outputs, blocked_nodes=self.id_inputs
+        )
+
+        # A connection is useful if it is reached from an input and leads to an output
+        return set(
             filter(
-                lambda x: x.identification_number in bottom_up_useful_connections and
-                          x.identification_number in top_down_useful_connections,
-                self.connections
+                lambda x: x[0] in reached_from_inputs and x[0] not in self.id_outputs and x[1] in reaching_outputs,
+                self._graph.connections_by_key
             )
         )
 
+    def filter_useful_connections(self, mode=FILTER_MODE_REACHABILITY):
+        # Sanity Check: Make sure connections have not been filtered yet
+        assert not self._are_connections_filtered
+        assert mode in [GenomeAnalyzer.FILTER_MODE_REACHABILITY, GenomeAnalyzer.FILTER_MODE_RECURSIVE]
+
+        if mode == GenomeAnalyzer.FILTER_MODE_REACHABILITY and self._connection_table is not None:
+            # Cycles are reported and connections filtered on the arrays of the table, in the order of the table
+            useful_mask = self._connection_table.useful_connections_mask(
+                id_inputs=self.id_inputs, id_outputs=self.id_outputs, keep_bias_nodes=self.keep_bias_nodes
+            )
+            self._connection_rows = np.flatnonzero(useful_mask)
+            useful_connections = self._connection_table.to_connections(rows=self._connection_rows)
+        else:
+            if self._graph is None:
+                self.connections = self._genome_connection_list()
+                self._graph = GenomeGraph(connections=self.connections, nodes=self.nodes)
+
+            # Cycles are reported before exploring the genome
+            self._graph.check_acyclic()
+
+            if mode == GenomeAnalyzer.FILTER_MODE_REACHABILITY:
+                useful_connection_keys = self._reachability_useful_connection_keys()
+            else:
+                useful_connection_keys = self._recursive_useful_connection_keys()
+
+            # Obtaining the useful connections
+            useful_connections = list(
+                filter(lambda x: x.identification_number in useful_connection_keys, self.connections)
+            )
+
         # Change self parameters
         self.connections = useful_connections
+        self._graph = GenomeGraph(connections=self.connections, nodes=self.nodes)
         self._are_connections_filtered = True
 
-    def _discover_path(self, connection, discovered_path):
-        if connection.identification_number[1] in self.id_outputs:
-            # End of path, just append the last connection
-            discovered_path.append(connection)
-            self.all_paths.append(discovered_path.copy())
-        else:
-            # Discover next connections
-            next_connections = list(
+    def iterate_connection_paths(self, max_paths=None, max_depth=None):
+        '''
+            Lazily yields every input to output path as a tuple of connection keys.
+
+            - max_paths: Stop after yielding this number of paths
+            - max_depth: Do not explore paths with more connections than this number
+        '''
+        # Make sure connections have been filtered
+        assert self._are_connections_filtered
+        assert max_paths is None or max_paths >= 0
+        assert max_depth is None or max_depth > 0
+
+        number_paths = 0
+        for id_input in self._source_nodes(graph=self._graph):
+            # Depth first search. The discovered path is shared by every path with the same prefix
+            discovered_path = []
+            next_connections = [iter(self._graph.forward_adjacency.get(id_input, ()))]
+
+            while next_connections:
+                if max_paths is not None and number_paths >= max_paths:
+                    return
+
+                connection_key = next(next_connections[-1], None)
+                if connection_key is None:
+                    # Every connection at this depth has been explored, going back
+                    next_connections.pop()
+                    if discovered_path:
+                        discovered_path.pop()
+                    continue
+
+                discovered_path.append(connection_key)
+                if connection_key[1] in self.id_outputs:
+                    # End of path
+                    number_paths += 1
+                    yield tuple(discovered_path)
+                    discovered_path.pop()
+                elif max_depth is not None and len(discovered_path) >= max_depth:
+                    # Budget exceeded, do not go deeper
+                    discovered_path.pop()
+                else:
+                    # Keep exploring
+                    next_connections.append(iter(self._graph.forward_adjacency.get(connection_key[1], ())))
+
+    def count_connection_paths(self):
+        '''
+            Counts the input to output paths without enumerating them.
+
+            Returns the number of paths, the length of the longest path and the length of the shortest path.
+            Lengths are measured in connections and are None if there are no paths.
+        '''
+        # Make sure connections have been filtered
+        assert self._are_connections_filtered
+
+        # Number of paths, longest and shortest length from each node to the outputs
+        number_paths = {}
+        longest_lengths = {}
+        shortest_lengths = {}
+
+        # Every node is visited after all the nodes it connects to
+        for node_id in self._graph.reverse_topological_order():
+            if node_id in self.id_outputs:
+                number_paths[node_id], longest_lengths[node_id], shortest_lengths[node_id] = 1, 0, 0
+                continue
+
+            useful_next_nodes = list(
                 filter(
-                    lambda x: connection.identification_number[1] == x.identification_number[0],
-                    self.connections
+                    lambda x: number_paths[x] > 0,
+                    map(lambda x: x[1], self._graph.forward_adjacency.get(node_id, ()))
                 )
             )
+            number_paths[node_id] = sum(map(lambda x: number_paths[x], useful_next_nodes))
+            if useful_next_nodes:
+                longest_lengths[node_id] = max(map(lambda x: longest_lengths[x], useful_next_nodes)) + 1
+                shortest_lengths[node_id] = min(map(lambda x: shortest_lengths[x], useful_next_nodes)) + 1
 
-            # Append current connection to the discovered path so far
-            discovered_path.append(connection)
+        # Only the paths that start in the inputs (or the bias nodes) are taken into account
+        useful_inputs = list(filter(lambda x: number_paths.get(x, 0) > 0, self._source_nodes(graph=self._graph)))
+        if not useful_inputs:
+            return 0, None, None
 
-            # More connections found, keep exploring
-            for next_connection in next_connections:
-                self._discover_path(
-                    connection=next_connection,
-                    discovered_path=discovered_path.copy()
-                )
+        return sum(map(lambda x: number_paths[x], useful_inputs)), \
+            max(map(lambda x: longest_lengths[x], useful_inputs)), \
+            min(map(lambda x: shortest_lengths[x], useful_inputs))
 
     def discover_all_connection_paths(self):
         # Make sure connections have been filtered
         assert self._are_connections_filtered and not self._all_paths_found
 
-        # Initialize Paths variable
-        self.all_paths = []
-
-        # Filter all connections that contain the inputs
-        initial_connections = list(
-            filter(lambda x: x.identification_number[0] in self.id_inputs, self.connections)
-        )
-
-        # Iterate for each connection
-        for connection in initial_connections:
-            # Get input's path to output
-            self._discover_path(
-                connection=connection,
-                discovered_path=[]
+        # Get every input's path to output
+        self.all_paths = list(
+            map(
+                lambda x: list(map(self._graph.get_connection, x)),
+                self.iterate_connection_paths()
             )
+        )
 
         # Set Flag
         self._all_paths_found = True
 
-    def construct_layers(self):
-        # Sanity Check
-        assert self._all_paths_found and not self._created_layers
-
+    def _paths_layers(self):
         # Sort all paths based on length and then reverse
         self.all_paths.sort(key=len)
         self.all_paths.reverse()
@@ -268,104 +492,826 @@ class GenomeAnalyzer:
                         layers[found_in_layer].remove(node)
                         layers[node_index].append(node)
 
+        # Bias nodes start paths without being the output of a connection, they go right before the deepest node
+        # they connect to
+        for node_id in self._source_nodes(graph=self._graph)[len(self.id_inputs):]:
+            layer_index = max(
+                map(
+                    lambda x: next(filter(lambda y: x[1] in layers[y], range(len(layers)))),
+                    self._graph.forward_adjacency[node_id]
+                )
+            ) + 1
+            if layer_index == len(layers):
+                layers.append([])
+            layers[layer_index].append(node_id)
+
+        return layers
+
+    def _topological_layers(self):
+        # Longest distance (in connections) from every node to the outputs, outputs are at distance 0
+        distances = dict.fromkeys(self.id_outputs, 0)
+
+        # Every node is visited after all the nodes it connects to, so it is pushed to the deepest layer it can be in
+        for node_id in self._graph.reverse_topological_order():
+            distances[node_id] = max(
+                map(lambda x: distances[x[1]] + 1, self._graph.forward_adjacency.get(node_id, ())),
+                default=0
+            )
+
+        # Inputs are not part of the layers
+        layer_distances = [distance for node_id, distance in distances.items() if node_id not in self.id_inputs]
+
+        # Placing every node in the layer given by its distance to the outputs
+        layers = [[] for _ in range(max(layer_distances) + 1)]
+        for node_id, distance in distances.items():
+            if node_id not in self.id_inputs and node_id not in self.id_outputs:
+                layers[distance].append(node_id)
+        layers[0] = list(self.id_outputs)
+
+        return layers
+
+    def construct_layers(self, mode=LAYERING_MODE_TOPOLOGICAL):
+        # Sanity Check
+        assert mode in [GenomeAnalyzer.LAYERING_MODE_TOPOLOGICAL, GenomeAnalyzer.LAYERING_MODE_PATHS]
+        assert self._are_connections_filtered and not self._created_layers
+
+        # Layers are deduced from the output layer to the input layer
+        if mode == GenomeAnalyzer.LAYERING_MODE_TOPOLOGICAL:
+            layers = self._topological_layers()
+        else:
+            # Sanity Check: Paths are needed to deduce the layers
+            assert self._all_paths_found
+            layers = self._paths_layers()
+
         # Clean Up
         self.layers = list(map(lambda x: set(x), layers))
 
         # Getting inputs for each layer
-        self.inputs_per_layer = []
-        for layer in self.layers:
-            # Getting all connections that contain as output the nodes of the layer
-            inputs_of_layer = list(
+        self.inputs_per_layer = list(map(self._layer_inputs, self.layers))
+
+        # Clean Up
+        self.layers.reverse()
+        self.inputs_per_layer.reverse()
+
+        # Setting flag
+        self._created_layers = True
+
+    def _layer_inputs(self, layer):
+        # Getting all connections that contain as output the nodes of the layer
+        inputs_of_layer = []
+        for node_id in layer:
+            inputs_of_layer += map(lambda x: x[0], self._graph.reverse_adjacency.get(node_id, ()))
+
+        # Removing duplicates
+        inputs_of_layer = list(dict.fromkeys(inputs_of_layer))
+
+        # Sorting inputs in the layer_inputs, so everything is still in order
+        negative_id_inputs = list(
+            filter(lambda x: x < 0, inputs_of_layer)
+        )
+        negative_id_inputs.sort(reverse=True)
+        positive_id_inputs = list(
+            filter(lambda x: x >= 0, inputs_of_layer)
+        )
+        positive_id_inputs.sort(reverse=False)
+
+        return negative_id_inputs + positive_id_inputs
+
+    def structural_hash(self):
+        # Hash of the topology, computed before the connections are filtered so that it identifies the genome
+        return structural_hash(
+            id_inputs=self.id_inputs, id_outputs=self.id_outputs,
+            connections=self._connection_table.keys() if self.connections is None else self.connections,
+            keep_bias_nodes=self.keep_bias_nodes
+        )
+
+    def _genome_connection_list(self):
+        # Every connection of the genome, created from the connection table, or from the graph after a structural
+        # delta, the first time it is needed
+        if self._genome_connections is None:
+            self._genome_connections = list(self._genome_graph.connections_by_key.values()) \
+                if self._lists_from_graphs else self._connection_table.to_connections()
+
+        return self._genome_connections
+
+    def _genome_connection_keys(self):
+        if self._genome_connections is None and not self._lists_from_graphs:
+            return self._connection_table.keys()
+        if self._genome_connections is None:
+            return list(self._genome_graph.connections_by_key)
+
+        return list(map(lambda x: x.identification_number, self._genome_connections))
+
+    def get_topology(self):
+        '''
+            Result of the topology analysis, it does not depend on the weights, biases or functions of the genome:
+            - useful_connections: [<Tuple: Connection Key>]
+            - layers: [[<Int: Node ID>]]
+            - inputs_per_layer: [[<Int: Node ID>]]
+            - node_positions: {<Int: Node ID>: (<Int: Layer Index>, <Int: Row>)}
+            - input_columns: [{<Int: Input Node ID>: <Int: Column>}]
+        '''
+        # Sanity Check: Make sure layers have been deduced
+        assert self._created_layers
+
+        self._build_layer_indexes()
+        return {
+            "useful_connections": sorted(map(lambda x: x.identification_number, self.connections)),
+            "layers": list(map(list, self._layer_nodes)),
+            "inputs_per_layer": list(map(list, self.inputs_per_layer)),
+            "node_positions": self._node_positions,
+            "input_columns": self._input_columns,
+        }
+
+    def apply_topology(self, topology):
+        '''
+            Replaces filter_useful_connections and construct_layers with the topology of a genome with the same
+            structural hash, given by get_topology. The weights of the connections of this genome are kept.
+        '''
+        # Sanity Check: Make sure connections have not been filtered yet
+        assert not self._are_connections_filtered and not self._created_layers
+
+        # Obtaining the useful connections
+        useful_connection_keys = set(topology["useful_connections"])
+        if self.connections is None:
+            # Useful connections keep the order of the connection table
+            self._connection_rows = np.sort(self._connection_table.rows(useful_connection_keys))
+            assert not len(self._connection_rows) or self._connection_rows[0] >= 0
+            self.connections = self._connection_table.to_connections(rows=self._connection_rows)
+        else:
+            self.connections = list(
+                filter(lambda x: x.identification_number in useful_connection_keys, self.connections)
+            )
+        self._graph = GenomeGraph(connections=self.connections, nodes=self.nodes)
+
+        # Sanity Check: Make sure the topology belongs to a genome with the same connections
+        assert len(self.connections) == len(useful_connection_keys)
+
+        self.layers = list(map(set, topology["layers"]))
+        self.inputs_per_layer = list(map(list, topology["inputs_per_layer"]))
+
+        # Indexes are reused when available
+        if "node_positions" in topology:
+            self._layer_nodes = list(map(list, topology["layers"]))
+            self._node_positions = topology["node_positions"]
+            self._input_columns = topology["input_columns"]
+
+        # Setting flags
+        self._are_connections_filtered = True
+        self._created_layers = True
+
+    def _build_incremental_state(self):
+        # State is only built once, from the current analysis
+        if self._genome_graph is not None:
+            return
+
+        # Every connection of the genome, useful or not
+        self._genome_graph = GenomeGraph(connections=self._genome_connection_list(), nodes=self.nodes)
+        self._reached_from_inputs = self._genome_graph.forward_reachable_nodes(
+            sources=self._source_nodes(graph=self._genome_graph), blocked_nodes=self.id_outputs
+        )
+        self._reaching_outputs = self._genome_graph.backward_reachable_nodes(
+            sources=self.id_outputs, blocked_nodes=self.id_inputs
+        )
+        self._source_node_ids = set(self._source_nodes(graph=self._genome_graph))
+
+        # Distance of every node of the layers to the outputs, nodes and inputs of the layer at every distance. The
+        # sets of nodes are replaced, never modified, so they are shared with self.layers
+        self._node_distances = {}
+        self._nodes_per_distance = {}
+        self._inputs_per_distance = {}
+        for layer_index, layer in enumerate(self.layers):
+            distance = len(self.layers) - 1 - layer_index
+            self._nodes_per_distance[distance] = layer
+            self._inputs_per_distance[distance] = self.inputs_per_layer[layer_index]
+            for node_id in layer:
+                self._node_distances[node_id] = distance
+
+    def _lists_to_attributes(self):
+        # Creates the lists left to the graphs by a structural delta, before the graphs are dropped
+        if self._lists_from_graphs:
+            self.connections, self.nodes, self._genome_connections = \
+                self.connections, self.nodes, self._genome_connection_list()
+            self._lists_from_graphs = False
+
+    def _update_reachability(self, reached_nodes, start_nodes, sources, blocked_nodes, forward):
+        # Only the nodes explored from the start nodes may change, they are updated in topological order
+        if forward:
+            affected_nodes = self._genome_graph.forward_reachable_nodes(
+                sources=start_nodes, blocked_nodes=blocked_nodes
+            )
+            order = list(reversed(self._genome_graph.subset_reverse_topological_order(affected_nodes)))
+            adjacency, position = self._genome_graph.reverse_adjacency, 0
+        else:
+            affected_nodes = self._genome_graph.backward_reachable_nodes(
+                sources=start_nodes, blocked_nodes=blocked_nodes
+            )
+            order = self._genome_graph.subset_reverse_topological_order(affected_nodes)
+            adjacency, position = self._genome_graph.forward_adjacency, 1
+
+        changed_nodes = set()
+        for node_id in order:
+            # A node is reached if it is a source or a reached node, that is explored, connects to it
+            is_reached = node_id in sources or any(
                 map(
-                    lambda x: x.identification_number[0],
-                    filter(lambda x: x.identification_number[1] in layer, self.connections)
+                    lambda x: x[position] in reached_nodes and x[position] not in blocked_nodes,
+                    adjacency.get(node_id, ())
                 )
             )
+            if is_reached != (node_id in reached_nodes):
+                changed_nodes.add(node_id)
+                if is_reached:
+                    reached_nodes.add(node_id)
+                else:
+                    reached_nodes.discard(node_id)
+
+        return changed_nodes
+
+    def _is_useful_connection(self, connection_key):
+        # Same rule as filter_useful_connections
+        return connection_key in self._genome_graph.connections_by_key \
+            and connection_key[0] in self._reached_from_inputs and connection_key[0] not in self.id_outputs \
+            and connection_key[1] in self._reaching_outputs
+
+    def _reset_derived_analysis(self):
+        # Paths, indexes and matrices have to be deduced again
+        self.all_paths = None
+        self._all_paths_found = False
+
+        self.weights_matrix = None
+        self.biases_matrix = None
+        self.activation_functions_matrix = None
+        self.aggregation_functions_matrix = None
+        self.responses_matrix = None
+        self.connections_matrix = None
+
+        self.weights_arrays = None
+        self.biases_arrays = None
+        self.activation_codes_arrays = None
+        self.activation_functions = None
+        self.aggregation_codes_arrays = None
+        self.aggregation_functions = None
+        self.responses_arrays = None
+        self.connection_masks_arrays = None
+        self.sparse_weights_arrays = None
+
+        self._layer_nodes = None
+        self._node_positions = None
+        self._input_columns = None
+        self._connection_keys = None
+        self._connection_slots = None
+        self._connection_rows = None
+        self._node_rows = None
+        self._dense_layer_connections = None
+        self._sparse_layer_connections = None
+        self._sparse_connections_enabled = None
+        self._deduced_numpy_matrices = False
+        self._deduced_sparse_matrices = False
+        self._deduced_matrices = False
 
-            # Removing duplicates
-            inputs_of_layer = list(dict.fromkeys(inputs_of_layer))
+    def apply_structural_delta(self, added_connections=(), removed_connection_keys=(), added_nodes=(),
+                               removed_node_ids=(), verify=False):
+        '''
+            Updates the useful connections, layers and inputs per layer after a structural mutation, without
+            analyzing the whole genome again. Only the nodes whose reachability or distance to the outputs can
+            change are visited, and only the layers holding them are built again, so the cost depends on the
+            affected subgraph and the number of layers, not on the size of the genome. self.connections, self.nodes
+            and the connections of the genome are listed again from the graphs the first time they are read. Paths
+            and matrices have to be deduced again afterwards.
+
+            - added_connections: [<GenomeConnection Object>], a connection with a known key replaces the previous one
+            - removed_connection_keys: [<Tuple: Connection Key>]
+            - added_nodes: [<GenomeNode Object>]
+            - removed_node_ids: [<Int: Node ID>], their connections must be removed too
+            - verify: compares the result with a full analysis of the new genome
+        '''
+        # Sanity Check: Make sure layers have been deduced
+        assert self._created_layers
+
+        self._build_incremental_state()
+
+        # Updating nodes
+        removed_node_ids = set(removed_node_ids)
+        for node_id in removed_node_ids:
+            self._genome_graph.nodes_by_id.pop(node_id, None)
+            self._graph.nodes_by_id.pop(node_id, None)
+        for node in added_nodes:
+            self._genome_graph.nodes_by_id[node.node_id] = node
+            self._graph.nodes_by_id[node.node_id] = node
+
+        # Updating the connections of the genome, the nodes they join may become sources or stop being sources
+        endpoint_nodes = set(removed_connection_keys).union(
+            map(lambda x: x.identification_number, added_connections)
+        )
+        endpoint_nodes = set(map(lambda x: x[0], endpoint_nodes)) | set(map(lambda x: x[1], endpoint_nodes))
+        previous_sources = set(filter(lambda x: self._is_source_node(x, self._genome_graph), endpoint_nodes))
+        changed_connection_keys = set()
+        for connection_key in removed_connection_keys:
+            self._genome_graph.remove_connection(connection_key=connection_key)
+            changed_connection_keys.add(connection_key)
+        for connection in added_connections:
+            self._genome_graph.add_connection(connection=connection)
+            changed_connection_keys.add(connection.identification_number)
+
+        # Sanity Check: Removed nodes must not have connections
+        assert not any(map(self._genome_graph.has_connections, removed_node_ids))
+
+        # Updating reachability from the changed connections
+        sources = set(filter(lambda x: self._is_source_node(x, self._genome_graph), endpoint_nodes))
+        self._source_node_ids = (self._source_node_ids - previous_sources) | sources
+        forward_changed_nodes = self._update_reachability(
+            reached_nodes=self._reached_from_inputs,
+            start_nodes=set(map(lambda x: x[1], changed_connection_keys)) | (sources ^ previous_sources),
+            sources=self._source_node_ids, blocked_nodes=self.id_outputs, forward=True
+        )
+        backward_changed_nodes = self._update_reachability(
+            reached_nodes=self._reaching_outputs, start_nodes=set(map(lambda x: x[0], changed_connection_keys)),
+            sources=self.id_outputs, blocked_nodes=self.id_inputs, forward=False
+        )
 
-            # Sorting inputs in the layer_inputs, so everything is still in order
-            negative_id_inputs = list(
-                filter(lambda x: x < 0, inputs_of_layer)
+        # Connections whose usefulness may have changed
+        for node_id in forward_changed_nodes:
+            changed_connection_keys.update(self._genome_graph.forward_adjacency.get(node_id, ()))
+        for node_id in backward_changed_nodes:
+            changed_connection_keys.update(self._genome_graph.reverse_adjacency.get(node_id, ()))
+
+        # Updating the useful connections
+        changed_useful_keys = set()
+        for connection_key in changed_connection_keys:
+            is_useful = self._is_useful_connection(connection_key=connection_key)
+            was_useful = connection_key in self._graph.connections_by_key
+            if is_useful:
+                self._graph.add_connection(connection=self._genome_graph.get_connection(connection_key))
+            elif was_useful:
+                self._graph.remove_connection(connection_key=connection_key)
+
+            if is_useful != was_useful:
+                changed_useful_keys.add(connection_key)
+
+        # Distances to the outputs may only change for the ancestors of the changed useful connections
+        changed_nodes = set(map(lambda x: x[0], changed_useful_keys)) | set(map(lambda x: x[1], changed_useful_keys))
+        affected_nodes = self._graph.backward_reachable_nodes(sources=changed_nodes)
+        touched_distances = set(map(lambda x: self._node_distances.get(x[1]), changed_useful_keys))
+        moved_nodes = {}
+        for node_id in self._graph.subset_reverse_topological_order(affected_nodes):
+            if node_id in self.id_inputs:
+                continue
+
+            previous_distance = self._node_distances.get(node_id)
+            if node_id in self.id_outputs:
+                self._node_distances[node_id] = 0
+            elif self._graph.has_connections(node_id):
+                self._node_distances[node_id] = max(
+                    map(lambda x: self._node_distances[x[1]] + 1, self._graph.forward_adjacency.get(node_id, ())),
+                    default=0
+                )
+            else:
+                # The node is not part of the network anymore
+                self._node_distances.pop(node_id, None)
+
+            distance = self._node_distances.get(node_id)
+            touched_distances.update([previous_distance, distance])
+            if distance != previous_distance:
+                moved_nodes[node_id] = (previous_distance, distance)
+        touched_distances.discard(None)
+
+        # Moving the nodes whose distance changed, only the sets of their layers are replaced
+        left_nodes, joined_nodes = {}, {}
+        for node_id, (previous_distance, distance) in moved_nodes.items():
+            if previous_distance is not None:
+                left_nodes.setdefault(previous_distance, set()).add(node_id)
+            if distance is not None:
+                joined_nodes.setdefault(distance, set()).add(node_id)
+        for distance in set(left_nodes) | set(joined_nodes):
+            layer = (self._nodes_per_distance.get(distance, set()) - left_nodes.get(distance, set())) | \
+                joined_nodes.get(distance, set())
+            if layer:
+                self._nodes_per_distance[distance] = layer
+            else:
+                self._nodes_per_distance.pop(distance, None)
+
+        # Rebuilding the layers, the inputs are only deduced again for the touched layers
+        number_layers = max(self._nodes_per_distance) + 1
+        for distance in list(self._inputs_per_distance):
+            if distance >= number_layers:
+                del self._inputs_per_distance[distance]
+        for distance in range(number_layers):
+            if distance in touched_distances or distance not in self._inputs_per_distance:
+                self._inputs_per_distance[distance] = self._layer_inputs(layer=self._nodes_per_distance[distance])
+
+        self.layers = list(map(lambda x: self._nodes_per_distance[x], reversed(range(number_layers))))
+        self.inputs_per_layer = list(map(lambda x: self._inputs_per_distance[x], reversed(range(number_layers))))
+
+        # Change self parameters, the tables do not describe the genome anymore and the lists are created from the
+        # graphs when they are read
+        self._genome_connections = None
+        self._connection_table = None
+        self._node_table = None
+        self.connections = None
+        self.nodes = None
+        self._lists_from_graphs = True
+        self._reset_derived_analysis()
+
+        if verify:
+            # Full analysis of the new genome
+            genome_analyzer = GenomeAnalyzer(
+                id_inputs=self.id_inputs, id_outputs=self.id_outputs,
+                connections=list(self._genome_connection_list()), nodes=list(self.nodes),
+                keep_bias_nodes=self.keep_bias_nodes
             )
-            negative_id_inputs.sort(reverse=True)
-            positive_id_inputs = list(
-                filter(lambda x: x >= 0, inputs_of_layer)
+            genome_analyzer.filter_useful_connections()
+            genome_analyzer.construct_layers()
+
+            # Sanity Check: Make sure both analyses are the same
+            assert set(map(lambda x: x.identification_number, genome_analyzer.connections)) \
+                == set(self._graph.connections_by_key), "The useful connections differ from a full analysis"
+            assert genome_analyzer.layers == self.layers, "The layers differ from a full analysis"
+            assert genome_analyzer.inputs_per_layer == self.inputs_per_layer, \
+                "The inputs per layer differ from a full analysis"
+
+    def add_connection(self, connection, verify=False):
+        # Add connection mutation
+        self.apply_structural_delta(added_connections=[connection], verify=verify)
+
+    def split_connection(self, connection_key, node, input_weight=1.0, verify=False):
+        '''
+            Add node mutation, like neat-python: the connection is disabled and replaced by a connection from its
+            input to the new node, with weight input_weight, and a connection from the new node to its output,
+            with the weight of the split connection.
+        '''
+        split_connection = self._genome_graph.get_connection(connection_key) if self._genome_graph is not None \
+            else next(filter(lambda x: x.identification_number == connection_key, self._genome_connection_list()))
+        self.apply_structural_delta(
+            added_connections=[
+                GenomeConnection(identification_number=connection_key, enabled=False, weight=split_connection.weight),
+                GenomeConnection(identification_number=(connection_key[0], node.node_id), enabled=True,
+                                 weight=input_weight),
+                GenomeConnection(identification_number=(node.node_id, connection_key[1]), enabled=True,
+                                 weight=split_connection.weight),
+            ],
+            added_nodes=[node],
+            verify=verify
+        )
+
+    def _build_layer_indexes(self):
+        # Indexes are only built once
+        if self._node_positions is not None:
+            return
+
+        # Nodes of every layer, sorted
+        self._layer_nodes = list(map(sorted, self.layers))
+
+        # Layer and row of every node: {<Int: Node ID>: (<Int: Layer Index>, <Int: Row>)}
+        self._node_positions = {}
+        for layer_index, layer_nodes in enumerate(self._layer_nodes):
+            for row, node_id in enumerate(layer_nodes):
+                self._node_positions[node_id] = (layer_index, row)
+
+        # Column of every input of each layer: [{<Int: Input Node ID>: <Int: Column>}]
+        self._input_columns = list(
+            map(lambda x: {id_input: column for column, id_input in enumerate(x)}, self.inputs_per_layer)
+        )
+
+    def _build_connection_slots(self):
+        # Slots are only computed once
+        if self._connection_slots is not None:
+            return
+
+        # Layer, row and column of every connection, in the order of self.connections
+        self._connection_keys = list(map(lambda x: x.identification_number, self.connections))
+        if self._connection_table is not None:
+            self._build_table_connection_slots()
+            return
+
+        number_connections = len(self._connection_keys)
+        connections_layer = np.empty(number_connections, dtype=np.intp)
+        connections_row = np.empty(number_connections, dtype=np.intp)
+        connections_column = np.empty(number_connections, dtype=np.intp)
+        for index, (id_input, id_output) in enumerate(self._connection_keys):
+            layer_index, row = self._node_positions[id_output]
+            connections_layer[index] = layer_index
+            connections_row[index] = row
+            connections_column[index] = self._input_columns[layer_index][id_input]
+
+        self._connection_slots = (connections_layer, connections_row, connections_column)
+
+    def _build_table_connection_slots(self):
+        # Row of every connection in the connection table, known already if the table was filtered
+        if self._connection_rows is None:
+            self._connection_rows = self._connection_table.rows(self._connection_keys)
+        connections_input = self._connection_table.input_ids[self._connection_rows]
+        connections_output = self._connection_table.output_ids[self._connection_rows]
+
+        # Layer and row of the output of every connection, looked up in the nodes of the layers sorted by ID
+        layer_sizes = list(map(len, self._layer_nodes))
+        nodes_id = np.fromiter(chain.from_iterable(self._layer_nodes), dtype=np.int64)
+        nodes_layer = np.repeat(np.arange(len(layer_sizes)), layer_sizes)
+        nodes_row = np.concatenate([np.zeros(0, dtype=np.intp)] + list(map(np.arange, layer_sizes)))
+        nodes_order = np.argsort(nodes_id)
+        connections_node = nodes_order[np.searchsorted(nodes_id[nodes_order], connections_output)]
+        connections_layer = nodes_layer[connections_node].astype(np.intp)
+        connections_row = nodes_row[connections_node].astype(np.intp)
+
+        # Column of the input of every connection, looked up in the (layer, input ID) pairs of every layer
+        input_sizes = list(map(len, self.inputs_per_layer))
+        inputs_id = np.fromiter(chain.from_iterable(self.inputs_per_layer), dtype=np.int64)
+        inputs_layer = np.repeat(np.arange(len(input_sizes)), input_sizes)
+        inputs_column = np.concatenate([np.zeros(0, dtype=np.intp)] + list(map(np.arange, input_sizes)))
+        minimum_id = min(inputs_id.min(initial=0), connections_input.min(initial=0))
+        id_span = max(inputs_id.max(initial=0), connections_input.max(initial=0)) - minimum_id + 1
+        inputs_pair = inputs_layer * id_span + (inputs_id - minimum_id)
+        inputs_order = np.argsort(inputs_pair)
+        connections_pair = connections_layer * id_span + (connections_input - minimum_id)
+        connections_column = inputs_column[
+            inputs_order[np.searchsorted(inputs_pair[inputs_order], connections_pair)]
+        ].astype(np.intp)
+
+        self._connection_slots = (connections_layer, connections_row, connections_column)
+
+    def _connection_values(self, dtype):
+        # Weight and enabled flag of every connection, in the order of self.connections
+        if self._connection_table is not None:
+            return self._connection_table.weights[self._connection_rows].astype(dtype), \
+                self._connection_table.enabled[self._connection_rows]
+
+        connections_weight = np.fromiter(
+            map(lambda x: x.weight, self.connections), dtype=dtype, count=len(self.connections)
+        )
+        connections_enabled = np.fromiter(
+            map(lambda x: bool(x.enabled), self.connections), dtype=bool, count=len(self.connections)
+        )
+
+        return connections_weight, connections_enabled
+
+    def _connection_arrays(self, dtype):
+        # Layer, row, column, weight and enabled flag of every connection
+        self._build_connection_slots()
+        return self._connection_slots + self._connection_values(dtype=dtype)
+
+    @staticmethod
+    def _function_code(function_name, function_codes, function_names):
+        # Codes are given in order of appearance
+        if function_name not in function_codes:
+            function_codes[function_name] = len(function_names)
+            function_names.append(function_name)
+
+        return function_codes[function_name]
+
+    def _construct_node_arrays(self, dtype):
+        # Arrays are allocated the first time, later calls fill them up in place
+        if self.biases_arrays is None:
+            self.activation_functions = []
+            self.aggregation_functions = []
+            self.biases_arrays = list(map(lambda x: np.zeros(len(x), dtype=dtype), self._layer_nodes))
+            self.responses_arrays = list(map(lambda x: np.ones(len(x), dtype=dtype), self._layer_nodes))
+            self.activation_codes_arrays = list(map(lambda x: np.full(len(x), -1, dtype=np.int32), self._layer_nodes))
+            self.aggregation_codes_arrays = list(
+                map(lambda x: np.full(len(x), -1, dtype=np.int32), self._layer_nodes)
             )
-            positive_id_inputs.sort(reverse=False)
-            self.inputs_per_layer.append(negative_id_inputs + positive_id_inputs)
 
-        # Clean Up
-        self.layers.reverse()
-        self.inputs_per_layer.reverse()
+        # Activation and aggregation function codes, new functions are appended to the known ones
+        activation_codes = {function_name: code for code, function_name in enumerate(self.activation_functions)}
+        aggregation_codes = {function_name: code for code, function_name in enumerate(self.aggregation_functions)}
+
+        if self._node_table is not None:
+            self._fill_node_arrays_from_table(activation_codes=activation_codes, aggregation_codes=aggregation_codes)
+            return
+
+        for layer_index, layer_nodes in enumerate(self._layer_nodes):
+            # Filling up biases, responses and function codes
+            layer_biases = self.biases_arrays[layer_index]
+            layer_responses = self.responses_arrays[layer_index]
+            layer_activation_codes = self.activation_codes_arrays[layer_index]
+            layer_aggregation_codes = self.aggregation_codes_arrays[layer_index]
+            for row, node_id in enumerate(layer_nodes):
+                layer_node = self._graph.get_node(node_id)
+                if layer_node is None:
+                    layer_biases[row] = 0
+                    layer_responses[row] = 1
+                    layer_activation_codes[row] = -1
+                    layer_aggregation_codes[row] = -1
+                    continue
+
+                layer_biases[row] = layer_node.bias
+                layer_responses[row] = layer_node.response
+                layer_activation_codes[row] = GenomeAnalyzer._function_code(
+                    function_name=str(layer_node.activation_function),
+                    function_codes=activation_codes, function_names=self.activation_functions
+                )
+                layer_aggregation_codes[row] = GenomeAnalyzer._function_code(
+                    function_name=str(layer_node.aggregation_function),
+                    function_codes=aggregation_codes, function_names=self.aggregation_functions
+                )
 
-        # Setting flag
-        self._created_layers = True
+    def _fill_node_arrays_from_table(self, activation_codes, aggregation_codes):
+        # Row of every node of every layer in the node table, -1 if the node is unknown
+        if self._node_rows is None:
+            layer_bounds = np.cumsum(list(map(len, self._layer_nodes)))[:-1]
+            self._node_rows = np.split(
+                self._node_table.rows(np.fromiter(chain.from_iterable(self._layer_nodes), dtype=np.int64)),
+                layer_bounds
+            )
 
-    def construct_matrices(self):
+        # Translating the codes of the table into the codes of the analyzer, unknown nodes use the last code (-1)
+        activation_translation = np.array(
+            list(
+                map(
+                    lambda x: GenomeAnalyzer._function_code(
+                        function_name=x, function_codes=activation_codes, function_names=self.activation_functions
+                    ),
+                    self._node_table.activation_functions
+                )
+            ) + [-1],
+            dtype=np.int32
+        )
+        aggregation_translation = np.array(
+            list(
+                map(
+                    lambda x: GenomeAnalyzer._function_code(
+                        function_name=x, function_codes=aggregation_codes, function_names=self.aggregation_functions
+                    ),
+                    self._node_table.aggregation_functions
+                )
+            ) + [-1],
+            dtype=np.int32
+        )
+
+        for layer_index, layer_rows in enumerate(self._node_rows):
+            # Unknown nodes have a bias of 0 and a response of 1
+            known_nodes = layer_rows >= 0
+            known_rows = layer_rows[known_nodes]
+            self.biases_arrays[layer_index][:] = 0
+            self.biases_arrays[layer_index][known_nodes] = self._node_table.biases[known_rows]
+            self.responses_arrays[layer_index][:] = 1
+            self.responses_arrays[layer_index][known_nodes] = self._node_table.responses[known_rows]
+
+            # Filling up function codes with a single gather each
+            self.activation_codes_arrays[layer_index][:] = -1
+            self.activation_codes_arrays[layer_index][known_nodes] = \
+                activation_translation[self._node_table.activation_codes[known_rows]]
+            self.aggregation_codes_arrays[layer_index][:] = -1
+            self.aggregation_codes_arrays[layer_index][known_nodes] = \
+                aggregation_translation[self._node_table.aggregation_codes[known_rows]]
+
+    @staticmethod
+    def _function_names(function_codes, function_names):
+        # Unknown nodes have an empty function name
+        return list(map(lambda x: function_names[x] if x >= 0 else "", function_codes.tolist()))
+
+    def construct_numpy_matrices(self, dtype=np.float64):
+        '''
+            Builds the weights matrix, biases vector and activation codes vector of every layer as NumPy arrays.
+
+            - weights_arrays: [<Array [nodes x inputs]>]
+            - connection_masks_arrays: [<Bool Array [nodes x inputs]>] True where there is an enabled connection
+            - biases_arrays: [<Array [nodes]>]
+            - responses_arrays: [<Array [nodes]>]
+            - activation_codes_arrays: [<Int Array [nodes]>] indexes of activation_functions, -1 if the node is unknown
+            - activation_functions: [<String: Activation function name>]
+            - aggregation_codes_arrays: [<Int Array [nodes]>] indexes of aggregation_functions, -1 if the node is unknown
+            - aggregation_functions: [<String: Aggregation function name>]
+        '''
         # Sanity Check: Make sure layers have been deduced
-        assert self._created_layers and not self._deduced_matrices
+        assert self._created_layers and not self._deduced_numpy_matrices
+        assert dtype in [np.float32, np.float64]
+
+        self._build_layer_indexes()
+        connections_layer, connections_row, connections_column, connections_weight, connections_enabled = \
+            self._connection_arrays(dtype=dtype)
+
+        # Grouping connections by layer
+        connections_order = np.argsort(connections_layer, kind='stable')
+        layer_bounds = np.searchsorted(connections_layer[connections_order], np.arange(len(self._layer_nodes) + 1))
+        self._dense_layer_connections = list(
+            map(lambda x: connections_order[layer_bounds[x]:layer_bounds[x + 1]], range(len(self._layer_nodes)))
+        )
+
+        # Allocating the weights matrix and connections mask of every layer
+        self.weights_arrays = list(
+            map(lambda x: np.zeros([len(x[0]), len(x[1])], dtype=dtype), zip(self._layer_nodes, self.inputs_per_layer))
+        )
+        self.connection_masks_arrays = list(map(lambda x: np.zeros(x.shape, dtype=bool), self.weights_arrays))
+
+        self._fill_dense_matrices(connections_weight=connections_weight, connections_enabled=connections_enabled)
+        self._construct_node_arrays(dtype=dtype)
+
+        # Set flag
+        self._deduced_numpy_matrices = True
+
+    def _fill_dense_matrices(self, connections_weight, connections_enabled):
+        _, connections_row, connections_column = self._connection_slots
+
+        # Disabled connections have no weight
+        connections_weight = np.where(connections_enabled, connections_weight, 0)
+
+        for layer_index, layer_connections in enumerate(self._dense_layer_connections):
+            # Filling up weights matrix and connections mask with a single scatter each
+            layer_rows = connections_row[layer_connections]
+            layer_columns = connections_column[layer_connections]
+            self.weights_arrays[layer_index][layer_rows, layer_columns] = connections_weight[layer_connections]
+            self.connection_masks_arrays[layer_index][layer_rows, layer_columns] = \
+                connections_enabled[layer_connections]
+
+    def construct_sparse_matrices(self, dtype=np.float64):
+        '''
+            Builds the weights of every layer in CSR format, rows are the nodes and columns the inputs of the layer.
+            Disabled connections are not stored.
+
+            - sparse_weights_arrays: [(<Int Array: indptr>, <Int Array: indices>, <Array: data>)]
+            - biases, responses and function codes as in construct_numpy_matrices
+        '''
+        # Sanity Check: Make sure layers have been deduced
+        assert self._created_layers and not self._deduced_sparse_matrices
+        assert dtype in [np.float32, np.float64]
+
+        self._build_layer_indexes()
+        self._build_connection_slots()
+        self._build_sparse_matrices(*self._connection_values(dtype=dtype))
+        self._construct_node_arrays(dtype=dtype)
+
+        # Set flag
+        self._deduced_sparse_matrices = True
+
+    def _build_sparse_matrices(self, connections_weight, connections_enabled):
+        connections_layer, connections_row, connections_column = self._connection_slots
+
+        # Sorting the enabled connections by layer, row and column
+        connections_order = np.flatnonzero(connections_enabled)
+        connections_order = connections_order[
+            np.lexsort(
+                (
+                    connections_column[connections_order],
+                    connections_row[connections_order],
+                    connections_layer[connections_order]
+                )
+            )
+        ]
+        layer_bounds = np.searchsorted(connections_layer[connections_order], np.arange(len(self._layer_nodes) + 1))
 
-        # Initialize matrices
-        self.weights_matrix = []
-        self.biases_matrix = []
-        self.activation_functions_matrix = []
-
-        # Iterate over all layers
-        for layer, layer_inputs in zip(self.layers, self.inputs_per_layer):
-            # Converting layer to list and sort
-            layer = list(layer)
-            layer.sort()
-
-            # Count nodes and number of inputs
-            number_nodes = len(layer)
-            number_layer_inputs = len(layer_inputs)
-
-            # Initializing weights and bias matrices of this layer
-            layer_weights = np.empty([number_nodes, number_layer_inputs], dtype=float)
-            layer_weights.fill(0)
-            layer_weights = list(layer_weights)
-
-            # Filling up weights matrix
-            for node_index, node_id in enumerate(layer):
-                # Obtain all connections that contain the node_id
-                node_connections = list(
-                    filter(lambda connection: connection.identification_number[1] == node_id, self.connections)
+        self._sparse_layer_connections = list(
+            map(lambda x: connections_order[layer_bounds[x]:layer_bounds[x + 1]], range(len(self._layer_nodes)))
+        )
+        self._sparse_connections_enabled = connections_enabled
+
+        self.sparse_weights_arrays = []
+        for layer_nodes, layer_connections in zip(self._layer_nodes, self._sparse_layer_connections):
+
+            # Number of connections per row, accumulated
+            layer_indptr = np.zeros(len(layer_nodes) + 1, dtype=np.int32)
+            np.cumsum(
+                np.bincount(connections_row[layer_connections], minlength=len(layer_nodes)), out=layer_indptr[1:]
+            )
+
+            self.sparse_weights_arrays.append(
+                (
+                    layer_indptr,
+                    connections_column[layer_connections].astype(np.int32),
+                    connections_weight[layer_connections]
                 )
+            )
 
-                # Convert numpy to just list
-                layer_weights[node_index] = list(layer_weights[node_index])
-
-                # Fill up the weights
-                for node_connection in node_connections:
-                    # Obtain the index of the respective column
-                    index_weight = layer_inputs.index(node_connection.identification_number[0])
-                    layer_weights[node_index][index_weight] = node_connection.weight if node_connection.enabled else 0
-
-            # Initializing layer biases and activation function matrices
-            layer_biases = np.empty(number_nodes, dtype=float)
-            layer_biases.fill(0)
-            layer_biases = list(layer_biases)
-            layer_activation_functions = np.empty(number_nodes, dtype=str)
-            layer_activation_functions.fill("")
-            layer_activation_functions = list(layer_activation_functions)
-
-            # Filtering the nodes that are in the current layer
-            layer_nodes = list(
-                filter(lambda node: node.node_id in layer, self.nodes)
+    def matrices_memory_report(self):
+        '''
+            Compares the size in bytes of the dense and sparse weights of every layer.
+            The dense size is computed from the shape, so the dense matrices do not need to be built.
+        '''
+        # Sanity Check: Make sure the sparse matrices have been deduced
+        assert self._deduced_sparse_matrices
+
+        report = {
+            "dense_bytes": 0,
+            "sparse_bytes": 0,
+            "layers": []
+        }
+        for layer_index, (indptr, indices, data) in enumerate(self.sparse_weights_arrays):
+            shape = (len(self._layer_nodes[layer_index]), len(self.inputs_per_layer[layer_index]))
+            dense_bytes = shape[0] * shape[1] * data.itemsize
+            sparse_bytes = indptr.nbytes + indices.nbytes + data.nbytes
+
+            report["dense_bytes"] += dense_bytes
+            report["sparse_bytes"] += sparse_bytes
+            report["layers"].append(
+                {
+                    "layer": layer_index,
+                    "shape": shape,
+                    "non_zeros": len(data),
+                    "density": len(data) / (shape[0] * shape[1]) if shape[0] * shape[1] else 0.0,
+                    "dense_bytes": dense_bytes,
+                    "sparse_bytes": sparse_bytes,
+                }
             )
 
-            # Iterate over all nodes
-            for layer_node in layer_nodes:
-                node_index = layer.index(layer_node.node_id)
-                layer_biases[node_index] = layer_node.bias
-                layer_activation_functions[node_index] = str(layer_node.activation_function)
+        return report
+
+    def construct_matrices(self):
+        # Sanity Check: Make sure layers have been deduced
+        assert self._created_layers and not self._deduced_matrices
+
+        # The matrices are built as NumPy arrays and then converted to lists
+        if not self._deduced_numpy_matrices:
+            self.construct_numpy_matrices()
 
-            # Append layers
-            self.weights_matrix.append(layer_weights)
-            self.biases_matrix.append(layer_biases)
-            self.activation_functions_matrix.append(layer_activation_functions)
+        self._arrays_to_matrices()
 
         # Set flag
         self._deduced_matrices = True
@@ -377,7 +1323,128 @@ class GenomeAnalyzer:
         assert len(self.weights_matrix[-1]) == len(self.biases_matrix[-1]) \
                == len(self.activation_functions_matrix[-1]) == len(self.id_outputs)
 
-    def network_to_map(self, inputs_name, outputs_name):
+    def _arrays_to_matrices(self):
+        self.weights_matrix = list(map(lambda x: x.tolist(), self.weights_arrays))
+        self.biases_matrix = list(map(lambda x: x.tolist(), self.biases_arrays))
+        self.activation_functions_matrix = list(
+            map(lambda x: GenomeAnalyzer._function_names(x, self.activation_functions), self.activation_codes_arrays)
+        )
+        self.aggregation_functions_matrix = list(
+            map(lambda x: GenomeAnalyzer._function_names(x, self.aggregation_functions), self.aggregation_codes_arrays)
+        )
+        self.responses_matrix = list(map(lambda x: x.tolist(), self.responses_arrays))
+        # Enabled connections of every layer as [<Int: Input Node ID>, <Int: Node ID>], a weight of 0 does not tell
+        # whether the connection exists
+        self.connections_matrix = list(
+            map(
+                lambda x: list(
+                    map(
+                        lambda y: [self.inputs_per_layer[x][y[1]], self._layer_nodes[x][y[0]]],
+                        zip(*np.nonzero(self.connection_masks_arrays[x]))
+                    )
+                ),
+                range(len(self.connection_masks_arrays))
+            )
+        )
+
+    def refresh_weights(self, connections, nodes):
+        '''
+            Fills the weights, biases, responses and functions of a genome with the same connection keys in place,
+            reusing the useful connections, layers and indexes of this analysis. Paths are not refreshed.
+            Every matrix that has been deduced (NumPy, sparse and lists) is refreshed.
+
+            - connections: [<GenomeConnection Object>] or <ConnectionTable Object> of the new genome, all of them,
+                like the ones given to __init__
+            - nodes: [<GenomeNode Object>] or <NodeTable Object> of the new genome
+
+            Tables are refreshed without creating objects: only the rows of the useful connections and of the nodes
+            of the layers are gathered from their arrays, so self.connections and self.nodes keep the values of the
+            analyzed genome.
+        '''
+        # Sanity Check: Make sure matrices have been deduced
+        assert self._deduced_numpy_matrices or self._deduced_sparse_matrices
+
+        # The incremental analysis state is built again from the new genome when needed
+        self._lists_to_attributes()
+        self._genome_graph = None
+
+        if isinstance(nodes, NodeTable):
+            # Rows are only looked up again when the nodes are not in the same order
+            if self._node_table is None or not self._node_table.has_same_ids(nodes):
+                self._node_rows = None
+            self._node_table = nodes
+        else:
+            self._node_table = None
+            self.nodes = nodes
+
+        if isinstance(connections, ConnectionTable):
+            self._refresh_connection_table(connection_table=connections)
+        else:
+            self._refresh_connections(connections=connections)
+
+        # Nodes and connections given as objects are looked up in the graph
+        if self._connection_table is None or self._node_table is None:
+            self._graph = GenomeGraph(connections=self.connections, nodes=self.nodes)
+
+        self._refresh_matrices()
+
+    def _refresh_connection_table(self, connection_table):
+        # Rows are only looked up again when the connections are not in the same order
+        if self._connection_table is None or self._connection_rows is None \
+                or not self._connection_table.has_same_keys(connection_table):
+            # Sanity Check: Make sure the new genome has the same structure
+            genome_connection_keys = self._genome_connection_keys()
+            assert len(connection_table) == len(genome_connection_keys)
+            assert structural_hash(
+                id_inputs=self.id_inputs, id_outputs=self.id_outputs, connections=connection_table.keys()
+            ) == structural_hash(
+                id_inputs=self.id_inputs, id_outputs=self.id_outputs, connections=genome_connection_keys
+            )
+            self._connection_rows = connection_table.rows(self._connection_keys)
+
+        # Connection objects are created from the new table when they are needed
+        self._connection_table = connection_table
+        self._genome_connections = None
+
+    def _refresh_connections(self, connections):
+        # Sanity Check: Make sure the new genome has the same structure
+        connections_by_key = {connection.identification_number: connection for connection in connections}
+        genome_connection_keys = self._genome_connection_keys()
+        assert len(connections_by_key) == len(genome_connection_keys) and all(
+            map(lambda x: x in connections_by_key, genome_connection_keys)
+        )
+
+        # Change self parameters, the useful connections keep their order
+        self._genome_connections = connections
+        self.connections = list(map(lambda x: connections_by_key[x], self._connection_keys))
+        self._connection_table = None
+
+    def _refresh_matrices(self):
+        if self._deduced_numpy_matrices:
+            connections_weight, connections_enabled = self._connection_values(dtype=self.weights_arrays[0].dtype)
+            self._fill_dense_matrices(connections_weight=connections_weight, connections_enabled=connections_enabled)
+
+        if self._deduced_sparse_matrices:
+            connections_weight, connections_enabled = self._connection_values(
+                dtype=self.sparse_weights_arrays[0][2].dtype
+            )
+            if np.array_equal(connections_enabled, self._sparse_connections_enabled):
+                # Same stored connections, only the data changes
+                for (_, _, layer_data), layer_connections in zip(
+                        self.sparse_weights_arrays, self._sparse_layer_connections):
+                    layer_data[:] = connections_weight[layer_connections]
+            else:
+                # Enabling or disabling connections changes the structure of the CSR matrices
+                self._build_sparse_matrices(
+                    connections_weight=connections_weight, connections_enabled=connections_enabled
+                )
+
+        self._construct_node_arrays(dtype=self.biases_arrays[0].dtype)
+
+        if self._deduced_matrices:
+            self._arrays_to_matrices()
+
+    def _network_map(self, inputs_name, outputs_name):
         # Sanity Checking
         assert len(self.id_inputs) == len(inputs_name)
         assert len(self.id_outputs) == len(outputs_name)
@@ -397,12 +1464,16 @@ class GenomeAnalyzer:
             formatted_outputs.append("{} ({})".format(output_name, id_output))
 
         # Initializing Map
-        neural_network_map = {
+        return {
             "inputs": formatted_inputs,
             "outputs": formatted_outputs,
             "layers": [],
         }
 
+    def network_to_map(self, inputs_name, outputs_name):
+        # Initializing Map
+        neural_network_map = self._network_map(inputs_name=inputs_name, outputs_name=outputs_name)
+
         # Filling weights
         for layer_index, layer_nodes in enumerate(self.layers):
             # Convert to list and sort
@@ -416,7 +1487,42 @@ class GenomeAnalyzer:
                     "id_nodes": current_layer_nodes,
                     "weights": list(self.weights_matrix[layer_index]),
                     "biases": list(self.biases_matrix[layer_index]),
-                    "afunctions": list(self.activation_functions_matrix[layer_index])
+                    "afunctions": list(self.activation_functions_matrix[layer_index]),
+                    "aggregations": list(self.aggregation_functions_matrix[layer_index]),
+                    "responses": list(self.responses_matrix[layer_index]),
+                    "connections": list(self.connections_matrix[layer_index])
+                }
+            )
+
+        return neural_network_map
+
+    def network_to_sparse_map(self, inputs_name, outputs_name):
+        # Sanity Check: Make sure the sparse matrices have been deduced
+        assert self._deduced_sparse_matrices
+
+        # Initializing Map
+        neural_network_map = self._network_map(inputs_name=inputs_name, outputs_name=outputs_name)
+        neural_network_map["format"] = "csr"
+
+        # Filling weights, row i of a layer has the weights data[indptr[i]:indptr[i + 1]] in the columns
+        # indices[indptr[i]:indptr[i + 1]] of id_node_inputs
+        for layer_index, (indptr, indices, data) in enumerate(self.sparse_weights_arrays):
+            neural_network_map["layers"].append(
+                {
+                    "layer": layer_index,
+                    "id_node_inputs": self.inputs_per_layer[layer_index],
+                    "id_nodes": self._layer_nodes[layer_index],
+                    "indptr": indptr.tolist(),
+                    "indices": indices.tolist(),
+                    "weights": data.tolist(),
+                    "biases": self.biases_arrays[layer_index].tolist(),
+                    "afunctions": GenomeAnalyzer._function_names(
+                        self.activation_codes_arrays[layer_index], self.activation_functions
+                    ),
+                    "aggregations": GenomeAnalyzer._function_names(
+                        self.aggregation_codes_arrays[layer_index], self.aggregation_functions
+                    ),
+                    "responses": self.responses_arrays[layer_index].tolist()
                 }
             )
 
@@ -0,0 +1,219 @@
+class GenomeGraph:
+    '''
+        Adjacency index of a genome, built once so that every analysis step can look up
+        the connections of a node without scanning all the connections of the genome.
+
+        - connections_by_key: {<Tuple: Connection Key>: <GenomeConnection Object>}
+        - forward_adjacency: {<Int: Node ID>: [<Tuple: Key of a connection leaving the node>]}
+        - reverse_adjacency: {<Int: Node ID>: [<Tuple: Key of a connection entering the node>]}
+        - nodes_by_id: {<Int: Node ID>: <GenomeNode Object>}
+
+        Adjacency lists keep the order in which the connections were given.
+    '''
+    def __init__(self, connections, nodes=None):
+        self.connections_by_key = {}
+        self.forward_adjacency = {}
+        self.reverse_adjacency = {}
+        self.nodes_by_id = {}
+
+        # Indexing connections
+        for connection in connections:
+            connection_key = connection.identification_number
+            self.connections_by_key[connection_key] = connection
+            self.forward_adjacency.setdefault(connection_key[0], []).append(connection_key)
+            self.reverse_adjacency.setdefault(connection_key[1], []).append(connection_key)
+
+        # Indexing nodes
+        if nodes is not None:
+            for node in nodes:
+                self.nodes_by_id[node.node_id] = node
+
+    def add_connection(self, connection):
+        # A connection with a known key replaces the previous one and keeps its position
+        connection_key = connection.identification_number
+        if connection_key not in self.connections_by_key:
+            self.forward_adjacency.setdefault(connection_key[0], []).append(connection_key)
+            self.reverse_adjacency.setdefault(connection_key[1], []).append(connection_key)
+        self.connections_by_key[connection_key] = connection
+
+    def remove_connection(self, connection_key):
+        # Nodes left without connections are removed from the adjacency lists
+        del self.connections_by_key[connection_key]
+        for adjacency, node_id in [(self.forward_adjacency, connection_key[0]),
+                                   (self.reverse_adjacency, connection_key[1])]:
+            adjacency[node_id].remove(connection_key)
+            if not adjacency[node_id]:
+                del adjacency[node_id]
+
+    def has_connections(self, node_id):
+        return node_id in self.forward_adjacency or node_id in self.reverse_adjacency
+
+    def outgoing_connections(self, node_id):
+        # Connections whose input is node_id
+        return [self.connections_by_key[key] for key in self.forward_adjacency.get(node_id, ())]
+
+    def incoming_connections(self, node_id):
+        # Connections whose output is node_id
+        return [self.connections_by_key[key] for key in self.reverse_adjacency.get(node_id, ())]
+
+    def get_connection(self, connection_key):
+        return self.connections_by_key[connection_key]
+
+    def get_node(self, node_id):
+        return self.nodes_by_id.get(node_id)
+
+    def forward_reachable_nodes(self, sources, blocked_nodes=()):
+        # Nodes reachable from the sources, nodes in blocked_nodes are reached but not explored
+        return self._reachable_nodes(sources=sources, blocked_nodes=blocked_nodes, adjacency=self.forward_adjacency,
+                                     position=1)
+
+    def backward_reachable_nodes(self, sources, blocked_nodes=()):
+        # Nodes that reach the sources, nodes in blocked_nodes are reached but not explored
+        return self._reachable_nodes(sources=sources, blocked_nodes=blocked_nodes, adjacency=self.reverse_adjacency,
+                                     position=0)
+
+    @staticmethod
+    def _reachable_nodes(sources, blocked_nodes, adjacency, position):
+        visited = set(sources)
+        pending = list(visited)
+
+        while pending:
+            node_id = pending.pop()
+            if node_id in blocked_nodes:
+                continue
+
+            for connection_key in adjacency.get(node_id, ()):
+                next_node_id = connection_key[position]
+                if next_node_id not in visited:
+                    visited.add(next_node_id)
+                    pending.append(next_node_id)
+
+        return visited
+
+    def strongly_connected_components(self):
+        '''
+            Strongly connected components of the graph, found with Tarjan's algorithm in O(V + E). The depth first
+            search uses an explicit stack, so deep genomes do not reach the recursion limit.
+
+            Returns a list of sets of node IDs, every component is listed after the components it connects to.
+        '''
+        node_ids = list(dict.fromkeys(list(self.forward_adjacency) + list(self.reverse_adjacency)))
+        indexes = {}
+        low_links = {}
+        component_stack = []
+        in_component_stack = set()
+        components = []
+
+        for root_id in node_ids:
+            if root_id in indexes:
+                continue
+
+            # Every frame is a node and the iterator over its outgoing connections
+            frames = [(root_id, iter(self.forward_adjacency.get(root_id, ())))]
+            indexes[root_id] = low_links[root_id] = len(indexes)
+            component_stack.append(root_id)
+            in_component_stack.add(root_id)
+
+            while frames:
+                node_id, next_connections = frames[-1]
+                connection_key = next(next_connections, None)
+
+                if connection_key is not None:
+                    next_node_id = connection_key[1]
+                    if next_node_id not in indexes:
+                        # Going deeper
+                        indexes[next_node_id] = low_links[next_node_id] = len(indexes)
+                        component_stack.append(next_node_id)
+                        in_component_stack.add(next_node_id)
+                        frames.append((next_node_id, iter(self.forward_adjacency.get(next_node_id, ()))))
+                    elif next_node_id in in_component_stack:
+                        low_links[node_id] = min(low_links[node_id], indexes[next_node_id])
+                    continue
+
+                # Every connection of the node has been explored, going back
+                frames.pop()
+                if frames:
+                    low_links[frames[-1][0]] = min(low_links[frames[-1][0]], low_links[node_id])
+
+                if low_links[node_id] == indexes[node_id]:
+                    # The node is the root of a component
+                    component = set()
+                    while True:
+                        component_node_id = component_stack.pop()
+                        in_component_stack.discard(component_node_id)
+                        component.add(component_node_id)
+                        if component_node_id == node_id:
+                            break
+                    components.append(component)
+
+        return components
+
+    def find_cycles(self):
+        # Components with more than one node, or a node connected to itself, contain a cycle
+        return list(
+            filter(
+                lambda x: len(x) > 1 or any(map(lambda y: (y, y) in self.connections_by_key, x)),
+                self.strongly_connected_components()
+            )
+        )
+
+    def check_acyclic(self):
+        # Sanity Check: Only feed forward networks can be analyzed
+        cycles = self.find_cycles()
+        if cycles:
+            raise ValueError(
+                "The genome contains {} cycle(s), only feed forward networks can be analyzed. "
+                "Nodes in cycles: {}".format(len(cycles), list(map(sorted, cycles)))
+            )
+
+    def reverse_topological_order(self):
+        # Nodes ordered so that every node comes after all the nodes it connects to
+        pending_connections = {
+            node_id: len(connection_keys) for node_id, connection_keys in self.forward_adjacency.items()
+        }
+
+        # Starting from the nodes without outgoing connections
+        ready_nodes = list(
+            filter(lambda x: pending_connections.get(x, 0) == 0, self.reverse_adjacency)
+        )
+        order = []
+        while ready_nodes:
+            node_id = ready_nodes.pop()
+            order.append(node_id)
+
+            for connection_key in self.reverse_adjacency.get(node_id, ()):
+                pending_connections[connection_key[0]] -= 1
+                if pending_connections[connection_key[0]] == 0:
+                    ready_nodes.append(connection_key[0])
+
+        # Sanity Check: Every connection must have been traversed, else there is a cycle
+        if any(pending_connections.values()):
+            raise ValueError("The genome contains a cycle, only feed forward networks can be analyzed")
+
+        return order
+
+    def subset_reverse_topological_order(self, node_ids):
+        # Nodes of node_ids ordered so that every node comes after all the nodes of node_ids it connects to
+        node_ids = set(node_ids)
+        pending_connections = {
+            node_id: len(list(filter(lambda x: x[1] in node_ids, self.forward_adjacency.get(node_id, ()))))
+            for node_id in node_ids
+        }
+
+        ready_nodes = list(filter(lambda x: pending_connections[x] == 0, node_ids))
+        order = []
+        while ready_nodes:
+            node_id = ready_nodes.pop()
+            order.append(node_id)
+
+            for connection_key in self.reverse_adjacency.get(node_id, ()):
+                if connection_key[0] in node_ids:
+                    pending_connections[connection_key[0]] -= 1
+                    if pending_connections[connection_key[0]] == 0:
+                        ready_nodes.append(connection_key[0])
+
+        # Sanity Check: Every node must have been ordered, else there is a cycle
+        if len(order) != len(node_ids):
+            raise ValueError("The genome contains a cycle, only feed forward networks can be analyzed")
+
+        return order
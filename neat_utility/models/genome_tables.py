@@ -0,0 +1,349 @@
+from .connection import GenomeConnection
+from .genome_graph import GenomeGraph
+from .node import GenomeNode
+from operator import attrgetter, itemgetter
+from itertools import chain
+import numpy as np
+
+
+class ConnectionTable:
+    '''
+        Connections of a genome stored as arrays, one row per connection, instead of one object per connection.
+
+        - input_ids: <Int Array [connections]>
+        - output_ids: <Int Array [connections]>
+        - weights: <Array [connections]>
+        - enabled: <Bool Array [connections]>
+    '''
+    __slots__ = ["input_ids", "output_ids", "weights", "enabled"]
+
+    def __init__(self, input_ids, output_ids, weights, enabled):
+        self.input_ids = np.asarray(input_ids, dtype=np.int64)
+        self.output_ids = np.asarray(output_ids, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.enabled = np.asarray(enabled, dtype=bool)
+
+        # Sanity Check: Make sure every column has a value for every connection
+        assert len(self.input_ids) == len(self.output_ids) == len(self.weights) == len(self.enabled)
+
+    def __len__(self):
+        return len(self.input_ids)
+
+    @property
+    def nbytes(self):
+        return self.input_ids.nbytes + self.output_ids.nbytes + self.weights.nbytes + self.enabled.nbytes
+
+    @staticmethod
+    def from_connections(connections):
+        connections = list(connections)
+        return ConnectionTable(
+            input_ids=np.fromiter(map(lambda x: x.identification_number[0], connections), dtype=np.int64,
+                                  count=len(connections)),
+            output_ids=np.fromiter(map(lambda x: x.identification_number[1], connections), dtype=np.int64,
+                                   count=len(connections)),
+            weights=np.fromiter(map(lambda x: x.weight, connections), dtype=np.float64, count=len(connections)),
+            enabled=np.fromiter(map(lambda x: bool(x.enabled), connections), dtype=bool, count=len(connections))
+        )
+
+    @staticmethod
+    def from_genome(genome):
+        # Connections of a neat-python genome, in the order of genome.connections
+        connection_table, _ = ConnectionTable.from_genomes(genomes=[genome])
+        return connection_table
+
+    @staticmethod
+    def from_genomes(genomes):
+        '''
+            Connections of every neat-python genome of a population in a single table, the connections of genome g
+            are the rows offsets[g]:offsets[g + 1]. Each column is read by its own np.fromiter pass over the genes
+            of the population, straight into an array of its final size, without intermediate objects. Genes are
+            Python objects, so one pass per column is faster than a single Python loop filling every column.
+
+            Returns the table and the offsets <Int Array [genomes + 1]>.
+        '''
+        genomes = list(genomes)
+        offsets = np.zeros(len(genomes) + 1, dtype=np.intp)
+        np.cumsum(list(map(lambda x: len(x.connections), genomes)), out=offsets[1:])
+        number_connections = int(offsets[-1])
+
+        def connection_keys():
+            return chain.from_iterable(map(lambda x: x.connections.keys(), genomes))
+
+        def connection_genes():
+            return chain.from_iterable(map(lambda x: x.connections.values(), genomes))
+
+        connection_table = ConnectionTable(
+            input_ids=np.fromiter(map(itemgetter(0), connection_keys()), dtype=np.int64, count=number_connections),
+            output_ids=np.fromiter(map(itemgetter(1), connection_keys()), dtype=np.int64, count=number_connections),
+            weights=np.fromiter(map(attrgetter("weight"), connection_genes()), dtype=np.float64,
+                                count=number_connections),
+            enabled=np.fromiter(map(attrgetter("enabled"), connection_genes()), dtype=bool, count=number_connections)
+        )
+
+        return connection_table, offsets
+
+    def view(self, start, stop):
+        # Table of the rows start:stop, sharing the arrays of this table
+        return ConnectionTable(
+            input_ids=self.input_ids[start:stop], output_ids=self.output_ids[start:stop],
+            weights=self.weights[start:stop], enabled=self.enabled[start:stop]
+        )
+
+    def keys(self):
+        return list(zip(self.input_ids.tolist(), self.output_ids.tolist()))
+
+    def rows(self, connection_keys):
+        # Row of every connection key, -1 if the connection is not in the table
+        key_rows = dict(zip(self.keys(), range(len(self))))
+        return np.fromiter(map(lambda x: key_rows.get(x, -1), connection_keys), dtype=np.intp)
+
+    def has_same_keys(self, other):
+        # Same connections in the same order
+        return np.array_equal(self.input_ids, other.input_ids) and np.array_equal(self.output_ids, other.output_ids)
+
+    def to_connections(self, rows=None):
+        # Connections of the given rows, all of them by default. Positional arguments: identification_number,
+        # enabled, weight
+        if rows is None:
+            return list(map(GenomeConnection, self.keys(), self.enabled.tolist(), self.weights.tolist()))
+
+        return list(
+            map(
+                GenomeConnection, zip(self.input_ids[rows].tolist(), self.output_ids[rows].tolist()),
+                self.enabled[rows].tolist(), self.weights[rows].tolist()
+            )
+        )
+
+    @staticmethod
+    def _adjacency(node_indexes, number_nodes):
+        # Connections grouped by the node given in node_indexes, as CSR lists: rows[indptr[n]:indptr[n + 1]]
+        rows = np.argsort(node_indexes, kind='stable')
+        indptr = np.zeros(number_nodes + 1, dtype=np.intp)
+        np.cumsum(np.bincount(node_indexes, minlength=number_nodes), out=indptr[1:])
+
+        return indptr.tolist(), rows.tolist()
+
+    @staticmethod
+    def _reachable_nodes(sources, blocked_nodes, indptr, rows, next_nodes):
+        # Same exploration as GenomeGraph, on node indexes
+        visited = bytearray(len(indptr) - 1)
+        pending = list(sources)
+        for node_index in pending:
+            visited[node_index] = 1
+
+        while pending:
+            node_index = pending.pop()
+            if blocked_nodes[node_index]:
+                continue
+
+            for row in rows[indptr[node_index]:indptr[node_index + 1]]:
+                next_node_index = next_nodes[row]
+                if not visited[next_node_index]:
+                    visited[next_node_index] = 1
+                    pending.append(next_node_index)
+
+        return np.frombuffer(bytes(visited), dtype=bool)
+
+    def useful_connections_mask(self, id_inputs, id_outputs, keep_bias_nodes=False):
+        '''
+            Mask of the connections reached from an input that lead to an output, same as the reachability filter of
+            GenomeAnalyzer, computed on node indexes instead of connection objects. If keep_bias_nodes, nodes without
+            incoming connections are sources like the inputs.
+
+            Raises ValueError if the connections contain a cycle.
+        '''
+        # Node IDs are mapped to consecutive indexes
+        node_ids, node_indexes = np.unique(
+            np.concatenate([self.input_ids, self.output_ids, list(id_inputs), list(id_outputs)]).astype(np.int64),
+            return_inverse=True
+        )
+        connection_inputs = node_indexes[:len(self)]
+        connection_outputs = node_indexes[len(self):2 * len(self)]
+        is_input = np.isin(node_ids, list(id_inputs))
+        is_output = np.isin(node_ids, list(id_outputs))
+
+        forward_indptr, forward_rows = ConnectionTable._adjacency(
+            node_indexes=connection_inputs, number_nodes=len(node_ids)
+        )
+        reverse_indptr, reverse_rows = ConnectionTable._adjacency(
+            node_indexes=connection_outputs, number_nodes=len(node_ids)
+        )
+        connection_inputs_list = connection_inputs.tolist()
+        connection_outputs_list = connection_outputs.tolist()
+
+        # Sanity Check: Kahn's algorithm orders every node only if there is no cycle
+        pending_connections = np.diff(forward_indptr).tolist()
+        ready_nodes = [node_index for node_index, count in enumerate(pending_connections) if count == 0]
+        number_ordered = 0
+        while ready_nodes:
+            node_index = ready_nodes.pop()
+            number_ordered += 1
+            for row in reverse_rows[reverse_indptr[node_index]:reverse_indptr[node_index + 1]]:
+                previous_node_index = connection_inputs_list[row]
+                pending_connections[previous_node_index] -= 1
+                if pending_connections[previous_node_index] == 0:
+                    ready_nodes.append(previous_node_index)
+        if number_ordered != len(node_ids):
+            # The graph of the connections reports which nodes are in cycles
+            GenomeGraph(connections=self.to_connections()).check_acyclic()
+
+        # Exploration stops at the outputs from the inputs, and at the inputs from the outputs
+        is_source = is_input | (~is_output & (np.diff(reverse_indptr) == 0)) if keep_bias_nodes else is_input
+        reached_from_inputs = ConnectionTable._reachable_nodes(
+            sources=np.flatnonzero(is_source).tolist(), blocked_nodes=is_output.tolist(), indptr=forward_indptr,
+            rows=forward_rows, next_nodes=connection_outputs_list
+        )
+        reaching_outputs = ConnectionTable._reachable_nodes(
+            sources=np.flatnonzero(is_output).tolist(), blocked_nodes=is_input.tolist(), indptr=reverse_indptr,
+            rows=reverse_rows, next_nodes=connection_inputs_list
+        )
+
+        return reached_from_inputs[connection_inputs] & ~is_output[connection_inputs] \
+            & reaching_outputs[connection_outputs]
+
+
+class NodeTable:
+    '''
+        Nodes of a genome stored as arrays, one row per node. Functions are stored as codes.
+
+        - node_ids: <Int Array [nodes]>
+        - biases: <Array [nodes]>
+        - responses: <Array [nodes]>
+        - activation_codes: <Int Array [nodes]> indexes of activation_functions
+        - activation_functions: [<String: Activation function name>]
+        - aggregation_codes: <Int Array [nodes]> indexes of aggregation_functions
+        - aggregation_functions: [<String: Aggregation function name>]
+    '''
+    __slots__ = [
+        "node_ids", "biases", "responses", "activation_codes", "activation_functions", "aggregation_codes",
+        "aggregation_functions"
+    ]
+
+    def __init__(self, node_ids, biases, responses, activation_codes, activation_functions, aggregation_codes,
+                 aggregation_functions):
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.biases = np.asarray(biases, dtype=np.float64)
+        self.responses = np.asarray(responses, dtype=np.float64)
+        self.activation_codes = np.asarray(activation_codes, dtype=np.int32)
+        self.activation_functions = activation_functions
+        self.aggregation_codes = np.asarray(aggregation_codes, dtype=np.int32)
+        self.aggregation_functions = aggregation_functions
+
+        # Sanity Check: Make sure every column has a value for every node
+        assert len(self.node_ids) == len(self.biases) == len(self.responses) == len(self.activation_codes) \
+            == len(self.aggregation_codes)
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def nbytes(self):
+        return self.node_ids.nbytes + self.biases.nbytes + self.responses.nbytes + self.activation_codes.nbytes \
+            + self.aggregation_codes.nbytes
+
+    @staticmethod
+    def _function_codes(function_names):
+        # Codes are given in order of appearance
+        function_codes = {}
+        codes = np.fromiter(
+            map(lambda x: function_codes.setdefault(x, len(function_codes)), function_names), dtype=np.int32
+        )
+        return codes, list(function_codes)
+
+    @staticmethod
+    def _from_values(node_ids, biases, responses, activation_names, aggregation_names):
+        activation_codes, activation_functions = NodeTable._function_codes(map(str, activation_names))
+        aggregation_codes, aggregation_functions = NodeTable._function_codes(map(str, aggregation_names))
+
+        return NodeTable(
+            node_ids=node_ids, biases=biases, responses=responses,
+            activation_codes=activation_codes, activation_functions=activation_functions,
+            aggregation_codes=aggregation_codes, aggregation_functions=aggregation_functions
+        )
+
+    @staticmethod
+    def from_nodes(nodes):
+        nodes = list(nodes)
+        return NodeTable._from_values(
+            node_ids=list(map(lambda x: x.node_id, nodes)), biases=list(map(lambda x: x.bias, nodes)),
+            responses=list(map(lambda x: x.response, nodes)),
+            activation_names=list(map(lambda x: x.activation_function, nodes)),
+            aggregation_names=list(map(lambda x: x.aggregation_function, nodes))
+        )
+
+    @staticmethod
+    def from_genome(genome):
+        # Nodes of a neat-python genome, in the order of genome.nodes
+        node_table, _ = NodeTable.from_genomes(genomes=[genome])
+        return node_table
+
+    @staticmethod
+    def from_genomes(genomes):
+        '''
+            Nodes of every neat-python genome of a population in a single table, the nodes of genome g are the rows
+            offsets[g]:offsets[g + 1]. Function codes are shared by the whole population.
+
+            Returns the table and the offsets <Int Array [genomes + 1]>.
+        '''
+        genomes = list(genomes)
+        offsets = np.zeros(len(genomes) + 1, dtype=np.intp)
+        np.cumsum(list(map(lambda x: len(x.nodes), genomes)), out=offsets[1:])
+        number_nodes = int(offsets[-1])
+
+        def node_genes():
+            return chain.from_iterable(map(lambda x: x.nodes.values(), genomes))
+
+        activation_codes, activation_functions = NodeTable._function_codes(
+            map(str, map(attrgetter("activation"), node_genes()))
+        )
+        aggregation_codes, aggregation_functions = NodeTable._function_codes(
+            map(str, map(attrgetter("aggregation"), node_genes()))
+        )
+        node_table = NodeTable(
+            node_ids=np.fromiter(chain.from_iterable(map(lambda x: x.nodes.keys(), genomes)), dtype=np.int64,
+                                 count=number_nodes),
+            biases=np.fromiter(map(attrgetter("bias"), node_genes()), dtype=np.float64, count=number_nodes),
+            responses=np.fromiter(map(attrgetter("response"), node_genes()), dtype=np.float64, count=number_nodes),
+            activation_codes=activation_codes, activation_functions=activation_functions,
+            aggregation_codes=aggregation_codes, aggregation_functions=aggregation_functions
+        )
+
+        return node_table, offsets
+
+    def view(self, start, stop):
+        # Table of the rows start:stop, sharing the arrays and function names of this table
+        return NodeTable(
+            node_ids=self.node_ids[start:stop], biases=self.biases[start:stop], responses=self.responses[start:stop],
+            activation_codes=self.activation_codes[start:stop], activation_functions=self.activation_functions,
+            aggregation_codes=self.aggregation_codes[start:stop], aggregation_functions=self.aggregation_functions
+        )
+
+    def rows(self, node_ids):
+        # Row of every node ID, -1 if the node is not in the table
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        if not len(self):
+            return np.full(len(node_ids), -1, dtype=np.intp)
+
+        table_order = np.argsort(self.node_ids)
+        positions = np.minimum(np.searchsorted(self.node_ids[table_order], node_ids), len(self) - 1)
+        node_rows = table_order[positions]
+
+        return np.where(self.node_ids[node_rows] == node_ids, node_rows, -1).astype(np.intp)
+
+    def has_same_ids(self, other):
+        # Same nodes in the same order
+        return np.array_equal(self.node_ids, other.node_ids)
+
+    def to_nodes(self):
+        return list(
+            map(
+                lambda x: GenomeNode(
+                    node_id=x[0], bias=x[1], response=x[2], activation_function=self.activation_functions[x[3]],
+                    aggregation_function=self.aggregation_functions[x[4]]
+                ),
+                zip(
+                    self.node_ids.tolist(), self.biases.tolist(), self.responses.tolist(),
+                    self.activation_codes.tolist(), self.aggregation_codes.tolist()
+                )
+            )
+        )
@@ -1,5 +1,9 @@
 class GenomeNode:
-    def __init__(self, node_id, bias, activation_function):
+    __slots__ = ["node_id", "bias", "activation_function", "aggregation_function", "response"]
+
+    def __init__(self, node_id, bias, activation_function, aggregation_function="sum", response=1.0):
         self.node_id = node_id
         self.bias = bias
         self.activation_function = activation_function
+        self.aggregation_function = aggregation_function
+        self.response = response
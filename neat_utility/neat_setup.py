@@ -2,11 +2,16 @@
 import neat
 
 # Utils
-from .visualize import draw_net
 from .genome_to_json import export_genome_to_json
-import shutil
+from .evaluation import GenomeAgent, ProcessPoolEvaluator, ThreadPoolEvaluator, AsyncioEvaluator
+from .distributed_evaluation import DistributedEvaluator
+from .analysis_cache import AnalysisCache
+from .render_worker import RenderWorker, render_genome, render_snapshot, render_snapshot_svg
+from .checkpointer import AtomicCheckpointer, BackgroundCheckpointer, restore_checkpoint
+from .render_policy import RenderPolicy
+import inspect
 from os.path import join, dirname, exists
-from os import mkdir, listdir
+from os import mkdir
 import logging
 from datetime import datetime
 
@@ -14,17 +19,62 @@ from datetime import datetime
 class NeatSetup:
     NEAT_CHECKPOINT_FILE_PREFIX = "neat-checkpoint"
 
+    # Evaluation modes
+    EVALUATION_MODE_SERIAL = "serial"
+    EVALUATION_MODE_PROCESSES = "processes"
+    EVALUATION_MODE_THREADS = "threads"
+    EVALUATION_MODE_ASYNCIO = "asyncio"
+    EVALUATION_MODE_DISTRIBUTED = "distributed"
+
+    # Modes that evaluate genomes with a fitness function, the fittest agent they return is a GenomeAgent
+    GENOME_EVALUATION_MODES = [EVALUATION_MODE_PROCESSES, EVALUATION_MODE_ASYNCIO, EVALUATION_MODE_DISTRIBUTED]
+
     def __init__(
             self,
-            simulation, max_generations, neat_checkpoint_breakpoint,
+            max_generations, neat_checkpoint_breakpoint,
             file_prefix, simulation_file,
             inputs_name, outputs_name,
             is_feedforward_network=False,
             logging_function=None,
-            load_checkpoint_number=None, config_file=None
+            load_checkpoint_number=None, config_file=None,
+            evaluation_mode=EVALUATION_MODE_SERIAL, simulation=None, fitness_function=None, number_workers=None,
+            simulation_factory=None, coordinator_address=None,
+            genomes_per_task=8, tasks_per_worker=2, heartbeat_timeout=10.0, no_worker_timeout=60.0,
+            evaluation_timeout=None,
+            cache_analyses=False,
+            background_rendering=False, render_queue_size=4, render_backpressure=RenderWorker.POLICY_COALESCE,
+            render_policy=None, native_svg=False,
+            checkpoint_compression=AtomicCheckpointer.COMPRESSION_GZIP, background_checkpoints=False
     ):
+        # Sanity Checking: Making sure the evaluation mode is valid
+        assert evaluation_mode in [
+            NeatSetup.EVALUATION_MODE_SERIAL, NeatSetup.EVALUATION_MODE_PROCESSES, NeatSetup.EVALUATION_MODE_THREADS,
+            NeatSetup.EVALUATION_MODE_ASYNCIO, NeatSetup.EVALUATION_MODE_DISTRIBUTED
+        ]
+
         # Sanity Checking: Making sure the following parameters are functions
-        assert callable(simulation)
+        # The serial mode uses the simulation, the processes mode evaluates each genome with the fitness function,
+        # the threads mode creates a simulation per thread with the simulation factory and the asyncio mode awaits
+        # the async fitness function of many genomes at once.
+        # The distributed mode sends the genomes to remote workers, which have their own fitness function
+        if evaluation_mode == NeatSetup.EVALUATION_MODE_SERIAL:
+            assert callable(simulation)
+        elif evaluation_mode == NeatSetup.EVALUATION_MODE_PROCESSES:
+            assert callable(fitness_function)
+        elif evaluation_mode == NeatSetup.EVALUATION_MODE_THREADS:
+            assert callable(simulation_factory)
+        elif evaluation_mode == NeatSetup.EVALUATION_MODE_ASYNCIO:
+            assert inspect.iscoroutinefunction(fitness_function)
+        else:
+            assert isinstance(coordinator_address, tuple) and len(coordinator_address) == 2
+            assert isinstance(genomes_per_task, int) and genomes_per_task > 0
+            assert isinstance(tasks_per_worker, int) and tasks_per_worker > 0
+            assert heartbeat_timeout > 0
+            assert no_worker_timeout is None or no_worker_timeout > 0
+            assert evaluation_timeout is None or evaluation_timeout > 0
+
+        # Sanity Checking: Only the serial mode runs the simulation
+        assert evaluation_mode == NeatSetup.EVALUATION_MODE_SERIAL or simulation is None
 
         # Sanity checking: Making sure the following parameters are integers and have valid values
         assert isinstance(max_generations, int) and max_generations > 1
@@ -40,18 +90,49 @@ class NeatSetup:
 
         # Sanity checking: Making sure the following parameters are booleans
         assert isinstance(is_feedforward_network, bool)
+        assert isinstance(cache_analyses, bool)
+        assert isinstance(background_rendering, bool)
+        assert isinstance(native_svg, bool)
+        assert isinstance(background_checkpoints, bool)
+
+        # Sanity checking: Making sure the checkpoint compression is valid
+        assert checkpoint_compression in [
+            AtomicCheckpointer.COMPRESSION_NONE, AtomicCheckpointer.COMPRESSION_GZIP,
+            AtomicCheckpointer.COMPRESSION_LZMA, AtomicCheckpointer.COMPRESSION_ZLIB
+        ]
+
+        # Sanity checking: Making sure the rendering parameters are valid
+        assert isinstance(render_queue_size, int) and render_queue_size > 0
+        assert render_backpressure in [
+            RenderWorker.POLICY_DROP, RenderWorker.POLICY_COALESCE, RenderWorker.POLICY_BLOCK
+        ]
+        assert render_policy is None or isinstance(render_policy, RenderPolicy)
 
         # Sanity checking: Making sure the following parameters, if not None, are the expected type
         assert True if load_checkpoint_number is None else\
             (isinstance(load_checkpoint_number, int) and load_checkpoint_number >= 0)
         assert True if config_file is None else isinstance(config_file, neat.config.Config)
+        assert True if number_workers is None else (isinstance(number_workers, int) and number_workers > 0)
 
         # Initializing parameters for simulations
         self.simulation = simulation
+        self.evaluation_mode = evaluation_mode
+        self.fitness_function = fitness_function
+        self.number_workers = number_workers
+        self.simulation_factory = simulation_factory
+        self.coordinator_address = coordinator_address
+        self.genomes_per_task = genomes_per_task
+        self.tasks_per_worker = tasks_per_worker
+        self.heartbeat_timeout = heartbeat_timeout
+        self.no_worker_timeout = no_worker_timeout
+        self.evaluation_timeout = evaluation_timeout
+        self._evaluator = None
 
         self.max_generations = max_generations
         self.neat_checkpoint_breakpoint = neat_checkpoint_breakpoint
         self.load_checkpoint_number = load_checkpoint_number
+        self.checkpoint_compression = checkpoint_compression
+        self.background_checkpoints = background_checkpoints
 
         self.file_prefix = file_prefix
 
@@ -70,6 +151,8 @@ class NeatSetup:
 
         self.svg_path = join(self.root_directory, 'svg_growth')
 
+        self.analysis_cache_path = join(self.root_directory, 'neat_analysis_cache')
+
         # Parsing configuration file
         if config_file is None:
             self.config_file = neat.config.Config(
@@ -80,7 +163,26 @@ class NeatSetup:
         else:
             self.config_file = config_file
 
-        # Setting up Logging function
+        # Setting up the cache of genome analyses, kept on disk so other runs reuse it
+        self.analysis_cache = AnalysisCache(directory=self.analysis_cache_path) if cache_analyses else None
+
+        # Setting up the rendering of the fittest genomes, in a worker process so generations are not blocked
+        # Native SVGs are drawn by draw_net_svg, without Graphviz. It places the nodes in layers, so genomes of a
+        # recurrent configuration are still drawn by draw_net
+        self.native_svg = native_svg and self.config_file.genome_config.feed_forward
+        self.render_worker = RenderWorker(
+            max_queue_size=render_queue_size, policy=render_backpressure,
+            render_function=render_snapshot_svg if self.native_svg else render_snapshot
+        ) if background_rendering else None
+
+        # Setting up which fittest genomes are rendered, every one of them if there is no policy
+        self.render_policy = render_policy
+        if render_policy is not None and render_policy.index_path is None:
+            render_policy.index_path = join(self.svg_path, 'render_index.jsonl')
+
+        # Setting up Logging function, modes evaluating a fitness function log a GenomeAgent
+        if logging_function is None and evaluation_mode in NeatSetup.GENOME_EVALUATION_MODES:
+            logging_function = GenomeAgent.log_stats
         self.logging_function = logging_function
 
         # Create checkpoint directory if it doesn't exist
@@ -105,57 +207,75 @@ class NeatSetup:
             datefmt='%d-%b-%y %H:%M:%S'
         )
 
-    def move_checkpoints(self):
-        # Moving checkpoint files
-        for file in listdir(self.root_directory):
-            if file.startswith(NeatSetup.NEAT_CHECKPOINT_FILE_PREFIX):
-                shutil.move(
-                    src=join(self.root_directory, file),
-                    dst=join(self.checkpoint_path, file)
-                )
-
-    def move_svg_visualization(self):
-        # Moving SVGs
-        for file in listdir(self.root_directory):
-            if file.startswith(self.file_prefix):
-                shutil.move(
-                    src=join(self.root_directory, file),
-                    dst=join(self.svg_path, file)
-                )
-
     def log_stats(self, generation, winner_genome):
         # Creating message to log
         message = "---END OF GENERATION {}---\n".format(generation)
         message += "Fittest Score: {}\n".format(winner_genome.genome.fitness)
-        message += "" if self.logging_function is None else self.logging_function(agent=winner_genome)
+        try:
+            message += "" if self.logging_function is None else self.logging_function(agent=winner_genome)
+        except AttributeError as error:
+            # The logging function of an agent does not work with the GenomeAgent of the fitness function modes
+            if isinstance(winner_genome, GenomeAgent):
+                raise TypeError(
+                    "The {} evaluation mode logs a GenomeAgent, which only has the genome: use "
+                    "GenomeAgent.log_stats or a logging function reading agent.genome".format(self.evaluation_mode)
+                ) from error
+            raise
 
         # Logging
         logging.info(
             msg=message
         )
 
+    def draw_genome(self, genome, name, callback=None):
+        # Visualize genome, straight into the SVG directory. callback(written) is called once the file is written,
+        # or with False if the background worker dropped it
+        options = {'show_disabled': True} if self.native_svg else {'show_disabled': True, 'fmt': 'svg'}
+        if self.render_worker is None:
+            render_genome(
+                config=self.config_file,
+                genome=genome,
+                filename=join(self.svg_path, name),
+                native_svg=self.native_svg,
+                **options
+            )
+            if callback is not None:
+                callback(True)
+        else:
+            self.render_worker.submit(
+                genome=genome,
+                config=self.config_file,
+                filename=join(self.svg_path, name),
+                callback=callback,
+                **options
+            )
+
     def _neat_simulation(self, genomes, config):
         # Play simulation
-        generation, fittest_genome = self.simulation(genomes=genomes, config=config)
+        if self._evaluator is None:
+            generation, fittest_genome = self.simulation(genomes=genomes, config=config)
+        else:
+            generation, fittest_genome = self._evaluator.evaluate(genomes=genomes, config=config)
 
         # Logging results
         self.log_stats(generation=generation, winner_genome=fittest_genome)
 
-        # Visualize best genome
-        draw_net(
-            config=self.config_file,
-            genome=fittest_genome.genome,
-            view=False,
-            filename=self.file_prefix + "_{}".format(generation),
-            show_disabled=True,
-            fmt='svg'
-        )
-        self.move_svg_visualization()
-
-        # Move Checkpoints
-        self.move_checkpoints()
+        # Visualize best genome, unless it looks like the last one rendered
+        name = self.file_prefix + "_{}".format(generation)
+        if self.render_policy is None:
+            self.draw_genome(genome=fittest_genome.genome, name=name)
+        elif self.render_policy.update(generation=generation, genome=fittest_genome.genome, file=name + ".svg"):
+            # The generation is indexed once its drawing is written
+            self.draw_genome(
+                genome=fittest_genome.genome, name=name,
+                callback=lambda written: self.render_policy.render_done(file=name + ".svg", written=written)
+            )
 
     def run_simulation(self):
+        # The index of the renderings only covers this run
+        if self.render_policy is not None:
+            self.render_policy.reset()
+
         # Create population
         if self.load_checkpoint_number is None:
             # Creating population from config file
@@ -167,33 +287,71 @@ class NeatSetup:
                 '{}-{}'.format(NeatSetup.NEAT_CHECKPOINT_FILE_PREFIX, self.load_checkpoint_number)
             )
 
-            # Creating population
-            generation = neat.Checkpointer.restore_checkpoint(checkpoint_path)
+            # Creating population, whatever the compression of the checkpoint
+            generation = restore_checkpoint(checkpoint_path)
 
         # Adding statistics and logging capabilities
         generation.add_reporter(neat.StdOutReporter(True))
         generation.add_reporter(neat.StatisticsReporter())
-        generation.add_reporter(neat.Checkpointer(self.neat_checkpoint_breakpoint))
 
-        # Run for up to max_generations generations.
-        winner = generation.run(self._neat_simulation, self.max_generations)
-
-        # Show stats of the best Genome
-        print('\nBest genome:\n{!s}'.format(winner))
-
-        # Visualize best genome
-        draw_net(
-            config=self.config_file,
-            genome=winner,
-            view=False,
-            filename=self.file_prefix + "_fittest",
-            show_disabled=True,
-            fmt='svg'
+        # Checkpoints are compressed and written by a worker process in the background
+        checkpointer_class = BackgroundCheckpointer if self.background_checkpoints else AtomicCheckpointer
+        checkpointer = checkpointer_class(
+            self.neat_checkpoint_breakpoint,
+            filename_prefix=join(self.checkpoint_path, NeatSetup.NEAT_CHECKPOINT_FILE_PREFIX + '-'),
+            compression=self.checkpoint_compression
         )
-        self.move_svg_visualization()
+        generation.add_reporter(checkpointer)
+
+        # Setting up the evaluator, its workers are started once and reused by every generation
+        if self.evaluation_mode == NeatSetup.EVALUATION_MODE_PROCESSES:
+            self._evaluator = ProcessPoolEvaluator(
+                fitness_function=self.fitness_function, config=self.config_file, number_workers=self.number_workers
+            )
+        elif self.evaluation_mode == NeatSetup.EVALUATION_MODE_THREADS:
+            self._evaluator = ThreadPoolEvaluator(
+                simulation_factory=self.simulation_factory, number_workers=self.number_workers
+            )
+        elif self.evaluation_mode == NeatSetup.EVALUATION_MODE_ASYNCIO:
+            # The number of workers is the number of genomes being evaluated at the same time
+            self._evaluator = AsyncioEvaluator(
+                fitness_function=self.fitness_function,
+                max_concurrency=100 if self.number_workers is None else self.number_workers
+            )
+        elif self.evaluation_mode == NeatSetup.EVALUATION_MODE_DISTRIBUTED:
+            # Workers connect by themselves with run_worker, the generation waits until they evaluate every genome
+            self._evaluator = DistributedEvaluator(
+                address=self.coordinator_address, genomes_per_task=self.genomes_per_task,
+                tasks_per_worker=self.tasks_per_worker, heartbeat_timeout=self.heartbeat_timeout,
+                no_worker_timeout=self.no_worker_timeout, evaluation_timeout=self.evaluation_timeout
+            )
+
+        if self._evaluator is not None:
+            self._evaluator.start()
+        if self.render_worker is not None:
+            self.render_worker.start()
+
+        # Run for up to max_generations generations.
+        try:
+            winner = generation.run(self._neat_simulation, self.max_generations)
+
+            # Show stats of the best Genome
+            print('\nBest genome:\n{!s}'.format(winner))
+
+            # Visualize best genome
+            self.draw_genome(genome=winner, name=self.file_prefix + "_fittest")
+        finally:
+            if self._evaluator is not None:
+                self._evaluator.close()
+                self._evaluator = None
+
+            # Waiting until every queued genome is rendered, even if the run failed
+            if self.render_worker is not None:
+                self.render_worker.close()
 
-        # Move remaining checkpoints
-        self.move_checkpoints()
+            # Waiting until every checkpoint is written
+            if self.background_checkpoints:
+                checkpointer.close()
 
         # Export model
         if self.is_feedforward_network:
@@ -202,5 +360,6 @@ class NeatSetup:
                 config=self.config_file,
                 genome=winner,
                 inputs_names=self.inputs_name,
-                outputs_names=self.outputs_name
+                outputs_names=self.outputs_name,
+                cache=self.analysis_cache
             )
@@ -0,0 +1,209 @@
+'''
+    Selection of the fittest genomes worth rendering.
+
+    Consecutive generations usually share the same fittest genome, or one that only differs by a small change of its
+    weights, so rendering every generation produces many identical drawings.
+'''
+
+
+# Utils
+from os.path import basename
+from collections import deque
+import threading
+import hashlib
+import json
+import math
+
+
+def drawing_hash(genome, weight_bucket=None):
+    '''
+        Canonical hash of what draw_net shows of a genome: its nodes, its connections and whether they are enabled.
+        It does not depend on the order of the nodes or connections.
+
+        - weight_bucket: if given, the weights are also hashed, rounded down to multiples of weight_bucket, so
+            changes smaller than a bucket do not change the hash. Only the topology is hashed by default
+    '''
+    connections = sorted(
+        map(
+            lambda x: [x.key[0], x.key[1], bool(x.enabled)] +
+            ([] if weight_bucket is None else [math.floor(x.weight / weight_bucket)]),
+            genome.connections.values()
+        )
+    )
+    canonical_drawing = json.dumps([sorted(genome.nodes.keys()), connections], separators=(",", ":"))
+
+    return hashlib.sha256(canonical_drawing.encode("utf-8")).hexdigest()
+
+
+class RenderPolicy:
+    '''
+        Decides whether the fittest genome of a generation is rendered and keeps an index of the renderings.
+
+        A genome is rendered when:
+        - its drawing hash (see drawing_hash) differs from the one of the last rendered genome
+        - every_generations generations passed since the last rendering, if given
+        - its fitness improved by at least fitness_threshold since the last rendering, if given
+
+        Every generation is recorded in the index, a JSON lines file where each line is
+        {"generation": <Int>, "file": <String: SVG file showing the fittest genome>, "rendered": <Bool>,
+        "reason": <String: "topology", "generations" or "fitness", None when not rendered>, "hash": <String>,
+        "fitness": <Float>}
+        so generations that were not rendered point to the drawing of an identical genome.
+
+        The caller reports with render_done whether each requested file was written. A generation is indexed once
+        the file it points to is written, so renderings done in the background are indexed in order. If the file
+        is not written (dropped or failed), its generations are indexed with "file" None and "rendered" False, and
+        the next genome is compared against the last written drawing again.
+
+        - weight_bucket: width of the weight buckets used by the hash, None hashes only the topology
+        - index_path: path of the index file, NeatSetup places it in the SVG directory if None
+    '''
+    REASON_TOPOLOGY = "topology"
+    REASON_GENERATIONS = "generations"
+    REASON_FITNESS = "fitness"
+
+    def __init__(self, weight_bucket=None, every_generations=None, fitness_threshold=None, index_path=None):
+        # Sanity Check
+        assert weight_bucket is None or (isinstance(weight_bucket, (int, float)) and weight_bucket > 0)
+        assert every_generations is None or (isinstance(every_generations, int) and every_generations > 0)
+        assert fitness_threshold is None or (isinstance(fitness_threshold, (int, float)) and fitness_threshold > 0)
+        assert index_path is None or isinstance(index_path, str)
+
+        self.weight_bucket = weight_bucket
+        self.every_generations = every_generations
+        self.fitness_threshold = fitness_threshold
+        self.index_path = index_path
+
+        # render_done may be called from the threads of a RenderWorker
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        # Last genome requested to be rendered, the next genomes are compared against it
+        self.last_hash = None
+        self.last_generation = None
+        self.last_fitness = None
+        self.last_file = None
+
+        self.rendered = 0
+        self.skipped = 0
+        self.dropped = 0
+
+        # Requested renderings: {<String: File>: {"file", "hash", "generation", "fitness", "written": <Bool, None if
+        # pending>}}
+        self._renderings = {}
+        # Newest written rendering
+        self._last_written = None
+        # Generations waiting for the file they point to
+        self._waiting_entries = deque()
+
+    def reset(self):
+        '''
+            Forgets the renderings of a previous run and empties the index, called when a run starts.
+        '''
+        with self._lock:
+            self._clear()
+            if self.index_path is not None:
+                open(self.index_path, "w").close()
+
+    def render_reason(self, generation, genome_hash, fitness):
+        # Why the genome has to be rendered, None if it does not
+        if genome_hash != self.last_hash:
+            return RenderPolicy.REASON_TOPOLOGY
+        if self.every_generations is not None and generation - self.last_generation >= self.every_generations:
+            return RenderPolicy.REASON_GENERATIONS
+        if self.fitness_threshold is not None and fitness is not None and \
+                (self.last_fitness is None or fitness - self.last_fitness >= self.fitness_threshold):
+            return RenderPolicy.REASON_FITNESS
+
+        return None
+
+    def update(self, generation, genome, file):
+        '''
+            Records the fittest genome of a generation, returns True if it has to be rendered into file. The caller
+            then reports with render_done whether file was written.
+        '''
+        genome_hash = drawing_hash(genome=genome, weight_bucket=self.weight_bucket)
+        fitness = genome.fitness
+
+        with self._lock:
+            reason = self.render_reason(generation=generation, genome_hash=genome_hash, fitness=fitness)
+
+            if reason is None:
+                self.skipped += 1
+            else:
+                self.rendered += 1
+                self.last_hash = genome_hash
+                self.last_generation = generation
+                self.last_fitness = fitness
+                self.last_file = file
+                self._renderings[file] = {"file": file, "hash": genome_hash, "generation": generation,
+                                          "fitness": fitness, "written": None}
+
+            self._waiting_entries.append({
+                "generation": generation, "file": self.last_file, "rendered": reason is not None, "reason": reason,
+                "hash": genome_hash, "fitness": fitness
+            })
+            self._index_entries()
+
+        return reason is not None
+
+    def render_done(self, file, written=True):
+        '''
+            Reports whether a file requested by update was written, written is False if it was dropped or failed.
+        '''
+        with self._lock:
+            rendering = self._renderings.get(file)
+            if rendering is None or rendering["written"] is not None:
+                return
+
+            rendering["written"] = written
+            if written:
+                if self._last_written is None or rendering["generation"] >= self._last_written["generation"]:
+                    self._last_written = rendering
+            else:
+                self.dropped += 1
+
+                # The next genome is compared against the last drawing that exists
+                if file == self.last_file:
+                    last_written = self._last_written if self._last_written is not None else \
+                        {"file": None, "hash": None, "generation": None, "fitness": None}
+                    self.last_hash = last_written["hash"]
+                    self.last_generation = last_written["generation"]
+                    self.last_fitness = last_written["fitness"]
+                    self.last_file = last_written["file"]
+
+            self._index_entries()
+
+    def _index_entries(self):
+        # Indexing the generations whose file was written or given up, in the order of the generations
+        lines = []
+        while self._waiting_entries:
+            entry = self._waiting_entries[0]
+            written = self._renderings[entry["file"]]["written"]
+            if written is None:
+                break
+
+            self._waiting_entries.popleft()
+            if written:
+                entry["file"] = basename(entry["file"])
+            else:
+                entry["file"] = None
+                entry["rendered"] = False
+            lines.append(json.dumps(entry) + "\n")
+
+        # Renderings no longer pointed to are forgotten, except the ones the next genomes are compared against
+        pointed_files = set(map(lambda x: x["file"], self._waiting_entries)) | {self.last_file} | \
+            set([] if self._last_written is None else [self._last_written["file"]])
+        self._renderings = dict(
+            filter(lambda x: x[0] in pointed_files or x[1]["written"] is None, self._renderings.items())
+        )
+
+        if lines and self.index_path is not None:
+            with open(self.index_path, "a") as index_file:
+                index_file.writelines(lines)
+
+    def read_index(self):
+        # Entries of the index, in the order they were recorded
+        with open(self.index_path) as index_file:
+            return list(map(json.loads, filter(lambda x: x.strip(), index_file)))
@@ -0,0 +1,226 @@
+'''
+    Rendering of genomes outside of the evolutionary loop.
+
+    Drawing a genome with draw_net spawns a Graphviz process, which blocks the generation until the drawing is done.
+    RenderWorker receives a snapshot of the genome instead (its payload and the keys of the inputs and outputs) and
+    renders it in a pool of worker processes, so the next generation starts right away.
+'''
+
+
+# Utils
+from .visualize import draw_net
+from .svg_writer import draw_net_svg
+from .distributed_evaluation import genome_to_payload, payload_to_genome
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+from os import replace
+from collections import deque
+from functools import partial
+import threading
+import logging
+
+
+def render_genome(config, genome, filename, native_svg=False, **options):
+    '''
+        Renders a genome into filename + '.' + fmt with draw_net, or into filename + '.svg' with draw_net_svg if
+        native_svg. Files are rendered under a temporary name and renamed once complete, so they are never read
+        half written.
+    '''
+    if native_svg:
+        draw_net_svg(config=config, genome=genome, filename=filename, **options)
+        return
+
+    # Graphviz writes the source of the drawing in filename and the drawing in filename + '.' + fmt
+    extension = options.get("fmt", "svg")
+    draw_net(config=config, genome=genome, view=False, filename=filename + ".tmp", **options)
+    replace(filename + ".tmp", filename)
+    replace("{}.tmp.{}".format(filename, extension), "{}.{}".format(filename, extension))
+
+
+def render_snapshot(payload, input_keys, output_keys, filename, options):
+    # Runs inside a worker, the genome and the configuration are rebuilt from the snapshot
+    config = SimpleNamespace(genome_config=SimpleNamespace(input_keys=input_keys, output_keys=output_keys))
+    render_genome(config=config, genome=payload_to_genome(payload), filename=filename, **options)
+
+
+def render_snapshot_svg(payload, input_keys, output_keys, filename, options):
+    # Same as render_snapshot, without Graphviz
+    config = SimpleNamespace(genome_config=SimpleNamespace(input_keys=input_keys, output_keys=output_keys))
+    render_genome(config=config, genome=payload_to_genome(payload), filename=filename, native_svg=True, **options)
+
+
+class RenderWorker:
+    '''
+        Renders genomes in the background with a pool of workers.
+
+        Snapshots wait in a bounded queue until a worker is free, the backpressure policy decides what happens when
+        a snapshot is submitted while the queue is full:
+        - drop: the new snapshot is dropped
+        - coalesce: the oldest waiting snapshot is dropped, so the most recent genomes are always rendered
+        - block: submit waits until there is room in the queue
+
+        - number_workers: number of worker processes (or threads)
+        - max_queue_size: number of snapshots waiting for a worker
+        - use_processes: False renders in threads, useful when the render function releases the GIL
+        - render_function: render_function(payload, input_keys, output_keys, filename, options), it must be
+            picklable when rendering in processes. render_snapshot (draw_net) by default, render_snapshot_svg
+            (draw_net_svg) renders without Graphviz
+
+        A rendering that fails is logged and counted in failed, it does not stop the evolution. The callback given
+        to submit is called with True once the file is written, or with False if the snapshot was dropped or failed.
+    '''
+    POLICY_DROP = "drop"
+    POLICY_COALESCE = "coalesce"
+    POLICY_BLOCK = "block"
+
+    def __init__(self, number_workers=1, max_queue_size=4, policy=POLICY_COALESCE, use_processes=True,
+                 render_function=render_snapshot):
+        # Sanity Check
+        assert isinstance(number_workers, int) and number_workers > 0
+        assert isinstance(max_queue_size, int) and max_queue_size > 0
+        assert policy in [RenderWorker.POLICY_DROP, RenderWorker.POLICY_COALESCE, RenderWorker.POLICY_BLOCK]
+        assert isinstance(use_processes, bool)
+        assert callable(render_function)
+
+        self.number_workers = number_workers
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self.use_processes = use_processes
+        self.render_function = render_function
+
+        # Counters
+        self.submitted = 0
+        self.rendered = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._executor = None
+        self._dispatcher = None
+        self._pending = deque()
+        self._in_flight = 0
+        self._closing = False
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def snapshot(genome, config):
+        # Only the values drawn are kept, so the snapshot is cheap to pickle and the genome can keep evolving
+        return genome_to_payload(genome), list(config.genome_config.input_keys), \
+            list(config.genome_config.output_keys)
+
+    def start(self):
+        # Workers are started only once per run
+        if self._executor is not None:
+            return
+
+        executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=self.number_workers)
+        self._closing = False
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def close(self):
+        # Snapshots already submitted are rendered before the workers stop
+        if self._executor is None:
+            return
+
+        self.flush()
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._dispatcher = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, genome, config, filename, callback=None, **options):
+        '''
+            Queues the rendering of a genome into filename, options are given to draw_net.
+
+            - callback: callback(written), called with True once the file is written and with False if the snapshot
+                is dropped or its rendering fails. It may be called from a worker thread
+
+            Returns False when the snapshot was dropped because the queue was full.
+        '''
+        # Sanity Check
+        assert callback is None or callable(callback)
+
+        # Starting the workers, if they were not started yet
+        self.start()
+
+        job = self.snapshot(genome=genome, config=config) + (filename, options)
+        dropped_callback = None
+        with self._condition:
+            self.submitted += 1
+
+            # Backpressure
+            if len(self._pending) >= self.max_queue_size:
+                if self.policy == RenderWorker.POLICY_DROP:
+                    self.dropped += 1
+                    dropped_callback = callback
+                    job = None
+                elif self.policy == RenderWorker.POLICY_COALESCE:
+                    _, dropped_callback = self._pending.popleft()
+                    self.dropped += 1
+                else:
+                    self._condition.wait_for(lambda: len(self._pending) < self.max_queue_size)
+
+            if job is not None:
+                self._pending.append((job, callback))
+                self._condition.notify_all()
+
+        # Callbacks are called outside of the lock, they may submit or flush
+        if dropped_callback is not None:
+            dropped_callback(False)
+
+        return job is not None
+
+    def flush(self, timeout=None):
+        '''
+            Waits until every queued snapshot is rendered. Returns False if the timeout expired before.
+        '''
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and self._in_flight == 0, timeout=timeout)
+
+    def _dispatch(self):
+        # Sends snapshots to the executor only when a worker is free, so the queue is the only place they wait
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: (self._closing and not self._pending) or
+                    (self._pending and self._in_flight < self.number_workers)
+                )
+                if not self._pending:
+                    return
+                job, callback = self._pending.popleft()
+                self._in_flight += 1
+                self._condition.notify_all()
+
+            future = self._executor.submit(self.render_function, *job)
+            future.add_done_callback(partial(self._job_done, callback))
+
+    def _job_done(self, callback, future):
+        exception = future.exception()
+        if exception is not None:
+            logging.warning(msg="Rendering of a genome failed: {!r}".format(exception))
+
+        # The callback is called before the job is counted as done, so flush also waits for it
+        if callback is not None:
+            try:
+                callback(exception is None)
+            except Exception as callback_exception:
+                logging.warning(msg="Render callback failed: {!r}".format(callback_exception))
+
+        with self._condition:
+            self._in_flight -= 1
+            if exception is None:
+                self.rendered += 1
+            else:
+                self.failed += 1
+            self._condition.notify_all()
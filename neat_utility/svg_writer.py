@@ -0,0 +1,140 @@
+'''
+    Drawing of feedforward genomes as SVG files without Graphviz.
+
+    Nodes are placed in columns: the inputs, then the layers found by GenomeAnalyzer and the outputs last. Nodes that
+    do not take part in the network are placed in their own column before the outputs. Nodes and connections follow
+    the conventions of draw_net: inputs are gray boxes, outputs are blue circles, connections are green when their
+    weight is positive and red otherwise, their width grows with the weight and disabled ones are dotted.
+'''
+
+
+# Models
+from .models.genome_analyzer import GenomeAnalyzer
+
+# Utils
+from .genome_to_json import get_network_tables
+from xml.sax.saxutils import escape
+from os import replace
+
+
+# Layout, in pixels
+COLUMN_SPACING = 120
+ROW_SPACING = 40
+NODE_RADIUS = 12
+MARGIN = 30
+
+# Colors are written inside attributes
+QUOTE_ENTITIES = {'"': '&quot;'}
+
+
+def genome_columns(config, genome):
+    '''
+        Columns of nodes of a genome, from the inputs to the outputs: [[<Int: Node ID>]]
+    '''
+    # Finding layers
+    id_inputs, id_outputs, nodes, connections = get_network_tables(genome=genome, config=config)
+    genome_analyzer = GenomeAnalyzer(id_inputs=id_inputs, id_outputs=id_outputs, connections=connections, nodes=nodes)
+    genome_analyzer.filter_useful_connections()
+    genome_analyzer.construct_layers()
+
+    # The last layer holds the outputs, they keep the order of the configuration
+    hidden_layers = list(map(sorted, genome_analyzer.layers[:-1]))
+    layered_nodes = set(id_inputs) | set(id_outputs) | set().union(*genome_analyzer.layers)
+    unused_nodes = sorted(filter(lambda x: x not in layered_nodes, genome.nodes.keys()))
+
+    return [list(config.genome_config.input_keys)] + hidden_layers + ([unused_nodes] if unused_nodes else []) + \
+        [list(config.genome_config.output_keys)]
+
+
+def draw_net_svg(config, genome, filename=None, node_names=None, show_disabled=True, node_colors=None):
+    '''
+        Draws a feedforward genome like draw_net, but the SVG is written directly, without Graphviz.
+
+        - filename: if given, the SVG is written into filename + '.svg', the same file draw_net renders. It is
+            written into a temporary file first and renamed, so the file is always complete
+        - node_names: {<Int: Node ID>: <String: Name>}, the ID of the node is shown by default
+        - node_colors: {<Int: Node ID>: <String: SVG color>}
+
+        Returns the SVG as a string.
+    '''
+    if node_names is None:
+        node_names = {}
+
+    assert type(node_names) is dict
+
+    if node_colors is None:
+        node_colors = {}
+
+    assert type(node_colors) is dict
+
+    # Placing nodes
+    columns = genome_columns(config=config, genome=genome)
+    number_rows = max(map(len, columns))
+    positions = {}
+    for column_index, column in enumerate(columns):
+        # Columns are centered vertically
+        x = MARGIN + NODE_RADIUS + column_index * COLUMN_SPACING
+        top = MARGIN + NODE_RADIUS + (number_rows - len(column)) * ROW_SPACING / 2
+        for row_index, node_id in enumerate(column):
+            positions[node_id] = (x, top + row_index * ROW_SPACING)
+
+    width = 2 * (MARGIN + NODE_RADIUS) + (len(columns) - 1) * COLUMN_SPACING
+    height = 2 * (MARGIN + NODE_RADIUS) + (number_rows - 1) * ROW_SPACING
+    elements = [
+        '<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" viewBox="0 0 {} {}">'.format(
+            width, height, width, height
+        ),
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="6" markerHeight="6" '
+        'orient="auto-start-reverse"><path d="M 0 0 L 10 5 L 0 10 z"/></marker></defs>',
+    ]
+
+    # Drawing connections first, so nodes are drawn over them
+    for cg in genome.connections.values():
+        input_id, output_id = cg.key
+        if not (cg.enabled or show_disabled) or input_id not in positions or output_id not in positions:
+            continue
+
+        (x1, y1), (x2, y2) = positions[input_id], positions[output_id]
+        distance = max(((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5, 1.0)
+        dx, dy = NODE_RADIUS * (x2 - x1) / distance, NODE_RADIUS * (y2 - y1) / distance
+        elements.append(
+            '<line x1="{:.1f}" y1="{:.1f}" x2="{:.1f}" y2="{:.1f}" stroke="{}" stroke-width="{:.3f}"{} '
+            'marker-end="url(#arrow)"/>'.format(
+                x1 + dx, y1 + dy, x2 - dx, y2 - dy, 'green' if cg.weight > 0 else 'red', 0.1 + abs(cg.weight / 5.0),
+                '' if cg.enabled else ' stroke-dasharray="2,2"'
+            )
+        )
+
+    # Drawing nodes
+    id_inputs = set(config.genome_config.input_keys)
+    id_outputs = set(config.genome_config.output_keys)
+    for node_id, (x, y) in positions.items():
+        if node_id in id_inputs:
+            elements.append(
+                '<rect x="{:.1f}" y="{:.1f}" width="{}" height="{}" fill="{}" stroke="black"/>'.format(
+                    x - NODE_RADIUS, y - NODE_RADIUS, 2 * NODE_RADIUS, 2 * NODE_RADIUS,
+                    escape(node_colors.get(node_id, 'lightgray'), QUOTE_ENTITIES)
+                )
+            )
+        else:
+            elements.append(
+                '<circle cx="{:.1f}" cy="{:.1f}" r="{}" fill="{}" stroke="black"/>'.format(
+                    x, y, NODE_RADIUS,
+                    escape(node_colors.get(node_id, 'lightblue' if node_id in id_outputs else 'white'),
+                           QUOTE_ENTITIES)
+                )
+            )
+        elements.append(
+            '<text x="{:.1f}" y="{:.1f}" font-size="9" font-family="sans-serif" text-anchor="middle" '
+            'dominant-baseline="central">{}</text>'.format(x, y, escape(str(node_names.get(node_id, node_id))))
+        )
+
+    elements.append('</svg>')
+    svg = "\n".join(elements) + "\n"
+
+    if filename is not None:
+        with open(filename + '.svg.tmp', 'w') as svg_file:
+            svg_file.write(svg)
+        replace(filename + '.svg.tmp', filename + '.svg')
+
+    return svg
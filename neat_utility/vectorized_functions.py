@@ -0,0 +1,225 @@
+'''
+    Vectorized NumPy versions of the activation and aggregation functions of neat-python.
+
+    Activation functions receive an array and return an array of the same shape.
+
+    Aggregation functions receive the weighted inputs of the nodes and a boolean mask telling which of them
+    are connections of the node, both with shape [... x inputs], and reduce the last axis.
+    A node without connections aggregates to 0.0, except for product that aggregates to 1.0, like neat-python.
+'''
+
+
+import warnings
+
+import numpy as np
+
+
+def _sigmoid_activation(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0)))
+
+
+def _tanh_activation(z):
+    return np.tanh(np.clip(2.5 * z, -60.0, 60.0))
+
+
+def _sin_activation(z):
+    return np.sin(np.clip(5.0 * z, -60.0, 60.0))
+
+
+def _gauss_activation(z):
+    return np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2)
+
+
+def _relu_activation(z):
+    return np.where(z > 0.0, z, 0.0)
+
+
+def _elu_activation(z):
+    return np.where(z > 0.0, z, np.exp(np.minimum(z, 0.0)) - 1)
+
+
+def _lelu_activation(z):
+    return np.where(z > 0.0, z, 0.005 * z)
+
+
+def _selu_activation(z):
+    lam = 1.0507009873554804934193349852946
+    alpha = 1.6732632423543772848170429916717
+    return np.where(z > 0.0, lam * z, lam * alpha * (np.exp(np.minimum(z, 0.0)) - 1))
+
+
+def _softplus_activation(z):
+    return 0.2 * np.log(1 + np.exp(np.clip(5.0 * z, -60.0, 60.0)))
+
+
+def _identity_activation(z):
+    return z
+
+
+def _clamped_activation(z):
+    return np.clip(z, -1.0, 1.0)
+
+
+def _inv_activation(z):
+    with np.errstate(divide='ignore'):
+        return np.where(z == 0.0, 0.0, 1.0 / np.where(z == 0.0, 1.0, z))
+
+
+def _log_activation(z):
+    return np.log(np.maximum(z, 1e-7))
+
+
+def _exp_activation(z):
+    return np.exp(np.clip(z, -60.0, 60.0))
+
+
+def _abs_activation(z):
+    return np.abs(z)
+
+
+def _hat_activation(z):
+    return np.maximum(0.0, 1 - np.abs(z))
+
+
+def _square_activation(z):
+    return z ** 2
+
+
+def _cube_activation(z):
+    return z ** 3
+
+
+def _sum_aggregation(weighted_inputs, mask):
+    return np.sum(np.where(mask, weighted_inputs, 0.0), axis=-1)
+
+
+def _product_aggregation(weighted_inputs, mask):
+    return np.prod(np.where(mask, weighted_inputs, 1.0), axis=-1)
+
+
+def _max_aggregation(weighted_inputs, mask):
+    return np.where(
+        np.any(mask, axis=-1), np.max(np.where(mask, weighted_inputs, -np.inf), axis=-1, initial=-np.inf), 0.0
+    )
+
+
+def _min_aggregation(weighted_inputs, mask):
+    return np.where(
+        np.any(mask, axis=-1), np.min(np.where(mask, weighted_inputs, np.inf), axis=-1, initial=np.inf), 0.0
+    )
+
+
+def _maxabs_aggregation(weighted_inputs, mask):
+    # The first input with the largest absolute value, like max(x, key=abs)
+    mask = np.broadcast_to(mask, np.shape(weighted_inputs))
+    if np.shape(weighted_inputs)[-1] == 0:
+        return np.zeros(np.shape(weighted_inputs)[:-1])
+
+    indexes = np.argmax(np.where(mask, np.abs(weighted_inputs), -1.0), axis=-1)[..., None]
+    return np.where(
+        np.any(mask, axis=-1), np.take_along_axis(weighted_inputs, indexes, axis=-1)[..., 0], 0.0
+    )
+
+
+def _median_aggregation(weighted_inputs, mask):
+    # Averages the two middle values for an even number of inputs
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        median = np.nanmedian(np.where(mask, weighted_inputs, np.nan), axis=-1)
+
+    return np.where(np.any(mask, axis=-1), median, 0.0)
+
+
+def _mean_aggregation(weighted_inputs, mask):
+    number_inputs = np.sum(np.broadcast_to(mask, np.shape(weighted_inputs)), axis=-1)
+    return np.where(
+        number_inputs > 0, _sum_aggregation(weighted_inputs, mask) / np.maximum(number_inputs, 1), 0.0
+    )
+
+
+ACTIVATION_FUNCTIONS = {
+    "sigmoid": _sigmoid_activation,
+    "tanh": _tanh_activation,
+    "sin": _sin_activation,
+    "gauss": _gauss_activation,
+    "relu": _relu_activation,
+    "elu": _elu_activation,
+    "lelu": _lelu_activation,
+    "selu": _selu_activation,
+    "softplus": _softplus_activation,
+    "identity": _identity_activation,
+    "clamped": _clamped_activation,
+    "inv": _inv_activation,
+    "log": _log_activation,
+    "exp": _exp_activation,
+    "abs": _abs_activation,
+    "hat": _hat_activation,
+    "square": _square_activation,
+    "cube": _cube_activation,
+}
+
+AGGREGATION_FUNCTIONS = {
+    "sum": _sum_aggregation,
+    "product": _product_aggregation,
+    "max": _max_aggregation,
+    "min": _min_aggregation,
+    "maxabs": _maxabs_aggregation,
+    "median": _median_aggregation,
+    "mean": _mean_aggregation,
+}
+
+
+def register_activation_function(name, function):
+    # Sanity Check
+    assert callable(function)
+    ACTIVATION_FUNCTIONS[name] = function
+
+
+def register_aggregation_function(name, function):
+    # Sanity Check
+    assert callable(function)
+    AGGREGATION_FUNCTIONS[name] = function
+
+
+def get_activation_function(name):
+    if name not in ACTIVATION_FUNCTIONS:
+        raise ValueError("Unknown activation function: {!r}".format(name))
+
+    return ACTIVATION_FUNCTIONS[name]
+
+
+def get_aggregation_function(name):
+    if name not in AGGREGATION_FUNCTIONS:
+        raise ValueError("Unknown aggregation function: {!r}".format(name))
+
+    return AGGREGATION_FUNCTIONS[name]
+
+
+def _vectorize_aggregation(function):
+    # Applies a neat-python aggregation function to the connected inputs of every node
+    def vectorized_aggregation(weighted_inputs, mask):
+        mask = np.broadcast_to(mask, np.shape(weighted_inputs))
+        aggregated = np.empty(np.shape(weighted_inputs)[:-1])
+        for index in np.ndindex(aggregated.shape):
+            aggregated[index] = function(list(weighted_inputs[index][mask[index]]))
+
+        return aggregated
+
+    return vectorized_aggregation
+
+
+def register_config_functions(config):
+    '''
+        Registers the user defined activation and aggregation functions of a neat-python configuration that
+        do not have a vectorized version yet. They are applied element by element, so registering a vectorized
+        version with register_activation_function or register_aggregation_function is faster.
+    '''
+    genome_config = config.genome_config
+
+    for name, function in genome_config.activation_defs.functions.items():
+        if name not in ACTIVATION_FUNCTIONS:
+            register_activation_function(name=name, function=np.vectorize(function, otypes=[float]))
+
+    for name, function in genome_config.aggregation_function_defs.functions.items():
+        if name not in AGGREGATION_FUNCTIONS:
+            register_aggregation_function(name=name, function=_vectorize_aggregation(function))
@@ -15,7 +15,7 @@ setup(
                      ' easier to setup the algorithm and also includes a logging feature',
     long_description_content_type='text/x-rst',
     packages=['neat_utility', 'neat_utility/models'],
-    install_requires=['neat-python'],
+    install_requires=['neat-python', 'numpy'],
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
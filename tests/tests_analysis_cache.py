@@ -0,0 +1,135 @@
+# Models
+from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
+from neat_python_utility.neat_utility.models.connection import GenomeConnection
+from neat_python_utility.neat_utility.analysis_cache import AnalysisCache, structural_hash, construct_topology
+from neat_python_utility.tests.utils.tests_constants import TestCases
+
+# Utils
+import tempfile
+import numpy as np
+
+# Testing
+import unittest
+
+
+class AnalysisCacheTestCase(unittest.TestCase):
+    TEST_CASES = [
+        TestCases.SIMPLE_NN, TestCases.ABANDONED_NODES_ONE_NN, TestCases.ABANDONED_NODES_TWO_NN,
+        TestCases.ABANDONED_NODES_THREE_NN, TestCases.WEIRD_TOPOLOGY_ONE_NN, TestCases.WEIRD_TOPOLOGY_TWO_NN,
+        TestCases.WEIRD_TOPOLOGY_THREE_NN, TestCases.WEIRD_TOPOLOGY_FOUR_NN, TestCases.ASYMMETRIC_TOPOLOGY_ONE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_TWO_NN, TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_FOUR_NN,
+    ]
+
+    @staticmethod
+    def analyze(test_case, connections=None, cache=None):
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+            connections=test_case.connections if connections is None else connections, nodes=test_case.nodes
+        )
+        construct_topology(genome_analyzer=genome_analyzer, cache=cache)
+        genome_analyzer.construct_numpy_matrices()
+
+        return genome_analyzer
+
+    @staticmethod
+    def reweight(test_case, scale):
+        # Same topology, different weights
+        return list(
+            map(
+                lambda x: GenomeConnection(
+                    identification_number=x.identification_number, enabled=x.enabled, weight=x.weight * scale
+                ),
+                test_case.connections
+            )
+        )
+
+    def test_structural_hash(self):
+        test_case = TestCases.WEIRD_TOPOLOGY_FOUR_NN
+        expected_hash = structural_hash(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs, connections=test_case.connections
+        )
+
+        # Assertions: The order of the connections and the weights do not matter
+        self.assertEqual(
+            expected_hash,
+            structural_hash(
+                id_inputs=sorted(test_case.id_inputs), id_outputs=list(test_case.id_outputs),
+                connections=list(reversed(AnalysisCacheTestCase.reweight(test_case=test_case, scale=3.0)))
+            )
+        )
+
+        # Assertions: Connection keys, disabled ones included, inputs and outputs do matter
+        self.assertNotEqual(
+            expected_hash,
+            structural_hash(
+                id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs, connections=test_case.connections[1:]
+            )
+        )
+        self.assertNotEqual(
+            expected_hash,
+            structural_hash(
+                id_inputs=list(test_case.id_inputs) + [-9], id_outputs=test_case.id_outputs,
+                connections=test_case.connections
+            )
+        )
+
+    def test_cached_analysis(self):
+        cache = AnalysisCache()
+        for test_case in AnalysisCacheTestCase.TEST_CASES:
+            # Test: The first analysis fills the cache, the second one reuses it with other weights
+            AnalysisCacheTestCase.analyze(test_case=test_case, cache=cache)
+            connections = AnalysisCacheTestCase.reweight(test_case=test_case, scale=-2.0)
+            cached_genome_analyzer = AnalysisCacheTestCase.analyze(
+                test_case=test_case, connections=connections, cache=cache
+            )
+            genome_analyzer = AnalysisCacheTestCase.analyze(test_case=test_case, connections=connections)
+
+            # Assertions
+            self.assertEqual(genome_analyzer.layers, cached_genome_analyzer.layers)
+            self.assertEqual(genome_analyzer.inputs_per_layer, cached_genome_analyzer.inputs_per_layer)
+            for weights, cached_weights in zip(genome_analyzer.weights_arrays, cached_genome_analyzer.weights_arrays):
+                self.assertTrue(np.array_equal(weights, cached_weights))
+
+        self.assertEqual(len(AnalysisCacheTestCase.TEST_CASES), cache.hits)
+        self.assertEqual(len(AnalysisCacheTestCase.TEST_CASES), cache.misses)
+
+    def test_lru_eviction(self):
+        cache = AnalysisCache(max_entries=2)
+
+        # Test
+        cache.put(key="a", topology={"layers": [[0]]})
+        cache.put(key="b", topology={"layers": [[1]]})
+        cache.get(key="a")
+        cache.put(key="c", topology={"layers": [[2]]})
+
+        # Assertions: The least recently used entry is discarded
+        self.assertEqual(2, len(cache))
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Test: A cache writes the analyses, another one reads them
+            cache = AnalysisCache(max_entries=1, directory=directory)
+            for test_case in AnalysisCacheTestCase.TEST_CASES:
+                AnalysisCacheTestCase.analyze(test_case=test_case, cache=cache)
+
+            other_cache = AnalysisCache(directory=directory)
+            for test_case in AnalysisCacheTestCase.TEST_CASES:
+                cached_genome_analyzer = AnalysisCacheTestCase.analyze(test_case=test_case, cache=other_cache)
+                genome_analyzer = AnalysisCacheTestCase.analyze(test_case=test_case)
+
+                # Assertions
+                self.assertEqual(genome_analyzer.layers, cached_genome_analyzer.layers)
+                for weights, cached_weights in zip(
+                        genome_analyzer.weights_arrays, cached_genome_analyzer.weights_arrays):
+                    self.assertTrue(np.array_equal(weights, cached_weights))
+
+            self.assertEqual(len(AnalysisCacheTestCase.TEST_CASES), other_cache.hits)
+            self.assertEqual(0, other_cache.misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
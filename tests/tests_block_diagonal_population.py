@@ -0,0 +1,141 @@
+# Models
+from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
+from neat_python_utility.neat_utility.models.compiled_network import CompiledNetwork
+from neat_python_utility.neat_utility.models.block_diagonal_population import BlockDiagonalPopulation
+from neat_python_utility.neat_utility.models.node import GenomeNode
+from neat_python_utility.neat_utility.genome_compiler import compile_population
+from neat_python_utility.tests.utils.tests_constants import TestCases
+
+# Utils
+from types import SimpleNamespace
+import numpy as np
+
+# Testing
+import unittest
+
+
+class BlockDiagonalPopulationTestCase(unittest.TestCase):
+    # Test cases sharing the same inputs and outputs
+    TEST_CASES = [
+        TestCases.SKIPPED_INPUT_TO_OUTPUT_NN, TestCases.ABANDONED_NODES_ONE_NN, TestCases.ABANDONED_NODES_THREE_NN,
+        TestCases.WEIRD_TOPOLOGY_THREE_NN, TestCases.WEIRD_TOPOLOGY_FOUR_NN, TestCases.ASYMMETRIC_TOPOLOGY_ONE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_TWO_NN, TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_FOUR_NN,
+    ]
+
+    @staticmethod
+    def analyze(test_case, nodes):
+        # Instantiating a GenomeAnalysis object
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+            connections=test_case.connections, nodes=nodes
+        )
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+        genome_analyzer.construct_sparse_matrices()
+
+        return genome_analyzer
+
+    @staticmethod
+    def compile_network(test_case, nodes):
+        # Reference network built from the dense matrices
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+            connections=test_case.connections, nodes=nodes
+        )
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+        genome_analyzer.construct_numpy_matrices()
+
+        return CompiledNetwork.from_genome_analyzer(genome_analyzer=genome_analyzer)
+
+    def run_test(self, nodes_per_test_case):
+        random_generator = np.random.default_rng(seed=23)
+        genome_analyzers = list(
+            map(
+                lambda x: BlockDiagonalPopulationTestCase.analyze(test_case=x[0], nodes=x[1]),
+                zip(BlockDiagonalPopulationTestCase.TEST_CASES, nodes_per_test_case)
+            )
+        )
+
+        # Test
+        block_diagonal_population = BlockDiagonalPopulation(genome_analyzers=genome_analyzers)
+        shared_inputs = random_generator.uniform(-1e-3, 1e-3, size=[5, 2])
+        inputs = random_generator.uniform(-1e-3, 1e-3, size=[len(genome_analyzers), 5, 2])
+        shared_outputs = block_diagonal_population.activate(shared_inputs)
+        outputs = block_diagonal_population.activate(inputs)
+
+        # Assertions
+        self.assertEqual((len(genome_analyzers), 5, 1), outputs.shape)
+        for network_index, (test_case, nodes) in enumerate(
+                zip(BlockDiagonalPopulationTestCase.TEST_CASES, nodes_per_test_case)):
+            compiled_network = BlockDiagonalPopulationTestCase.compile_network(test_case=test_case, nodes=nodes)
+            self.assertTrue(np.allclose(compiled_network.activate(shared_inputs), shared_outputs[network_index]))
+            self.assertTrue(np.allclose(compiled_network.activate(inputs[network_index]), outputs[network_index]))
+
+        # Every column belongs to a network, and the inputs of a network come in a block
+        self.assertEqual(
+            list(range(len(genome_analyzers))), np.unique(block_diagonal_population.segment_ids).tolist()
+        )
+        self.assertEqual([0, 0, 1, 1], block_diagonal_population.segment_ids[:4].tolist())
+
+    def test_sum_aggregation(self):
+        self.run_test(nodes_per_test_case=list(map(lambda x: x.nodes, BlockDiagonalPopulationTestCase.TEST_CASES)))
+
+    def test_mixed_aggregations(self):
+        random_generator = np.random.default_rng(seed=29)
+        aggregation_functions = ["sum", "product", "max", "min", "maxabs", "median", "mean"]
+
+        # Nodes with random aggregation functions and responses
+        self.run_test(
+            nodes_per_test_case=list(
+                map(
+                    lambda x: list(
+                        map(
+                            lambda y: GenomeNode(
+                                node_id=y.node_id, bias=y.bias / 30.0, activation_function=y.activation_function,
+                                aggregation_function=random_generator.choice(aggregation_functions),
+                                response=random_generator.uniform(-2.0, 2.0)
+                            ),
+                            x.nodes
+                        )
+                    ),
+                    BlockDiagonalPopulationTestCase.TEST_CASES
+                )
+            )
+        )
+
+    def test_compile_population(self):
+        # Minimal stand-ins of neat-python genomes and configuration
+        config = SimpleNamespace(genome_config=SimpleNamespace(input_keys=[-1, -2], output_keys=[0]))
+        genomes = []
+        for genome_id, test_case in enumerate(BlockDiagonalPopulationTestCase.TEST_CASES):
+            nodes = {
+                node.node_id: SimpleNamespace(
+                    key=node.node_id, bias=node.bias, activation=node.activation_function, aggregation="sum",
+                    response=1.0
+                ) for node in test_case.nodes
+            }
+            connections = {
+                connection.identification_number: SimpleNamespace(
+                    key=connection.identification_number, enabled=connection.enabled, weight=connection.weight
+                ) for connection in test_case.connections
+            }
+            genomes.append((genome_id, SimpleNamespace(nodes=nodes, connections=connections)))
+
+        # Test
+        inputs = np.random.default_rng(seed=31).uniform(-1e-3, 1e-3, size=[4, 2])
+        block_diagonal_population = compile_population(genomes=genomes, config=config, block_diagonal=True)
+        outputs = block_diagonal_population.activate(inputs)
+
+        # Assertions
+        self.assertIsInstance(block_diagonal_population, BlockDiagonalPopulation)
+        for network_index, test_case in enumerate(BlockDiagonalPopulationTestCase.TEST_CASES):
+            compiled_network = BlockDiagonalPopulationTestCase.compile_network(
+                test_case=test_case, nodes=test_case.nodes
+            )
+            self.assertTrue(np.allclose(compiled_network.activate(inputs), outputs[network_index]))
+
+
+if __name__ == '__main__':
+    unittest.main()
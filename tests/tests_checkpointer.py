@@ -0,0 +1,177 @@
+# Models
+from neat_python_utility.neat_utility.checkpointer import AtomicCheckpointer, BackgroundCheckpointer, \
+    write_checkpoint, decompress, restore_checkpoint
+
+# AI
+import neat
+
+# Utils
+from types import SimpleNamespace
+from os.path import join, getsize, dirname
+from os import listdir
+import tempfile
+import pickle
+import gzip
+
+# Testing
+import unittest
+
+
+CONFIG_FILE = join(dirname(dirname(__file__)), 'example', 'artificial_intelligence', 'config-feedforward.txt')
+
+
+def xor_fitness(genome, config):
+    # Fitness of a genome of the example configuration
+    network = neat.nn.FeedForwardNetwork.create(genome, config)
+    return 4.0 - sum(map(lambda x: (network.activate(x[0])[0] - x[1]) ** 2,
+                         [((0.0, 0.0), 0.0), ((0.0, 1.0), 1.0), ((1.0, 0.0), 1.0), ((1.0, 1.0), 0.0)]))
+
+
+def evaluate_genomes(genomes, config):
+    for _, genome in genomes:
+        genome.fitness = xor_fitness(genome, config)
+
+
+class AtomicCheckpointerTestCase(unittest.TestCase):
+    COMPRESSIONS = [
+        AtomicCheckpointer.COMPRESSION_NONE, AtomicCheckpointer.COMPRESSION_GZIP, AtomicCheckpointer.COMPRESSION_LZMA,
+        AtomicCheckpointer.COMPRESSION_ZLIB
+    ]
+
+    @staticmethod
+    def population(number_genomes):
+        return {
+            genome_id: SimpleNamespace(key=genome_id, fitness=float(genome_id), weights=[0.5] * 50)
+            for genome_id in range(number_genomes)
+        }
+
+    def read_checkpoint(self, filename):
+        with open(filename, "rb") as checkpoint_file:
+            return pickle.loads(decompress(checkpoint_file.read()))
+
+    def test_save_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpointer = AtomicCheckpointer(1, filename_prefix=join(directory, "neat-checkpoint-"))
+            checkpointer.save_checkpoint(config=SimpleNamespace(pop_size=2), population={1: "genome"},
+                                         species_set={"species": 1}, generation=3)
+
+            # The checkpoint is written in the directory of the prefix, no temporary file is left
+            self.assertEqual(["neat-checkpoint-3"], listdir(directory))
+            with gzip.open(join(directory, "neat-checkpoint-3")) as checkpoint_file:
+                generation, config, population, species_set, _ = pickle.load(checkpoint_file)
+
+            self.assertEqual((3, 2, {1: "genome"}, {"species": 1}),
+                             (generation, config.pop_size, population, species_set))
+
+    def test_incomplete_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpointer = AtomicCheckpointer(1, filename_prefix=join(directory, "neat-checkpoint-"))
+
+            # A checkpoint that can not be written never takes the name of a complete checkpoint
+            with self.assertRaises(Exception):
+                checkpointer.save_checkpoint(config=SimpleNamespace(pop_size=2), population={1: lambda: None},
+                                             species_set={}, generation=4)
+            self.assertNotIn("neat-checkpoint-4", listdir(directory))
+
+    def test_compressions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            data = pickle.dumps(self.population(number_genomes=100))
+            sizes = {}
+            for compression in AtomicCheckpointerTestCase.COMPRESSIONS:
+                filename = join(directory, compression)
+                sizes[compression] = write_checkpoint(filename=filename, data=data, compression=compression)
+
+                # Assertions
+                self.assertEqual(sizes[compression], getsize(filename))
+                with open(filename, "rb") as checkpoint_file:
+                    self.assertEqual(data, decompress(checkpoint_file.read()))
+
+            # Checkpoints of neat.Checkpointer are gzip files
+            with gzip.open(join(directory, AtomicCheckpointer.COMPRESSION_GZIP)) as checkpoint_file:
+                self.assertEqual(data, checkpoint_file.read())
+            self.assertEqual(len(data), sizes[AtomicCheckpointer.COMPRESSION_NONE])
+            self.assertLess(sizes[AtomicCheckpointer.COMPRESSION_LZMA], len(data))
+
+    def test_background_checkpointer(self):
+        for use_processes in [True, False]:
+            with tempfile.TemporaryDirectory() as directory:
+                checkpointer = BackgroundCheckpointer(
+                    2, filename_prefix=join(directory, "neat-checkpoint-"),
+                    compression=AtomicCheckpointer.COMPRESSION_LZMA, max_pending=1, use_processes=use_processes
+                )
+                with checkpointer:
+                    # Checkpoints are saved every 2 generations by the reporter interface
+                    for generation in range(5):
+                        checkpointer.start_generation(generation)
+                        checkpointer.end_generation(config=SimpleNamespace(pop_size=generation),
+                                                    population=self.population(number_genomes=generation + 1),
+                                                    species_set={})
+
+                # Assertions
+                self.assertEqual(["neat-checkpoint-2", "neat-checkpoint-4"], sorted(listdir(directory)))
+                for generation in [2, 4]:
+                    filename = join(directory, "neat-checkpoint-{}".format(generation))
+                    saved_generation, config, population, _, _ = self.read_checkpoint(filename)
+                    self.assertEqual((generation, generation - 1, generation), (saved_generation, config.pop_size,
+                                                                                len(population)))
+                    self.assertEqual(getsize(filename), checkpointer.written[filename])
+
+    def test_background_failure(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpointer = BackgroundCheckpointer(
+                1, filename_prefix=join(directory, "missing_directory", "neat-checkpoint-"), use_processes=False
+            )
+            checkpointer.save_checkpoint(config=SimpleNamespace(pop_size=2), population={}, species_set={},
+                                         generation=1)
+
+            # Errors of the workers are raised when waiting for the checkpoints
+            with self.assertRaises(FileNotFoundError):
+                checkpointer.close()
+
+    def test_neat_population(self):
+        # The checkpointer is a reporter of the population, so it is also pickled along with the species set
+        config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                             neat.DefaultStagnation, CONFIG_FILE)
+        for compression in [AtomicCheckpointer.COMPRESSION_GZIP, AtomicCheckpointer.COMPRESSION_LZMA]:
+            for use_processes in [True, False]:
+                with tempfile.TemporaryDirectory() as directory:
+                    population = neat.Population(config)
+                    checkpointer = BackgroundCheckpointer(
+                        1, filename_prefix=join(directory, "neat-checkpoint-"), compression=compression,
+                        use_processes=use_processes
+                    )
+                    population.add_reporter(checkpointer)
+                    try:
+                        population.run(evaluate_genomes, 3)
+                    finally:
+                        checkpointer.close()
+
+                    # Assertions
+                    self.assertEqual(["neat-checkpoint-1", "neat-checkpoint-2", "neat-checkpoint-3"],
+                                     sorted(listdir(directory)))
+                    restored_population = restore_checkpoint(join(directory, "neat-checkpoint-3"))
+                    self.assertEqual(3, restored_population.generation)
+                    self.assertEqual(set(population.population), set(restored_population.population))
+
+                    restored_population.run(evaluate_genomes, 1)
+
+    def test_pickle_started_checkpointer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with BackgroundCheckpointer(1, filename_prefix=join(directory, "neat-checkpoint-")) as checkpointer:
+                checkpointer.save_checkpoint(config=SimpleNamespace(pop_size=2), population={}, species_set={},
+                                             generation=1)
+                restored_checkpointer = pickle.loads(pickle.dumps(checkpointer))
+
+            # Workers and pending writes are not pickled, the restored checkpointer starts its own workers
+            self.assertIsNone(restored_checkpointer._executor)
+            self.assertFalse(restored_checkpointer._pending)
+            self.assertEqual((checkpointer.filename_prefix, checkpointer.compression),
+                             (restored_checkpointer.filename_prefix, restored_checkpointer.compression))
+            with restored_checkpointer:
+                restored_checkpointer.save_checkpoint(config=SimpleNamespace(pop_size=2), population={},
+                                                      species_set={}, generation=2)
+            self.assertEqual(["neat-checkpoint-1", "neat-checkpoint-2"], sorted(listdir(directory)))
+
+
+if __name__ == '__main__':
+    unittest.main()
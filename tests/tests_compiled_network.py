@@ -0,0 +1,239 @@
+# Models
+from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
+from neat_python_utility.neat_utility.models.compiled_network import CompiledNetwork
+from neat_python_utility.neat_utility.models.node import GenomeNode
+from neat_python_utility.neat_utility.models.connection import GenomeConnection
+from neat_python_utility.neat_utility.genome_to_json import get_network_tables
+from neat_python_utility.tests.utils.tests_constants import TestCases
+from neat_python_utility.tests.utils.evolved_genomes import evolved_genomes
+
+# AI
+from neat.activations import ActivationFunctionSet
+from neat.aggregations import AggregationFunctionSet
+from neat.nn import FeedForwardNetwork
+
+# Utils
+from types import SimpleNamespace
+from tempfile import TemporaryDirectory
+from os.path import join
+from json import dump, dumps, loads
+from copy import deepcopy
+import numpy as np
+
+# Testing
+import unittest
+
+
+class CompiledNetworkTestCase(unittest.TestCase):
+    TEST_CASES = [
+        TestCases.SIMPLE_NN, TestCases.MULTIPLE_OUTPUTS_NN, TestCases.TWO_HIDDEN_LAYERS_NN,
+        TestCases.SKIPPED_INPUT_TO_OUTPUT_NN, TestCases.WEIRD_TOPOLOGY_ONE_NN, TestCases.WEIRD_TOPOLOGY_TWO_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_ONE_NN, TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN,
+    ]
+
+    @staticmethod
+    def analyze(test_case, nodes=None):
+        # Instantiating a GenomeAnalysis object
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+            connections=test_case.connections, nodes=test_case.nodes if nodes is None else nodes
+        )
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+
+        return genome_analyzer
+
+    @staticmethod
+    def reference_network(test_case, nodes=None):
+        # neat-python network created from the whole genome, useless connections included
+        config = SimpleNamespace(genome_config=SimpleNamespace(
+            input_keys=sorted(test_case.id_inputs, reverse=True), output_keys=sorted(test_case.id_outputs),
+            activation_defs=ActivationFunctionSet(), aggregation_function_defs=AggregationFunctionSet()
+        ))
+        genome = SimpleNamespace(
+            nodes={
+                node.node_id: SimpleNamespace(
+                    key=node.node_id, bias=node.bias, response=node.response, activation=node.activation_function,
+                    aggregation=node.aggregation_function
+                ) for node in (test_case.nodes if nodes is None else nodes)
+            },
+            connections={
+                connection.identification_number: SimpleNamespace(
+                    key=connection.identification_number, weight=connection.weight, enabled=connection.enabled
+                ) for connection in test_case.connections
+            }
+        )
+
+        return FeedForwardNetwork.create(genome, config)
+
+    def test_matches_neat_python(self):
+        inputs = np.random.default_rng(seed=7).uniform(-0.05, 0.05, size=[16, 4])
+
+        for test_case in CompiledNetworkTestCase.TEST_CASES:
+            genome_analyzer = CompiledNetworkTestCase.analyze(test_case=test_case)
+            reference = CompiledNetworkTestCase.reference_network(test_case=test_case)
+            genome_analyzer.construct_numpy_matrices()
+
+            # Test
+            compiled_network = CompiledNetwork.from_genome_analyzer(genome_analyzer=genome_analyzer)
+            batch_inputs = inputs[:, :len(test_case.id_inputs)]
+            outputs = compiled_network.activate(batch_inputs)
+
+            # Assertions
+            expected_outputs = np.array(list(map(lambda x: reference.activate(list(x)), batch_inputs)))
+            self.assertEqual((len(batch_inputs), len(test_case.id_outputs)), outputs.shape)
+            self.assertTrue(np.allclose(expected_outputs, outputs))
+            self.assertTrue(np.allclose(expected_outputs[0], compiled_network.activate(batch_inputs[0])))
+
+    def test_aggregations_and_responses(self):
+        random_generator = np.random.default_rng(seed=5)
+        aggregation_functions = ["sum", "product", "max", "min", "maxabs", "median", "mean"]
+
+        for test_case in CompiledNetworkTestCase.TEST_CASES:
+            # Nodes with random aggregation functions, responses and small weights
+            nodes = list(
+                map(
+                    lambda x: GenomeNode(
+                        node_id=x.node_id, bias=x.bias / 30.0, activation_function=x.activation_function,
+                        aggregation_function=random_generator.choice(aggregation_functions),
+                        response=random_generator.uniform(-2.0, 2.0)
+                    ),
+                    test_case.nodes
+                )
+            )
+            genome_analyzer = CompiledNetworkTestCase.analyze(test_case=test_case, nodes=nodes)
+            reference = CompiledNetworkTestCase.reference_network(test_case=test_case, nodes=nodes)
+            genome_analyzer.construct_numpy_matrices()
+
+            # Test
+            compiled_network = CompiledNetwork.from_genome_analyzer(genome_analyzer=genome_analyzer)
+            inputs = random_generator.uniform(-1e-3, 1e-3, size=[8, len(test_case.id_inputs)])
+            outputs = compiled_network.activate(inputs)
+
+            # Assertions
+            expected_outputs = np.array(list(map(lambda x: reference.activate(list(x)), inputs)))
+            self.assertTrue(np.allclose(expected_outputs, outputs))
+
+    def test_from_json(self):
+        test_case = TestCases.WEIRD_TOPOLOGY_TWO_NN
+        inputs_names = ["Input{}".format(x) for x in range(len(test_case.id_inputs))]
+        outputs_names = ["Output{}".format(x) for x in range(len(test_case.id_outputs))]
+        inputs = np.random.default_rng(seed=11).uniform(-0.05, 0.05, size=[8, len(test_case.id_inputs)])
+
+        # Dense and sparse maps
+        genome_analyzer = CompiledNetworkTestCase.analyze(test_case=test_case)
+        genome_analyzer.construct_matrices()
+        genome_analyzer.construct_sparse_matrices()
+        neural_network_maps = [
+            genome_analyzer.network_to_map(inputs_name=inputs_names, outputs_name=outputs_names),
+            genome_analyzer.network_to_sparse_map(inputs_name=inputs_names, outputs_name=outputs_names)
+        ]
+        expected_outputs = CompiledNetwork.from_genome_analyzer(genome_analyzer=genome_analyzer).activate(inputs)
+
+        with TemporaryDirectory() as directory:
+            for neural_network_map in neural_network_maps:
+                filename = join(directory, "network_dump.json")
+                with open(filename, "w") as outfile:
+                    dump(neural_network_map, outfile)
+
+                # Test
+                compiled_network = CompiledNetwork.from_json(filename=filename)
+
+                # Assertions
+                self.assertEqual(sorted(test_case.id_inputs, reverse=True), compiled_network.id_inputs)
+                self.assertTrue(np.allclose(expected_outputs, compiled_network.activate(inputs)))
+
+    def test_zero_weight_connections_from_json(self):
+        test_case = TestCases.WEIRD_TOPOLOGY_TWO_NN
+        inputs_names = ["Input{}".format(x) for x in range(len(test_case.id_inputs))]
+        outputs_names = ["Output{}".format(x) for x in range(len(test_case.id_outputs))]
+        inputs = np.random.default_rng(seed=29).uniform(0.5, 1.5, size=[8, len(test_case.id_inputs)])
+
+        # Node 6 multiplies its inputs, one of them through a connection with a weight of 0
+        nodes = list(
+            map(
+                lambda x: GenomeNode(
+                    node_id=x.node_id, bias=x.bias / 30.0, activation_function="identity",
+                    aggregation_function="product" if x.node_id == 6 else "min"
+                ),
+                test_case.nodes
+            )
+        )
+        connections = list(
+            map(
+                lambda x: GenomeConnection(
+                    identification_number=x.identification_number, enabled=x.enabled,
+                    weight=0.0 if x.identification_number == (2, 6) else x.weight / 1024.0
+                ),
+                test_case.connections
+            )
+        )
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs, connections=connections, nodes=nodes
+        )
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+        genome_analyzer.construct_matrices()
+        reference = CompiledNetworkTestCase.reference_network(
+            test_case=SimpleNamespace(id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+                                      nodes=nodes, connections=connections)
+        )
+
+        with TemporaryDirectory() as directory:
+            filename = join(directory, "network_dump.json")
+            with open(filename, "w") as outfile:
+                dump(genome_analyzer.network_to_map(inputs_name=inputs_names, outputs_name=outputs_names), outfile)
+
+            # Test
+            compiled_network = CompiledNetwork.from_json(filename=filename)
+
+        # Assertions
+        expected_outputs = np.array(list(map(lambda x: reference.activate(list(x)), inputs)))
+        self.assertTrue(np.allclose(expected_outputs, compiled_network.activate(inputs)))
+
+    def test_network_maps_match_neat_python(self):
+        config, genomes = evolved_genomes(seed=5)
+        inputs_names, outputs_names = ["Input0", "Input1"], ["Output0"]
+        inputs = np.random.default_rng(seed=37).uniform(-1.0, 1.0, size=[6, 2])
+
+        for genome_index, genome in enumerate(genomes):
+            # Every other genome multiplies the inputs of a node, one of them through a connection with a weight of 0
+            if genome_index % 2 and genome.connections:
+                genome = deepcopy(genome)
+                connection = genome.connections[sorted(genome.connections)[genome_index % len(genome.connections)]]
+                connection.weight = 0.0
+                genome.nodes[connection.key[1]].aggregation = "product"
+
+            id_inputs, id_outputs, nodes, connections = get_network_tables(genome=genome, config=config)
+            genome_analyzer = GenomeAnalyzer(id_inputs=id_inputs, id_outputs=id_outputs, connections=connections,
+                                             nodes=nodes, keep_bias_nodes=True)
+            genome_analyzer.filter_useful_connections()
+            genome_analyzer.construct_layers()
+            genome_analyzer.construct_matrices()
+            genome_analyzer.construct_sparse_matrices()
+            reference = FeedForwardNetwork.create(genome, config)
+            expected_outputs = np.array(list(map(lambda x: reference.activate(list(x)), inputs)))
+
+            # Dense map with its connections, dense map with a mask and CSR map
+            dense_map = loads(dumps(genome_analyzer.network_to_map(inputs_name=inputs_names,
+                                                                   outputs_name=outputs_names)))
+            masked_map = loads(dumps(dense_map))
+            for layer, mask in zip(masked_map["layers"], genome_analyzer.connection_masks_arrays):
+                del layer["connections"]
+                layer["mask"] = mask.tolist()
+            sparse_map = loads(dumps(genome_analyzer.network_to_sparse_map(inputs_name=inputs_names,
+                                                                           outputs_name=outputs_names)))
+
+            # Test
+            compiled_networks = [CompiledNetwork.from_genome_analyzer(genome_analyzer=genome_analyzer)] + list(
+                map(lambda x: CompiledNetwork.from_network_map(neural_network_map=x),
+                    [dense_map, masked_map, sparse_map])
+            )
+
+            # Assertions
+            for compiled_network in compiled_networks:
+                self.assertTrue(np.allclose(expected_outputs, compiled_network.activate(inputs)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# Models
+from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
+from neat_python_utility.neat_utility.models.compiled_network import CompiledNetwork
+from neat_python_utility.neat_utility.models.compiled_population import CompiledPopulation
+from neat_python_utility.neat_utility.models.node import GenomeNode
+from neat_python_utility.neat_utility.genome_compiler import compile_genome, compile_population
+from neat_python_utility.neat_utility.analysis_cache import AnalysisCache
+from neat_python_utility.tests.utils.tests_constants import TestCases
+
+# AI
+from neat.activations import ActivationFunctionSet
+from neat.aggregations import AggregationFunctionSet
+from neat.nn import FeedForwardNetwork
+
+# Utils
+from types import SimpleNamespace
+import numpy as np
+
+# Testing
+import unittest
+
+
+class CompiledPopulationTestCase(unittest.TestCase):
+    # Test cases sharing the same inputs and outputs
+    TEST_CASES = [
+        TestCases.SKIPPED_INPUT_TO_OUTPUT_NN, TestCases.ABANDONED_NODES_ONE_NN, TestCases.ABANDONED_NODES_THREE_NN,
+        TestCases.WEIRD_TOPOLOGY_THREE_NN, TestCases.WEIRD_TOPOLOGY_FOUR_NN, TestCases.ASYMMETRIC_TOPOLOGY_ONE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_TWO_NN, TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_FOUR_NN,
+    ]
+
+    @staticmethod
+    def analyze(test_case, nodes):
+        # Instantiating a GenomeAnalysis object
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+            connections=test_case.connections, nodes=nodes
+        )
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+        genome_analyzer.construct_numpy_matrices()
+
+        return genome_analyzer
+
+    def run_test(self, nodes_per_test_case):
+        random_generator = np.random.default_rng(seed=13)
+        genome_analyzers = list(
+            map(
+                lambda x: CompiledPopulationTestCase.analyze(test_case=x[0], nodes=x[1]),
+                zip(CompiledPopulationTestCase.TEST_CASES, nodes_per_test_case)
+            )
+        )
+
+        # Test
+        compiled_population = CompiledPopulation(genome_analyzers=genome_analyzers)
+        shared_inputs = random_generator.uniform(-1e-3, 1e-3, size=[5, 2])
+        inputs = random_generator.uniform(-1e-3, 1e-3, size=[len(genome_analyzers), 5, 2])
+        shared_outputs = compiled_population.activate(shared_inputs)
+        outputs = compiled_population.activate(inputs)
+
+        # Assertions
+        self.assertEqual((len(genome_analyzers), 5, 1), outputs.shape)
+        for network_index, genome_analyzer in enumerate(genome_analyzers):
+            compiled_network = CompiledNetwork.from_genome_analyzer(genome_analyzer=genome_analyzer)
+            self.assertTrue(np.allclose(compiled_network.activate(shared_inputs), shared_outputs[network_index]))
+            self.assertTrue(np.allclose(compiled_network.activate(inputs[network_index]), outputs[network_index]))
+
+    def test_sum_aggregation(self):
+        self.run_test(nodes_per_test_case=list(map(lambda x: x.nodes, CompiledPopulationTestCase.TEST_CASES)))
+
+    def test_mixed_aggregations(self):
+        random_generator = np.random.default_rng(seed=17)
+        aggregation_functions = ["sum", "product", "max", "min", "maxabs", "median", "mean"]
+
+        # Nodes with random aggregation functions and responses
+        self.run_test(
+            nodes_per_test_case=list(
+                map(
+                    lambda x: list(
+                        map(
+                            lambda y: GenomeNode(
+                                node_id=y.node_id, bias=y.bias / 30.0, activation_function=y.activation_function,
+                                aggregation_function=random_generator.choice(aggregation_functions),
+                                response=random_generator.uniform(-2.0, 2.0)
+                            ),
+                            x.nodes
+                        )
+                    ),
+                    CompiledPopulationTestCase.TEST_CASES
+                )
+            )
+        )
+
+    def test_compile_population(self):
+        # Minimal stand-ins of neat-python genomes and configuration
+        config = SimpleNamespace(genome_config=SimpleNamespace(input_keys=[-1, -2], output_keys=[0]))
+        genomes = []
+        for genome_id, test_case in enumerate(CompiledPopulationTestCase.TEST_CASES):
+            nodes = {
+                node.node_id: SimpleNamespace(
+                    key=node.node_id, bias=node.bias, activation=node.activation_function, aggregation="sum",
+                    response=1.0
+                ) for node in test_case.nodes
+            }
+            connections = {
+                connection.identification_number: SimpleNamespace(
+                    key=connection.identification_number, enabled=connection.enabled, weight=connection.weight
+                ) for connection in test_case.connections
+            }
+            genomes.append((genome_id, SimpleNamespace(nodes=nodes, connections=connections)))
+
+        # Test
+        inputs = np.random.default_rng(seed=19).uniform(-1e-3, 1e-3, size=[4, 2])
+        outputs = compile_population(genomes=genomes, config=config).activate(inputs)
+
+        # Assertions
+        for network_index, test_case in enumerate(CompiledPopulationTestCase.TEST_CASES):
+            genome_analyzer = CompiledPopulationTestCase.analyze(test_case=test_case, nodes=test_case.nodes)
+            compiled_network = CompiledNetwork.from_genome_analyzer(genome_analyzer=genome_analyzer)
+            self.assertTrue(np.allclose(compiled_network.activate(inputs), outputs[network_index]))
+
+    def test_bias_nodes(self):
+        # Nodes 2 and 3 have no incoming connections and node 4 only a disabled one, neat-python evaluates them as
+        # activation(bias) and feeds them to the nodes they connect to
+        config = SimpleNamespace(genome_config=SimpleNamespace(
+            input_keys=[-1, -2], output_keys=[0], activation_defs=ActivationFunctionSet(),
+            aggregation_function_defs=AggregationFunctionSet()
+        ))
+        nodes = {
+            node_id: SimpleNamespace(key=node_id, bias=bias, activation=activation, aggregation=aggregation,
+                                     response=response)
+            for node_id, bias, activation, aggregation, response in [
+                (0, 0.1, "tanh", "sum", 1.0), (1, -0.2, "sigmoid", "sum", 1.0), (2, 0.7, "tanh", "product", 1.5),
+                (3, -0.4, "sigmoid", "sum", 1.0), (4, 0.3, "relu", "sum", 1.0)
+            ]
+        }
+        connections = {
+            key: SimpleNamespace(key=key, enabled=enabled, weight=weight)
+            for key, weight, enabled in [
+                ((-1, 1), 0.8, True), ((-2, 0), -0.5, True), ((1, 0), 1.2, True), ((2, 0), 0.6, True),
+                ((3, 2), -0.9, True), ((-2, 4), 0.4, False), ((4, 0), -1.1, True)
+            ]
+        }
+        genome = SimpleNamespace(nodes=nodes, connections=connections)
+        reference = FeedForwardNetwork.create(genome, config)
+        inputs = np.random.default_rng(seed=23).uniform(-1.0, 1.0, size=[8, 2])
+        expected = np.array(list(map(lambda x: reference.activate(x), inputs)))
+
+        # Test
+        cache = AnalysisCache()
+        outputs = [
+            compile_genome(genome=genome, config=config).activate(inputs),
+            compile_genome(genome=genome, config=config, cache=cache).activate(inputs),
+            compile_genome(genome=genome, config=config, cache=cache).activate(inputs),
+            compile_population(genomes=[genome, genome], config=config).activate(inputs)[1],
+            compile_population(genomes=[genome, genome], config=config, block_diagonal=True).activate(inputs)[1]
+        ]
+
+        # Assertions
+        for output in outputs:
+            self.assertTrue(np.allclose(expected, output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 # Models
 from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
+from neat_python_utility.neat_utility.models.genome_graph import GenomeGraph
+from neat_python_utility.neat_utility.models.connection import GenomeConnection
 from .utils.tests_constants import TestCases
 
 # Testing
@@ -21,16 +23,17 @@ class ConnectionAnalysisTestCase(unittest.TestCase):
             )
         )
 
-        # Test
-        filtered_connections = GenomeAnalyzer(
-            id_inputs=id_inputs, id_outputs=id_outputs,
-            connections=connections, nodes=None,
-        )
+        # Test every filter mode
+        for mode in [GenomeAnalyzer.FILTER_MODE_REACHABILITY, GenomeAnalyzer.FILTER_MODE_RECURSIVE]:
+            filtered_connections = GenomeAnalyzer(
+                id_inputs=id_inputs, id_outputs=id_outputs,
+                connections=connections, nodes=None,
+            )
 
-        filtered_connections.filter_useful_connections()
+            filtered_connections.filter_useful_connections(mode=mode)
 
-        # Assertions
-        self.assertEqual(expected_useful_connections, filtered_connections.connections)
+            # Assertions
+            self.assertEqual(expected_useful_connections, filtered_connections.connections)
 
     def test_simple_nn(self):
         # Setting up connections
@@ -187,6 +190,59 @@ class ConnectionAnalysisTestCase(unittest.TestCase):
             expected_connection_keys=expected_connections_keys,
         )
 
+    def test_deep_chain_nn(self):
+        # Chain of hidden nodes deeper than the recursion limit
+        number_hidden_nodes = 5000
+        node_ids = [-1] + list(range(1, number_hidden_nodes + 1)) + [0]
+        connections = list(
+            map(
+                lambda x: GenomeConnection(identification_number=x, enabled=True, weight=1.0),
+                zip(node_ids[:-1], node_ids[1:])
+            )
+        )
+
+        for mode in [GenomeAnalyzer.FILTER_MODE_REACHABILITY, GenomeAnalyzer.FILTER_MODE_RECURSIVE]:
+            genome_analyzer = GenomeAnalyzer(id_inputs={-1}, id_outputs={0}, connections=connections, nodes=None)
+            genome_analyzer.filter_useful_connections(mode=mode)
+
+            # Assertions
+            self.assertEqual(connections, genome_analyzer.connections)
+
+    def test_cycle_detection(self):
+        # 1 -> 2 -> 3 -> 1 is a cycle, 4 is connected to itself
+        connections = list(
+            map(
+                lambda x: GenomeConnection(identification_number=x, enabled=True, weight=1.0),
+                [(-1, 1), (1, 2), (2, 3), (3, 1), (3, 0), (-1, 4), (4, 4), (4, 0)]
+            )
+        )
+
+        cycles = GenomeGraph(connections=connections).find_cycles()
+        self.assertEqual(sorted(map(sorted, cycles)), [[1, 2, 3], [4]])
+
+        for mode in [GenomeAnalyzer.FILTER_MODE_REACHABILITY, GenomeAnalyzer.FILTER_MODE_RECURSIVE]:
+            genome_analyzer = GenomeAnalyzer(id_inputs={-1}, id_outputs={0}, connections=connections, nodes=None)
+            with self.assertRaises(ValueError):
+                genome_analyzer.filter_useful_connections(mode=mode)
+
+    def test_strongly_connected_components_order(self):
+        # Every component is listed after the components it connects to
+        connections = list(
+            map(
+                lambda x: GenomeConnection(identification_number=x, enabled=True, weight=1.0),
+                TestCases.ASYMMETRIC_TOPOLOGY_ONE_NN.connections_keys
+            )
+        )
+        genome_graph = GenomeGraph(connections=connections)
+        components = genome_graph.strongly_connected_components()
+        positions = {next(iter(x)): position for position, x in enumerate(components)}
+
+        # Assertions
+        self.assertTrue(all(map(lambda x: len(x) == 1, components)))
+        self.assertFalse(genome_graph.find_cycles())
+        for connection_key in genome_graph.connections_by_key:
+            self.assertGreater(positions[connection_key[0]], positions[connection_key[1]])
+
 
 if __name__ == '__main__':
     unittest.main()
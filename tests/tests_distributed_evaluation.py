@@ -0,0 +1,195 @@
+# Models
+from neat_python_utility.neat_utility.distributed_evaluation import DistributedEvaluator, run_worker, \
+    genome_to_payload, payload_to_genome, send_message, receive_message
+from neat_python_utility.neat_utility.genome_compiler import compile_genome
+from neat_python_utility.tests.utils.tests_constants import TestCases
+
+# Utils
+from types import SimpleNamespace
+import threading
+import socket
+import time
+import numpy as np
+
+# Testing
+import unittest
+
+
+def weights_fitness(genome, config):
+    # Fitness of a genome, computed from its weights and the configuration
+    return config.scale * sum(map(lambda x: x.weight, genome.connections.values()))
+
+
+class DistributedEvaluationTestCase(unittest.TestCase):
+    @staticmethod
+    def create_genomes(number_genomes):
+        genomes = []
+        for genome_id in range(number_genomes):
+            nodes = {
+                0: SimpleNamespace(key=0, bias=0.5, response=1.0, activation="sigmoid", aggregation="sum")
+            }
+            connections = {
+                (-1, 0): SimpleNamespace(key=(-1, 0), weight=float(genome_id), enabled=True),
+                (-2, 0): SimpleNamespace(key=(-2, 0), weight=0.25, enabled=False),
+            }
+            genomes.append((genome_id, SimpleNamespace(key=genome_id, fitness=None, nodes=nodes,
+                                                       connections=connections)))
+
+        return genomes
+
+    @staticmethod
+    def start_worker(address, config, heartbeat_interval=0.1):
+        worker_thread = threading.Thread(
+            target=run_worker,
+            kwargs={"address": address, "fitness_function": weights_fitness, "config": config,
+                    "heartbeat_interval": heartbeat_interval},
+            daemon=True
+        )
+        worker_thread.start()
+        return worker_thread
+
+    def wait_for_workers(self, evaluator, number_workers):
+        deadline = time.monotonic() + 5.0
+        while evaluator.number_workers != number_workers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(number_workers, evaluator.number_workers)
+
+    def assert_fitness(self, genomes, config):
+        for genome_id, genome in genomes:
+            self.assertAlmostEqual(config.scale * (genome_id + 0.25), genome.fitness)
+
+    def test_payload(self):
+        # Test
+        test_case = TestCases.WEIRD_TOPOLOGY_FOUR_NN
+        genome = SimpleNamespace(
+            key=7,
+            nodes={
+                node.node_id: SimpleNamespace(key=node.node_id, bias=node.bias, response=1.5,
+                                              activation=node.activation_function, aggregation="sum")
+                for node in test_case.nodes
+            },
+            connections={
+                connection.identification_number: SimpleNamespace(
+                    key=connection.identification_number, weight=connection.weight, enabled=connection.enabled
+                )
+                for connection in test_case.connections
+            }
+        )
+        rebuilt_genome = payload_to_genome(genome_to_payload(genome))
+
+        # Assertions
+        self.assertEqual(7, rebuilt_genome.key)
+        self.assertEqual(genome_to_payload(genome), genome_to_payload(rebuilt_genome))
+
+        config = SimpleNamespace(genome_config=SimpleNamespace(input_keys=test_case.id_inputs,
+                                                               output_keys=test_case.id_outputs))
+        inputs = np.random.default_rng(seed=37).uniform(-1e-3, 1e-3, size=[3, len(test_case.id_inputs)])
+        self.assertTrue(
+            np.allclose(
+                compile_genome(genome=genome, config=config).activate(inputs),
+                compile_genome(genome=rebuilt_genome, config=config).activate(inputs)
+            )
+        )
+
+    def test_several_workers(self):
+        config = SimpleNamespace(scale=2.0)
+        genomes = DistributedEvaluationTestCase.create_genomes(number_genomes=45)
+
+        with DistributedEvaluator(address=("127.0.0.1", 0), genomes_per_task=4) as evaluator:
+            worker_threads = list(
+                map(lambda x: DistributedEvaluationTestCase.start_worker(address=evaluator.address, config=config),
+                    range(3))
+            )
+            self.wait_for_workers(evaluator=evaluator, number_workers=3)
+
+            # Test
+            for expected_generation in range(1, 4):
+                generation, fittest_agent = evaluator.evaluate(genomes=genomes, config=config)
+
+                # Assertions
+                self.assertEqual(expected_generation, generation)
+                self.assert_fitness(genomes=genomes, config=config)
+                self.assertEqual(44, fittest_agent.genome.key)
+
+        # Assertions: Workers are shut down by the coordinator
+        for worker_thread in worker_threads:
+            worker_thread.join(timeout=5.0)
+            self.assertFalse(worker_thread.is_alive())
+
+    def test_dead_workers(self):
+        config = SimpleNamespace(scale=0.5)
+        genomes = DistributedEvaluationTestCase.create_genomes(number_genomes=30)
+
+        with DistributedEvaluator(address=("127.0.0.1", 0), genomes_per_task=5, heartbeat_timeout=0.5) as evaluator:
+            # A worker that disconnects as soon as it receives a task
+            crashing_worker = socket.create_connection(evaluator.address)
+            send_message(crashing_worker, {"type": "hello"})
+
+            # A worker that hangs: it takes tasks but never answers nor sends heartbeats
+            hanging_worker = socket.create_connection(evaluator.address)
+            send_message(hanging_worker, {"type": "hello"})
+            self.wait_for_workers(evaluator=evaluator, number_workers=2)
+
+            def crash():
+                receive_message(crashing_worker)
+                crashing_worker.close()
+
+            crash_thread = threading.Thread(target=crash, daemon=True)
+            crash_thread.start()
+
+            # Test: a healthy worker joins later and takes over the tasks of the dead ones
+            threading.Timer(
+                0.2, lambda: DistributedEvaluationTestCase.start_worker(address=evaluator.address, config=config)
+            ).start()
+            generation, fittest_agent = evaluator.evaluate(genomes=genomes, config=config)
+
+            # Assertions
+            self.assertEqual(1, generation)
+            self.assert_fitness(genomes=genomes, config=config)
+            self.assertEqual(29, fittest_agent.genome.key)
+            self.assertEqual(1, evaluator.number_workers)
+
+            crash_thread.join()
+            hanging_worker.close()
+
+    def test_no_workers(self):
+        config = SimpleNamespace(scale=1.0)
+        genomes = DistributedEvaluationTestCase.create_genomes(number_genomes=10)
+
+        with DistributedEvaluator(address=("127.0.0.1", 0), no_worker_timeout=0.3) as evaluator:
+            # Test: nobody evaluates the genomes
+            with self.assertRaises(TimeoutError):
+                evaluator.evaluate(genomes=genomes, config=config)
+
+            # Assertions: the tasks of the generation are discarded, the next one is evaluated by a new worker
+            self.assertEqual((0, 0), (len(evaluator._tasks), len(evaluator._pending_tasks)))
+            DistributedEvaluationTestCase.start_worker(address=evaluator.address, config=config)
+            self.wait_for_workers(evaluator=evaluator, number_workers=1)
+            generation, _ = evaluator.evaluate(genomes=genomes, config=config)
+            self.assertEqual(2, generation)
+            self.assert_fitness(genomes=genomes, config=config)
+
+    def test_evaluation_timeout(self):
+        config = SimpleNamespace(scale=1.0)
+        genomes = DistributedEvaluationTestCase.create_genomes(number_genomes=10)
+
+        with DistributedEvaluator(address=("127.0.0.1", 0), evaluation_timeout=0.5) as evaluator:
+            # A worker that takes tasks but never answers, before its heartbeats time out
+            hanging_worker = socket.create_connection(evaluator.address)
+            send_message(hanging_worker, {"type": "hello"})
+            self.wait_for_workers(evaluator=evaluator, number_workers=1)
+
+            # Test
+            start = time.monotonic()
+            with self.assertRaises(TimeoutError):
+                evaluator.evaluate(genomes=genomes, config=config)
+
+            # Assertions
+            self.assertLess(time.monotonic() - start, 5.0)
+            self.assertEqual((0, 0), (len(evaluator._tasks), len(evaluator._pending_tasks)))
+            self.assertEqual(set(), evaluator._workers[0].tasks)
+            hanging_worker.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
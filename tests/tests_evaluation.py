@@ -0,0 +1,197 @@
+# Models
+from neat_python_utility.neat_utility.evaluation import GenomeAgent, ProcessPoolEvaluator, ThreadPoolEvaluator, \
+    AsyncioEvaluator
+
+# Utils
+from types import SimpleNamespace
+import threading
+import asyncio
+import json
+import time
+import os
+
+# Testing
+import unittest
+
+
+def weights_fitness(genome, config):
+    # Fitness of a stand-in genome, computed from its weights and the configuration
+    return config.scale * sum(genome.weights)
+
+
+def worker_fitness(genome, config):
+    # Identifies the worker process that evaluated the genome
+    return float(os.getpid())
+
+
+async def simulator_fitness(genome, config):
+    # Sends the weights of the genome to the simulator and waits for its fitness
+    reader, writer = await asyncio.open_connection(*config.simulator_address)
+    writer.write((json.dumps({"weights": genome.weights, "scale": config.scale}) + "\n").encode())
+    await writer.drain()
+    fitness = float(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+
+    return fitness
+
+
+class SimulatorServer:
+    '''
+        Stand-in of a simulator running in another process: it takes a while to reply with the fitness of a genome.
+        It runs its own event loop in a background thread.
+    '''
+    def __init__(self, episode_duration):
+        self.episode_duration = episode_duration
+        self.address = None
+        self._event_loop = asyncio.new_event_loop()
+        self._server = None
+        self._thread = threading.Thread(target=self._event_loop.run_forever, daemon=True)
+
+    async def _handle_episode(self, reader, writer):
+        request = json.loads(await reader.readline())
+        await asyncio.sleep(self.episode_duration)
+        writer.write("{}\n".format(request["scale"] * sum(request["weights"])).encode())
+        await writer.drain()
+        writer.close()
+
+    def __enter__(self):
+        self._server = self._event_loop.run_until_complete(
+            asyncio.start_server(self._handle_episode, host="127.0.0.1", port=0)
+        )
+        self.address = self._server.sockets[0].getsockname()[:2]
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.close()
+        asyncio.run_coroutine_threadsafe(self._server.wait_closed(), self._event_loop).result()
+        self._event_loop.call_soon_threadsafe(self._event_loop.stop)
+        self._thread.join()
+        self._event_loop.close()
+
+
+class WeightsSimulation:
+    # Stand-in simulation keeping mutable state, like XorGateGame
+    def __init__(self):
+        self.generation = 0
+        self.thread_ids = set()
+
+    def simulation(self, genomes, config):
+        self.generation += 1
+        self.thread_ids.add(threading.get_ident())
+
+        agents = []
+        for genome_id, genome in genomes:
+            genome.fitness = weights_fitness(genome=genome, config=config)
+            agents.append(GenomeAgent(genome=genome))
+
+        return self.generation, sorted(agents)[0]
+
+
+class EvaluationTestCase(unittest.TestCase):
+    @staticmethod
+    def create_genomes(number_genomes):
+        return list(
+            map(
+                lambda x: (x, SimpleNamespace(key=x, weights=[x, -0.5 * x, 1.0], fitness=None)),
+                range(number_genomes)
+            )
+        )
+
+    def test_genome_agent(self):
+        agents = list(
+            map(lambda x: GenomeAgent(genome=SimpleNamespace(fitness=x)), [1.0, 3.0, -2.0])
+        )
+
+        # Fittest agent comes first
+        self.assertEqual(3.0, sorted(agents)[0].genome.fitness)
+        self.assertEqual("", GenomeAgent.log_stats(agent=agents[0]))
+
+    def test_process_pool_evaluator(self):
+        config = SimpleNamespace(scale=2.0)
+        genomes = EvaluationTestCase.create_genomes(number_genomes=37)
+
+        with ProcessPoolEvaluator(fitness_function=weights_fitness, config=config, number_workers=3) as evaluator:
+            # Test
+            for expected_generation in range(1, 4):
+                generation, fittest_agent = evaluator.evaluate(genomes=genomes, config=config)
+
+                # Assertions
+                self.assertEqual(expected_generation, generation)
+                for genome_id, genome in genomes:
+                    self.assertAlmostEqual(config.scale * (0.5 * genome_id + 1.0), genome.fitness)
+                self.assertEqual(36, fittest_agent.genome.key)
+
+    def test_persistent_workers(self):
+        config = SimpleNamespace()
+        genomes = EvaluationTestCase.create_genomes(number_genomes=40)
+
+        with ProcessPoolEvaluator(fitness_function=worker_fitness, config=config, number_workers=2) as evaluator:
+            # Test
+            worker_ids = set()
+            for _ in range(3):
+                evaluator.evaluate(genomes=genomes, config=config)
+                worker_ids.update(map(lambda x: x[1].fitness, genomes))
+
+        # Assertions: Genomes are evaluated in other processes, which are reused by every generation
+        self.assertNotIn(float(os.getpid()), worker_ids)
+        self.assertLessEqual(len(worker_ids), 2)
+
+    def test_thread_pool_evaluator(self):
+        config = SimpleNamespace(scale=0.5)
+        genomes = EvaluationTestCase.create_genomes(number_genomes=50)
+        simulations = []
+        simulations_lock = threading.Lock()
+
+        def simulation_factory():
+            simulation = WeightsSimulation()
+            with simulations_lock:
+                simulations.append(simulation)
+            return simulation.simulation
+
+        with ThreadPoolEvaluator(
+                simulation_factory=simulation_factory, number_workers=4, chunks_per_worker=3) as evaluator:
+            # Test
+            for expected_generation in range(1, 4):
+                generation, fittest_agent = evaluator.evaluate(genomes=genomes, config=config)
+
+                # Assertions
+                self.assertEqual(expected_generation, generation)
+                for genome_id, genome in genomes:
+                    self.assertAlmostEqual(config.scale * (0.5 * genome_id + 1.0), genome.fitness)
+                self.assertEqual(49, fittest_agent.genome.key)
+
+        # Assertions: Every thread has its own simulation
+        self.assertLessEqual(len(simulations), 4)
+        for simulation in simulations:
+            self.assertEqual(1, len(simulation.thread_ids))
+
+    def test_asyncio_evaluator(self):
+        genomes = EvaluationTestCase.create_genomes(number_genomes=40)
+
+        with SimulatorServer(episode_duration=0.025) as simulator_server:
+            config = SimpleNamespace(scale=3.0, simulator_address=simulator_server.address)
+            elapsed_times = []
+            for max_concurrency in [1, 40]:
+                with AsyncioEvaluator(fitness_function=simulator_fitness, max_concurrency=max_concurrency) \
+                        as evaluator:
+                    # Test
+                    start_time = time.perf_counter()
+                    for expected_generation in range(1, 3):
+                        generation, fittest_agent = evaluator.evaluate(genomes=genomes, config=config)
+
+                        # Assertions
+                        self.assertEqual(expected_generation, generation)
+                        for genome_id, genome in genomes:
+                            self.assertAlmostEqual(config.scale * (0.5 * genome_id + 1.0), genome.fitness)
+                        self.assertEqual(39, fittest_agent.genome.key)
+
+                    elapsed_times.append(time.perf_counter() - start_time)
+
+        # Assertions: Evaluating one genome at a time, like the serial path, is much slower
+        self.assertLess(elapsed_times[1] * 4, elapsed_times[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,317 @@
+# Models
+from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
+from neat_python_utility.neat_utility.models.genome_tables import ConnectionTable, NodeTable
+from neat_python_utility.neat_utility.models.connection import GenomeConnection
+from neat_python_utility.neat_utility.models.node import GenomeNode
+from neat_python_utility.neat_utility.analysis_cache import AnalysisCache, construct_topology
+from neat_python_utility.neat_utility.genome_to_json import get_network_metadata, get_population_tables
+from neat_python_utility.tests.utils.tests_constants import TestCases
+
+# Utils
+from types import SimpleNamespace
+import numpy as np
+import random
+
+# Testing
+import unittest
+
+
+class GenomeTablesTestCase(unittest.TestCase):
+    TEST_CASES = [
+        TestCases.SIMPLE_NN, TestCases.MULTIPLE_OUTPUTS_NN, TestCases.TWO_HIDDEN_LAYERS_NN,
+        TestCases.SKIPPED_INPUT_TO_OUTPUT_NN, TestCases.ABANDONED_NODES_ONE_NN, TestCases.ABANDONED_NODES_TWO_NN,
+        TestCases.ABANDONED_NODES_THREE_NN, TestCases.WEIRD_TOPOLOGY_ONE_NN, TestCases.WEIRD_TOPOLOGY_TWO_NN,
+        TestCases.WEIRD_TOPOLOGY_THREE_NN, TestCases.WEIRD_TOPOLOGY_FOUR_NN, TestCases.ASYMMETRIC_TOPOLOGY_ONE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_TWO_NN, TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_FOUR_NN,
+    ]
+
+    @staticmethod
+    def analyze(test_case, connections, nodes, cache=None):
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs, connections=connections, nodes=nodes
+        )
+        construct_topology(genome_analyzer=genome_analyzer, cache=cache)
+        genome_analyzer.construct_numpy_matrices()
+        genome_analyzer.construct_sparse_matrices()
+
+        return genome_analyzer
+
+    @staticmethod
+    def mutate(test_case, random_generator):
+        # Same structure, with other weights, enabled flags, biases and functions
+        connections = list(
+            map(
+                lambda x: GenomeConnection(identification_number=x.identification_number,
+                                           enabled=random_generator.random() < 0.8,
+                                           weight=random_generator.uniform(-2.0, 2.0)),
+                test_case.connections
+            )
+        )
+        nodes = list(
+            map(
+                lambda x: GenomeNode(
+                    node_id=x.node_id, bias=random_generator.uniform(-1.0, 1.0),
+                    activation_function=random_generator.choice(["sigmoid", "relu", "tanh"]),
+                    aggregation_function=random_generator.choice(["sum", "max"]),
+                    response=random_generator.uniform(0.5, 1.5)
+                ),
+                test_case.nodes
+            )
+        )
+
+        return connections, nodes
+
+    def assert_same_analysis(self, expected_genome_analyzer, genome_analyzer):
+        self.assertEqual(
+            set(map(lambda x: x.identification_number, expected_genome_analyzer.connections)),
+            set(map(lambda x: x.identification_number, genome_analyzer.connections))
+        )
+        self.assertEqual(expected_genome_analyzer.layers, genome_analyzer.layers)
+        self.assertEqual(expected_genome_analyzer.inputs_per_layer, genome_analyzer.inputs_per_layer)
+
+        for array_name in ["weights_arrays", "connection_masks_arrays", "biases_arrays", "responses_arrays"]:
+            for expected_array, array in zip(
+                    getattr(expected_genome_analyzer, array_name), getattr(genome_analyzer, array_name)):
+                self.assertTrue(np.array_equal(expected_array, array))
+        for expected_sparse_weights, sparse_weights in zip(
+                expected_genome_analyzer.sparse_weights_arrays, genome_analyzer.sparse_weights_arrays):
+            for expected_array, array in zip(expected_sparse_weights, sparse_weights):
+                self.assertTrue(np.array_equal(expected_array, array))
+
+        # Codes may differ, the functions of every node must not
+        for array_name, function_names_name in [("activation_codes_arrays", "activation_functions"),
+                                                ("aggregation_codes_arrays", "aggregation_functions")]:
+            for expected_codes, codes in zip(
+                    getattr(expected_genome_analyzer, array_name), getattr(genome_analyzer, array_name)):
+                self.assertEqual(
+                    GenomeAnalyzer._function_names(expected_codes,
+                                                   getattr(expected_genome_analyzer, function_names_name)),
+                    GenomeAnalyzer._function_names(codes, getattr(genome_analyzer, function_names_name))
+                )
+
+    def test_round_trip(self):
+        for test_case in GenomeTablesTestCase.TEST_CASES:
+            connection_table = ConnectionTable.from_connections(test_case.connections)
+            node_table = NodeTable.from_nodes(test_case.nodes)
+
+            # Assertions
+            self.assertEqual(len(connection_table), len(test_case.connections))
+            self.assertEqual(connection_table.keys(), list(map(lambda x: x.identification_number,
+                                                               test_case.connections)))
+            self.assertEqual(
+                list(map(lambda x: (x.identification_number, x.enabled, x.weight), test_case.connections)),
+                list(map(lambda x: (x.identification_number, x.enabled, x.weight),
+                         connection_table.to_connections()))
+            )
+            self.assertEqual(
+                list(map(lambda x: (x.node_id, x.bias, x.activation_function, x.aggregation_function, x.response),
+                         test_case.nodes)),
+                list(map(lambda x: (x.node_id, x.bias, x.activation_function, x.aggregation_function, x.response),
+                         node_table.to_nodes()))
+            )
+
+    def test_from_genome(self):
+        genome = SimpleNamespace(
+            nodes={
+                0: SimpleNamespace(key=0, bias=0.5, response=1.0, activation="sigmoid", aggregation="sum"),
+                1: SimpleNamespace(key=1, bias=-0.5, response=2.0, activation="relu", aggregation="max"),
+            },
+            connections={
+                (-1, 1): SimpleNamespace(key=(-1, 1), weight=0.25, enabled=True),
+                (1, 0): SimpleNamespace(key=(1, 0), weight=-1.5, enabled=False),
+            }
+        )
+        connection_table = ConnectionTable.from_genome(genome=genome)
+        node_table = NodeTable.from_genome(genome=genome)
+
+        # Assertions
+        self.assertEqual(connection_table.keys(), [(-1, 1), (1, 0)])
+        self.assertEqual(connection_table.weights.tolist(), [0.25, -1.5])
+        self.assertEqual(connection_table.enabled.tolist(), [True, False])
+        self.assertEqual(node_table.node_ids.tolist(), [0, 1])
+        self.assertEqual(node_table.activation_functions, ["sigmoid", "relu"])
+        self.assertEqual(node_table.aggregation_codes.tolist(), [0, 1])
+        self.assertEqual(node_table.rows([1, 5, 0]).tolist(), [1, -1, 0])
+
+    @staticmethod
+    def genome(test_case, random_generator):
+        # Genes in the same shape as the ones of neat-python, in a random order
+        connections, nodes = GenomeTablesTestCase.mutate(test_case=test_case, random_generator=random_generator)
+        random_generator.shuffle(connections)
+        random_generator.shuffle(nodes)
+
+        return SimpleNamespace(
+            nodes=dict(map(lambda x: (x.node_id, SimpleNamespace(
+                key=x.node_id, bias=x.bias, response=x.response, activation=x.activation_function,
+                aggregation=x.aggregation_function
+            )), nodes)),
+            connections=dict(map(lambda x: (x.identification_number, SimpleNamespace(
+                key=x.identification_number, weight=x.weight, enabled=x.enabled
+            )), connections))
+        )
+
+    def test_from_genomes(self):
+        random_generator = random.Random(20)
+        genomes = list(
+            map(lambda x: self.genome(test_case=x, random_generator=random_generator),
+                GenomeTablesTestCase.TEST_CASES)
+        ) + [SimpleNamespace(nodes={}, connections={})]
+        config = SimpleNamespace(genome_config=SimpleNamespace(input_keys=[-1, -2], output_keys=[0]))
+
+        id_inputs, id_outputs, node_table, connection_table, node_offsets, connection_offsets = \
+            get_population_tables(genomes=genomes, config=config)
+
+        # Assertions
+        self.assertEqual((id_inputs, id_outputs), ({-1, -2}, {0}))
+        self.assertEqual(len(node_offsets), len(genomes) + 1)
+        self.assertEqual(node_offsets[-1], len(node_table))
+        self.assertEqual(connection_offsets[-1], len(connection_table))
+        for position, genome in enumerate(genomes):
+            expected_connection_table = ConnectionTable.from_genome(genome=genome)
+            expected_node_table = NodeTable.from_genome(genome=genome)
+            connection_view = connection_table.view(connection_offsets[position], connection_offsets[position + 1])
+            node_view = node_table.view(node_offsets[position], node_offsets[position + 1])
+
+            # Views share the memory of the population tables
+            self.assertTrue(len(connection_view) == 0 or np.shares_memory(connection_view.weights,
+                                                                          connection_table.weights))
+            self.assertEqual(expected_connection_table.keys(), connection_view.keys())
+            self.assertEqual(expected_connection_table.weights.tolist(), connection_view.weights.tolist())
+            self.assertEqual(expected_connection_table.enabled.tolist(), connection_view.enabled.tolist())
+            self.assertEqual(
+                list(map(lambda x: (x.node_id, x.bias, x.activation_function, x.aggregation_function, x.response),
+                         expected_node_table.to_nodes())),
+                list(map(lambda x: (x.node_id, x.bias, x.activation_function, x.aggregation_function, x.response),
+                         node_view.to_nodes()))
+            )
+
+            # Analysis of a view is the one of the genome on its own
+            if len(connection_view):
+                test_case = GenomeTablesTestCase.TEST_CASES[position]
+                self.assert_same_analysis(
+                    expected_genome_analyzer=self.analyze(test_case=test_case, connections=expected_connection_table,
+                                                          nodes=expected_node_table),
+                    genome_analyzer=self.analyze(test_case=test_case, connections=connection_view, nodes=node_view)
+                )
+
+        # Function codes are shared by the whole population
+        self.assertEqual(len(set(node_table.activation_functions)), len(node_table.activation_functions))
+        self.assertEqual(len(set(node_table.aggregation_functions)), len(node_table.aggregation_functions))
+
+    def test_metadata_order(self):
+        random_generator = random.Random(21)
+        config = SimpleNamespace(genome_config=SimpleNamespace(input_keys=[-1, -2], output_keys=[0]))
+        for test_case in GenomeTablesTestCase.TEST_CASES:
+            genome = self.genome(test_case=test_case, random_generator=random_generator)
+            _, _, nodes, connections = get_network_metadata(genome=genome, config=config)
+
+            # Nodes and connections keep the order of the genome
+            self.assertEqual(list(genome.nodes), list(map(lambda x: x.node_id, nodes)))
+            self.assertEqual(list(genome.connections), list(map(lambda x: x.identification_number, connections)))
+
+    def test_table_analysis(self):
+        random_generator = random.Random(19)
+        for test_case in GenomeTablesTestCase.TEST_CASES:
+            connections, nodes = self.mutate(test_case=test_case, random_generator=random_generator)
+            expected_genome_analyzer = self.analyze(test_case=test_case, connections=connections, nodes=nodes)
+            genome_analyzer = self.analyze(
+                test_case=test_case, connections=ConnectionTable.from_connections(connections),
+                nodes=NodeTable.from_nodes(nodes)
+            )
+
+            self.assert_same_analysis(expected_genome_analyzer=expected_genome_analyzer,
+                                      genome_analyzer=genome_analyzer)
+
+            # The structural hash is computed on the table before the connections are filtered
+            self.assertEqual(
+                GenomeAnalyzer(id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+                               connections=connections, nodes=None).structural_hash(),
+                GenomeAnalyzer(id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+                               connections=ConnectionTable.from_connections(connections), nodes=None).structural_hash()
+            )
+
+    def test_table_analysis_cache(self):
+        random_generator = random.Random(23)
+        analysis_cache = AnalysisCache()
+        for test_case in GenomeTablesTestCase.TEST_CASES:
+            for _ in range(2):
+                connections, nodes = self.mutate(test_case=test_case, random_generator=random_generator)
+                expected_genome_analyzer = self.analyze(test_case=test_case, connections=connections, nodes=nodes)
+                genome_analyzer = self.analyze(
+                    test_case=test_case, connections=ConnectionTable.from_connections(connections),
+                    nodes=NodeTable.from_nodes(nodes), cache=analysis_cache
+                )
+
+                self.assert_same_analysis(expected_genome_analyzer=expected_genome_analyzer,
+                                          genome_analyzer=genome_analyzer)
+
+        self.assertEqual(analysis_cache.hits, len(GenomeTablesTestCase.TEST_CASES))
+
+    def test_table_refresh(self):
+        random_generator = random.Random(29)
+        for test_case in GenomeTablesTestCase.TEST_CASES:
+            connections, nodes = self.mutate(test_case=test_case, random_generator=random_generator)
+            genome_analyzer = self.analyze(
+                test_case=test_case, connections=ConnectionTable.from_connections(connections),
+                nodes=NodeTable.from_nodes(nodes)
+            )
+
+            for shuffle in [False, True, False]:
+                connections, nodes = self.mutate(test_case=test_case, random_generator=random_generator)
+                if shuffle:
+                    # Rows are looked up again when the order changes
+                    random_generator.shuffle(connections)
+                    random_generator.shuffle(nodes)
+
+                genome_analyzer.refresh_weights(
+                    connections=ConnectionTable.from_connections(connections), nodes=NodeTable.from_nodes(nodes)
+                )
+                expected_genome_analyzer = self.analyze(test_case=test_case, connections=connections, nodes=nodes)
+                self.assert_same_analysis(expected_genome_analyzer=expected_genome_analyzer,
+                                          genome_analyzer=genome_analyzer)
+
+            # Objects and tables can be mixed
+            connections, nodes = self.mutate(test_case=test_case, random_generator=random_generator)
+            genome_analyzer.refresh_weights(connections=connections, nodes=NodeTable.from_nodes(nodes))
+            expected_genome_analyzer = self.analyze(test_case=test_case, connections=connections, nodes=nodes)
+            self.assert_same_analysis(expected_genome_analyzer=expected_genome_analyzer,
+                                      genome_analyzer=genome_analyzer)
+
+    def test_table_refresh_other_structure(self):
+        test_case = TestCases.SIMPLE_NN
+        genome_analyzer = self.analyze(
+            test_case=test_case, connections=ConnectionTable.from_connections(test_case.connections),
+            nodes=NodeTable.from_nodes(test_case.nodes)
+        )
+        connections = test_case.connections[:-1] + [
+            GenomeConnection(identification_number=(-1, 4), enabled=True, weight=1.0)
+        ]
+
+        with self.assertRaises(AssertionError):
+            genome_analyzer.refresh_weights(connections=ConnectionTable.from_connections(connections),
+                                            nodes=test_case.nodes)
+
+    def test_table_cycle(self):
+        connection_table = ConnectionTable(
+            input_ids=[-1, 1, 2, 2], output_ids=[1, 2, 1, 0], weights=[1.0, 1.0, 1.0, 1.0],
+            enabled=[True, True, True, True]
+        )
+        genome_analyzer = GenomeAnalyzer(id_inputs={-1}, id_outputs={0}, connections=connection_table, nodes=None)
+
+        with self.assertRaises(ValueError):
+            genome_analyzer.filter_useful_connections()
+
+    def test_slots(self):
+        connection = GenomeConnection(identification_number=(-1, 0), enabled=True, weight=1.0)
+        node = GenomeNode(node_id=0, bias=0.0, activation_function="sigmoid")
+
+        # Objects without __dict__ do not accept new attributes
+        self.assertFalse(hasattr(connection, "__dict__"))
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            connection.innovation = 1
+
+
+if __name__ == '__main__':
+    unittest.main()
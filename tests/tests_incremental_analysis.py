@@ -0,0 +1,188 @@
+# Models
+from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
+from neat_python_utility.neat_utility.models.genome_graph import GenomeGraph
+from neat_python_utility.neat_utility.models.connection import GenomeConnection
+from neat_python_utility.neat_utility.models.node import GenomeNode
+from neat_python_utility.tests.utils.tests_constants import TestCases
+
+# Utils
+import numpy as np
+import random
+
+# Testing
+import unittest
+
+
+class IncrementalAnalysisTestCase(unittest.TestCase):
+    TEST_CASES = [
+        TestCases.SIMPLE_NN, TestCases.MULTIPLE_OUTPUTS_NN, TestCases.TWO_HIDDEN_LAYERS_NN,
+        TestCases.SKIPPED_INPUT_TO_OUTPUT_NN, TestCases.ABANDONED_NODES_ONE_NN, TestCases.ABANDONED_NODES_TWO_NN,
+        TestCases.ABANDONED_NODES_THREE_NN, TestCases.WEIRD_TOPOLOGY_ONE_NN, TestCases.WEIRD_TOPOLOGY_TWO_NN,
+        TestCases.WEIRD_TOPOLOGY_THREE_NN, TestCases.WEIRD_TOPOLOGY_FOUR_NN, TestCases.ASYMMETRIC_TOPOLOGY_ONE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_TWO_NN, TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_FOUR_NN,
+    ]
+
+    @staticmethod
+    def analyze(test_case, connections, nodes, keep_bias_nodes=False):
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs, connections=list(connections),
+            nodes=list(nodes), keep_bias_nodes=keep_bias_nodes
+        )
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+
+        return genome_analyzer
+
+    @staticmethod
+    def new_node(node_id):
+        return GenomeNode(node_id=node_id, bias=0.5, activation_function="sigmoid", aggregation_function="sum",
+                          response=1.0)
+
+    @staticmethod
+    def random_connection(test_case, genome_analyzer, random_generator):
+        # New connection that does not create a cycle, like the add connection mutation of neat-python
+        genome_graph = GenomeGraph(connections=genome_analyzer._genome_connection_list())
+        node_ids = list(set(test_case.id_outputs) | set(map(lambda x: x.node_id, genome_analyzer.nodes)))
+        input_ids = list(test_case.id_inputs) + node_ids
+        output_ids = list(filter(lambda x: x not in test_case.id_inputs, node_ids))
+
+        for _ in range(20):
+            connection_key = (random_generator.choice(input_ids), random_generator.choice(output_ids))
+            if connection_key[0] == connection_key[1] or connection_key in genome_graph.connections_by_key:
+                continue
+            if connection_key[0] in genome_graph.forward_reachable_nodes(sources=[connection_key[1]]):
+                continue
+
+            return GenomeConnection(identification_number=connection_key, enabled=random_generator.random() < 0.8,
+                                    weight=random_generator.uniform(-2.0, 2.0))
+
+        return None
+
+    def test_random_deltas(self):
+        self.run_random_deltas(keep_bias_nodes=False)
+
+    def test_random_deltas_keeping_bias_nodes(self):
+        # Removed connections leave bias nodes behind, added ones turn them into regular nodes
+        self.run_random_deltas(keep_bias_nodes=True)
+
+    def run_random_deltas(self, keep_bias_nodes):
+        random_generator = random.Random(17)
+        for test_case in IncrementalAnalysisTestCase.TEST_CASES:
+            genome_analyzer = self.analyze(test_case=test_case, connections=test_case.connections,
+                                           nodes=test_case.nodes, keep_bias_nodes=keep_bias_nodes)
+            next_node_id = max(map(lambda x: x.node_id, test_case.nodes)) + 1
+
+            for _ in range(40):
+                mutation = random_generator.choice(["add", "remove", "split"])
+                connection_keys = list(map(lambda x: x.identification_number, genome_analyzer._genome_connection_list()))
+
+                if mutation == "add":
+                    connection = self.random_connection(
+                        test_case=test_case, genome_analyzer=genome_analyzer, random_generator=random_generator
+                    )
+                    if connection is not None:
+                        genome_analyzer.add_connection(connection=connection, verify=True)
+                elif mutation == "remove" and connection_keys:
+                    genome_analyzer.apply_structural_delta(
+                        removed_connection_keys=[random_generator.choice(connection_keys)], verify=True
+                    )
+                elif mutation == "split" and connection_keys:
+                    genome_analyzer.split_connection(
+                        connection_key=random_generator.choice(connection_keys),
+                        node=self.new_node(node_id=next_node_id), verify=True
+                    )
+                    next_node_id += 1
+
+            # Matrices are deduced again from the updated analysis
+            expected_genome_analyzer = self.analyze(
+                test_case=test_case, connections=genome_analyzer._genome_connection_list(), nodes=genome_analyzer.nodes,
+                keep_bias_nodes=keep_bias_nodes
+            )
+            expected_genome_analyzer.construct_numpy_matrices()
+            genome_analyzer.construct_numpy_matrices()
+            for expected_weights, weights in zip(
+                    expected_genome_analyzer.weights_arrays, genome_analyzer.weights_arrays):
+                self.assertTrue(np.array_equal(expected_weights, weights))
+
+    def test_split_connection(self):
+        test_case = TestCases.SIMPLE_NN
+        genome_analyzer = self.analyze(test_case=test_case, connections=test_case.connections, nodes=test_case.nodes)
+        split_connection = genome_analyzer.connections[0]
+        connection_key = split_connection.identification_number
+        node_id = max(map(lambda x: x.node_id, test_case.nodes)) + 1
+
+        genome_analyzer.split_connection(connection_key=connection_key, node=self.new_node(node_id=node_id),
+                                         verify=True)
+
+        # The split connection is kept disabled, the new node is placed between its nodes
+        connections = dict(map(lambda x: (x.identification_number, x), genome_analyzer.connections))
+        self.assertFalse(connections[connection_key].enabled)
+        self.assertEqual(connections[(connection_key[0], node_id)].weight, 1.0)
+        self.assertEqual(connections[(node_id, connection_key[1])].weight, split_connection.weight)
+        self.assertTrue(any(map(lambda x: node_id in x, genome_analyzer.layers)))
+
+    def test_remove_dangling_node(self):
+        test_case = TestCases.SIMPLE_NN
+        genome_analyzer = self.analyze(test_case=test_case, connections=test_case.connections, nodes=test_case.nodes)
+        node_id = max(map(lambda x: x.node_id, test_case.nodes)) + 1
+        connection_key = (min(test_case.id_inputs), node_id)
+
+        # A node only reached from the inputs is not useful
+        genome_analyzer.apply_structural_delta(
+            added_connections=[GenomeConnection(identification_number=connection_key, enabled=True, weight=1.0)],
+            added_nodes=[self.new_node(node_id=node_id)], verify=True
+        )
+        self.assertFalse(any(map(lambda x: node_id in x, genome_analyzer.layers)))
+
+        genome_analyzer.apply_structural_delta(removed_connection_keys=[connection_key], removed_node_ids=[node_id],
+                                               verify=True)
+        self.assertFalse(any(map(lambda x: x.node_id == node_id, genome_analyzer.nodes)))
+
+    def test_lists_created_when_read(self):
+        test_case = TestCases.WEIRD_TOPOLOGY_TWO_NN
+        genome_analyzer = self.analyze(test_case=test_case, connections=test_case.connections, nodes=test_case.nodes)
+        node_id = max(map(lambda x: x.node_id, test_case.nodes)) + 1
+        genome_analyzer.split_connection(connection_key=(6, 7), node=self.new_node(node_id=node_id))
+
+        # The lists are not created by the delta
+        self.assertIsNone(genome_analyzer._genome_connections)
+        self.assertIsNone(genome_analyzer._connections)
+        self.assertIsNone(genome_analyzer._nodes)
+
+        expected_genome_analyzer = self.analyze(
+            test_case=test_case, connections=genome_analyzer._genome_connection_list(), nodes=genome_analyzer.nodes
+        )
+        self.assertEqual(set(map(lambda x: x.identification_number, expected_genome_analyzer.connections)),
+                         set(map(lambda x: x.identification_number, genome_analyzer.connections)))
+        self.assertEqual(expected_genome_analyzer.layers, genome_analyzer.layers)
+
+        # Weights are refreshed once the graphs are dropped
+        genome_analyzer.construct_numpy_matrices()
+        connections = list(
+            map(
+                lambda x: GenomeConnection(identification_number=x.identification_number, enabled=x.enabled,
+                                           weight=x.weight * 2.0),
+                genome_analyzer._genome_connection_list()
+            )
+        )
+        genome_analyzer.refresh_weights(connections=connections, nodes=genome_analyzer.nodes)
+        expected_genome_analyzer = self.analyze(test_case=test_case, connections=connections,
+                                                nodes=genome_analyzer.nodes)
+        expected_genome_analyzer.construct_numpy_matrices()
+        for expected_weights, weights in zip(expected_genome_analyzer.weights_arrays, genome_analyzer.weights_arrays):
+            self.assertTrue(np.array_equal(expected_weights, weights))
+
+    def test_layers_required(self):
+        test_case = TestCases.SIMPLE_NN
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs, connections=list(test_case.connections),
+            nodes=list(test_case.nodes)
+        )
+
+        with self.assertRaises(AssertionError):
+            genome_analyzer.apply_structural_delta(removed_connection_keys=[])
+
+
+if __name__ == '__main__':
+    unittest.main()
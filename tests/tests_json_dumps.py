@@ -1,11 +1,20 @@
 # Models
 from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
+from neat_python_utility.neat_utility.models.compiled_network import CompiledNetwork
+from neat_python_utility.neat_utility.genome_to_json import export_genome_to_json
 from neat_python_utility.tests.utils.tests_constants import TestCases
+from neat_python_utility.tests.utils.evolved_genomes import evolved_genomes
+
+# AI
+from neat.graphs import required_for_output
+from neat.nn import FeedForwardNetwork
 
 # Utils
+from tempfile import TemporaryDirectory
 from os.path import dirname, join, exists
+import numpy as np
 from os import mkdir
-from json import dump
+from json import dump, dumps, loads
 
 # Testing
 import unittest
@@ -205,6 +214,61 @@ class JsonDumpTestCase(unittest.TestCase):
             filename=filename
         )
 
+    def test_sparse_map(self):
+        # Extracting values from test_case
+        test_case = TestCases.WEIRD_TOPOLOGY_FOUR_NN
+        inputs_names = ["Input{}".format(x) for x in range(len(test_case.id_inputs))]
+        outputs_names = ["Output{}".format(x) for x in range(len(test_case.id_outputs))]
+
+        # Instantiating a GenomeAnalysis object
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+            connections=test_case.connections, nodes=test_case.nodes
+        )
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+        genome_analyzer.construct_sparse_matrices()
+
+        # Test
+        neural_network_map = loads(
+            dumps(genome_analyzer.network_to_sparse_map(inputs_name=inputs_names, outputs_name=outputs_names))
+        )
+
+        # Assertions
+        self.assertEqual("csr", neural_network_map["format"])
+        for layer in neural_network_map["layers"]:
+            self.assertEqual(len(layer["id_nodes"]) + 1, len(layer["indptr"]))
+            self.assertEqual(layer["indptr"][-1], len(layer["indices"]))
+            self.assertEqual(len(layer["indices"]), len(layer["weights"]))
+
+    def test_export_matches_neat_python(self):
+        config, genomes = evolved_genomes()
+        inputs = np.random.default_rng(seed=31).uniform(-1.0, 1.0, size=[6, 2])
+
+        # Some genomes have bias nodes, required nodes without enabled incoming connections
+        bias_genomes = 0
+        for genome in genomes:
+            connections = list(map(lambda x: x.key, filter(lambda x: x.enabled, genome.connections.values())))
+            required_nodes = required_for_output(config.genome_config.input_keys, config.genome_config.output_keys,
+                                                 connections)
+            bias_genomes += any(map(lambda x: all(map(lambda y: y[1] != x, connections)), required_nodes))
+        self.assertGreater(bias_genomes, 0)
+
+        with TemporaryDirectory() as directory:
+            filename = join(directory, "network_dump.json")
+            for genome in genomes:
+                reference = FeedForwardNetwork.create(genome, config)
+                expected_outputs = np.array(list(map(lambda x: reference.activate(list(x)), inputs)))
+
+                for sparse in [False, True]:
+                    # Test
+                    export_genome_to_json(filename=filename, config=config, genome=genome,
+                                          inputs_names=["Input0", "Input1"], outputs_names=["Output0"], sparse=sparse)
+                    outputs = CompiledNetwork.from_json(filename=filename).activate(inputs)
+
+                    # Assertions
+                    self.assertTrue(np.allclose(expected_outputs, outputs))
+
 
 if __name__ == '__main__':
     unittest.main()
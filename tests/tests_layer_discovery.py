@@ -13,24 +13,27 @@ class LayerDiscoveryTestCase(unittest.TestCase):
         id_outputs = test_case.id_outputs
         connections = test_case.connections
 
-        # Instantiation a ConnectionAnalysis object
-        connection_analysis = GenomeAnalyzer(
-            id_inputs=id_inputs, id_outputs=id_outputs,
-            connections=connections, nodes=None,
-        )
-
-        # Filter connections
-        connection_analysis.filter_useful_connections()
-
-        # Get all paths
-        connection_analysis.discover_all_connection_paths()
-
-        # Test
-        connection_analysis.construct_layers()
-
-        # Assertions
-        self.assertEqual(expected_layers, connection_analysis.layers)
-        self.assertEqual(expected_inputs_per_layer, connection_analysis.inputs_per_layer)
+        # Test every layering mode
+        for mode in [GenomeAnalyzer.LAYERING_MODE_TOPOLOGICAL, GenomeAnalyzer.LAYERING_MODE_PATHS]:
+            # Instantiation a ConnectionAnalysis object
+            connection_analysis = GenomeAnalyzer(
+                id_inputs=id_inputs, id_outputs=id_outputs,
+                connections=connections, nodes=None,
+            )
+
+            # Filter connections
+            connection_analysis.filter_useful_connections()
+
+            # Get all paths
+            if mode == GenomeAnalyzer.LAYERING_MODE_PATHS:
+                connection_analysis.discover_all_connection_paths()
+
+            # Test
+            connection_analysis.construct_layers(mode=mode)
+
+            # Assertions
+            self.assertEqual(expected_layers, connection_analysis.layers)
+            self.assertEqual(expected_inputs_per_layer, connection_analysis.inputs_per_layer)
 
     def test_simple_nn(self):
         expected_layers = [
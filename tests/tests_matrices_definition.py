@@ -2,6 +2,9 @@
 from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
 from neat_python_utility.tests.utils.tests_constants import TestCases
 
+# Utils
+import numpy as np
+
 # Testing
 import unittest
 
@@ -639,6 +642,71 @@ class MatricesDefinitionTestCase(unittest.TestCase):
             expected_afs_matrix=expected_afs_matrix
         )
 
+    def test_numpy_matrices(self):
+        # Initializing variables
+        test_case = TestCases.WEIRD_TOPOLOGY_TWO_NN
+
+        for dtype in [np.float32, np.float64]:
+            # Instantiation a ConnectionAnalysis object
+            connection_analysis = GenomeAnalyzer(
+                id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+                connections=test_case.connections, nodes=test_case.nodes,
+            )
+            connection_analysis.filter_useful_connections()
+            connection_analysis.construct_layers()
+
+            # Test
+            connection_analysis.construct_numpy_matrices(dtype=dtype)
+            connection_analysis.construct_matrices()
+
+            # Assertions
+            for layer_index in range(len(connection_analysis.layers)):
+                weights = connection_analysis.weights_arrays[layer_index]
+                self.assertEqual(dtype, weights.dtype)
+                self.assertTrue(weights.flags['C_CONTIGUOUS'])
+                self.assertEqual(weights.tolist(), connection_analysis.weights_matrix[layer_index])
+                self.assertEqual(
+                    connection_analysis.biases_arrays[layer_index].tolist(),
+                    connection_analysis.biases_matrix[layer_index]
+                )
+                self.assertEqual(
+                    list(
+                        map(
+                            lambda x: connection_analysis.activation_functions[x],
+                            connection_analysis.activation_codes_arrays[layer_index]
+                        )
+                    ),
+                    connection_analysis.activation_functions_matrix[layer_index]
+                )
+
+    def test_sparse_matrices(self):
+        for test_case in [TestCases.TWO_HIDDEN_LAYERS_NN, TestCases.WEIRD_TOPOLOGY_FOUR_NN,
+                          TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN]:
+            # Instantiation a ConnectionAnalysis object
+            connection_analysis = GenomeAnalyzer(
+                id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+                connections=test_case.connections, nodes=test_case.nodes,
+            )
+            connection_analysis.filter_useful_connections()
+            connection_analysis.construct_layers()
+
+            # Test
+            connection_analysis.construct_sparse_matrices()
+            connection_analysis.construct_matrices()
+            report = connection_analysis.matrices_memory_report()
+
+            # Assertions: Expanding the CSR arrays gives back the dense matrices
+            for layer_index, (indptr, indices, data) in enumerate(connection_analysis.sparse_weights_arrays):
+                dense_weights = np.zeros(np.shape(connection_analysis.weights_matrix[layer_index]))
+                for row in range(len(indptr) - 1):
+                    dense_weights[row, indices[indptr[row]:indptr[row + 1]]] = data[indptr[row]:indptr[row + 1]]
+
+                self.assertEqual(connection_analysis.weights_matrix[layer_index], dense_weights.tolist())
+                self.assertEqual(len(data), report["layers"][layer_index]["non_zeros"])
+
+            self.assertEqual(report["dense_bytes"], sum(map(lambda x: x["dense_bytes"], report["layers"])))
+            self.assertEqual(report["sparse_bytes"], sum(map(lambda x: x["sparse_bytes"], report["layers"])))
+
 
 if __name__ == '__main__':
     unittest.main()
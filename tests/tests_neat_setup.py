@@ -0,0 +1,177 @@
+# Models
+from neat_python_utility.neat_utility.neat_setup import NeatSetup
+from neat_python_utility.neat_utility.evaluation import GenomeAgent
+from neat_python_utility.neat_utility.render_policy import RenderPolicy
+from neat_python_utility.neat_utility.render_worker import RenderWorker, render_snapshot, render_snapshot_svg
+
+# AI
+import neat
+
+# Utils
+from os.path import join, dirname, exists
+import tempfile
+import time
+
+# Testing
+import unittest
+
+
+CONFIG_FILE = join(dirname(dirname(__file__)), 'example', 'artificial_intelligence', 'config-feedforward.txt')
+
+
+class FailingSimulation:
+    # Stand-in simulation that fails at the given generation
+    def __init__(self, failing_generation):
+        self.failing_generation = failing_generation
+        self.generation = 0
+
+    def simulation(self, genomes, config):
+        self.generation += 1
+        if self.generation == self.failing_generation:
+            raise RuntimeError("Simulation failed")
+
+        for _, genome in genomes:
+            genome.fitness = 1.0
+
+        return self.generation, GenomeAgent(genome=genomes[0][1])
+
+
+async def constant_fitness(genome, config):
+    return 1.0
+
+
+def log_loss(agent):
+    # Logging function of an agent with a loss, like XorAgent.log_stats
+    return "Loss: {}\n".format(agent.loss)
+
+
+def slow_render_snapshot(payload, input_keys, output_keys, filename, options):
+    time.sleep(0.2)
+    render_snapshot_svg(payload, input_keys, output_keys, filename, options)
+
+
+class NeatSetupTestCase(unittest.TestCase):
+    @staticmethod
+    def create_neat_setup(directory, **options):
+        config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                             neat.DefaultStagnation, CONFIG_FILE)
+        return NeatSetup(
+            max_generations=5, neat_checkpoint_breakpoint=0, file_prefix="genome",
+            simulation_file=join(directory, "main.py"), inputs_name=["a", "b"], outputs_name=["xor"],
+            config_file=config, **options
+        )
+
+    def test_failed_run_closes_render_worker(self):
+        with tempfile.TemporaryDirectory() as directory:
+            failing_simulation = FailingSimulation(failing_generation=3)
+            neat_setup = self.create_neat_setup(directory=directory, simulation=failing_simulation.simulation,
+                                                background_rendering=True, native_svg=True)
+
+            with self.assertRaises(RuntimeError):
+                neat_setup.run_simulation()
+
+            # Assertions: the worker is stopped and the genomes queued before the failure are rendered
+            self.assertIsNone(neat_setup.render_worker._executor)
+            self.assertEqual(2, neat_setup.render_worker.rendered)
+            self.assertTrue(exists(join(neat_setup.svg_path, "genome_2.svg")))
+
+    def test_render_index_points_to_written_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            render_policy = RenderPolicy(every_generations=1)
+            neat_setup = self.create_neat_setup(directory=directory,
+                                                simulation=FailingSimulation(failing_generation=None).simulation,
+                                                background_rendering=True, native_svg=True,
+                                                render_policy=render_policy)
+            # A slow worker with a single place in its queue drops some of the genomes
+            neat_setup.render_worker = RenderWorker(max_queue_size=1, policy=RenderWorker.POLICY_DROP,
+                                                    use_processes=False, render_function=slow_render_snapshot)
+            neat_setup.run_simulation()
+
+            # Every run starts a new index
+            neat_setup.simulation = FailingSimulation(failing_generation=None).simulation
+            neat_setup.run_simulation()
+            index = render_policy.read_index()
+
+            # Assertions: files dropped by the worker are not indexed as drawings
+            self.assertEqual([1, 2, 3, 4, 5], list(map(lambda x: x["generation"], index)))
+            self.assertGreater(render_policy.dropped, 0)
+            self.assertEqual(render_policy.rendered - render_policy.dropped,
+                             len(list(filter(lambda x: x["rendered"], index))))
+            self.assertTrue(all(map(lambda x: exists(join(neat_setup.svg_path, x["file"])),
+                                    filter(lambda x: x["file"] is not None, index))))
+
+    def test_recurrent_networks_drawn_by_draw_net(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                                 neat.DefaultStagnation, CONFIG_FILE)
+            config.genome_config.feed_forward = False
+            neat_setup = NeatSetup(
+                max_generations=5, neat_checkpoint_breakpoint=0, file_prefix="genome",
+                simulation_file=join(directory, "main.py"), inputs_name=["a", "b"], outputs_name=["xor"],
+                config_file=config, simulation=FailingSimulation(failing_generation=None).simulation,
+                background_rendering=True, native_svg=True
+            )
+
+            # Assertions: draw_net_svg only draws feedforward genomes
+            self.assertFalse(neat_setup.native_svg)
+            self.assertIs(render_snapshot, neat_setup.render_worker.render_function)
+            self.assertTrue(self.create_neat_setup(directory=directory, native_svg=True,
+                                                   simulation=FailingSimulation(None).simulation).native_svg)
+
+    def test_root_directory_files_stay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Files of the user sharing the prefixes of the checkpoints and drawings
+            for file in ["genome_notes.txt", "neat-checkpoint-notes.txt"]:
+                open(join(directory, file), "w").close()
+            neat_setup = self.create_neat_setup(directory=directory,
+                                                simulation=FailingSimulation(failing_generation=None).simulation,
+                                                native_svg=True)
+            neat_setup.run_simulation()
+
+            # Assertions
+            self.assertTrue(exists(join(directory, "genome_notes.txt")))
+            self.assertTrue(exists(join(directory, "neat-checkpoint-notes.txt")))
+
+    def test_fitness_function_mode_logging(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # The logging function of an agent is rejected with a clear error
+            neat_setup = self.create_neat_setup(directory=directory,
+                                                evaluation_mode=NeatSetup.EVALUATION_MODE_ASYNCIO,
+                                                fitness_function=constant_fitness, logging_function=log_loss,
+                                                native_svg=True)
+            with self.assertRaisesRegex(TypeError, "GenomeAgent.log_stats"):
+                neat_setup.run_simulation()
+
+            # Without a logging function, the GenomeAgent is logged
+            neat_setup = self.create_neat_setup(directory=directory,
+                                                evaluation_mode=NeatSetup.EVALUATION_MODE_ASYNCIO,
+                                                fitness_function=constant_fitness, native_svg=True)
+            self.assertIs(GenomeAgent.log_stats, neat_setup.logging_function)
+            neat_setup.run_simulation()
+
+            # The simulation is only given in the serial mode
+            with self.assertRaises(AssertionError):
+                self.create_neat_setup(directory=directory, simulation=FailingSimulation(None).simulation,
+                                       evaluation_mode=NeatSetup.EVALUATION_MODE_ASYNCIO,
+                                       fitness_function=constant_fitness, native_svg=True)
+
+    def test_distributed_options(self):
+        with tempfile.TemporaryDirectory() as directory:
+            neat_setup = self.create_neat_setup(directory=directory,
+                                                evaluation_mode=NeatSetup.EVALUATION_MODE_DISTRIBUTED,
+                                                coordinator_address=("127.0.0.1", 0), genomes_per_task=4,
+                                                tasks_per_worker=1, heartbeat_timeout=1.0, no_worker_timeout=0.3,
+                                                native_svg=True)
+
+            # Without workers the run stops instead of waiting forever
+            with self.assertRaises(TimeoutError):
+                neat_setup.run_simulation()
+
+            # Assertions
+            self.assertIsNone(neat_setup._evaluator)
+            self.assertEqual((4, 1, 1.0), (neat_setup.genomes_per_task, neat_setup.tasks_per_worker,
+                                           neat_setup.heartbeat_timeout))
+
+
+if __name__ == '__main__':
+    unittest.main()
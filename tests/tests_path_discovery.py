@@ -284,6 +284,46 @@ class PathDiscoveryTestCase(unittest.TestCase):
             expected_paths=expected_paths,
         )
 
+    def test_path_budgets(self):
+        # Instantiation a ConnectionAnalysis object
+        test_case = TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN
+        connection_analysis = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+            connections=test_case.connections, nodes=None,
+        )
+
+        # Filter connections
+        connection_analysis.filter_useful_connections()
+
+        # Test
+        limited_paths = list(connection_analysis.iterate_connection_paths(max_paths=2))
+        shallow_paths = list(connection_analysis.iterate_connection_paths(max_depth=2))
+
+        # Assertions
+        self.assertEqual(2, len(limited_paths))
+        self.assertEqual({((-1, 168), (168, 0)), ((-2, 168), (168, 0))}, set(shallow_paths))
+
+    def test_path_counting(self):
+        for test_case in [TestCases.SIMPLE_NN, TestCases.TWO_HIDDEN_LAYERS_NN, TestCases.WEIRD_TOPOLOGY_FOUR_NN,
+                          TestCases.ASYMMETRIC_TOPOLOGY_ONE_NN, TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN]:
+            # Instantiation a ConnectionAnalysis object
+            connection_analysis = GenomeAnalyzer(
+                id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs,
+                connections=test_case.connections, nodes=None,
+            )
+
+            # Filter connections
+            connection_analysis.filter_useful_connections()
+
+            # Test
+            number_paths, longest_length, shortest_length = connection_analysis.count_connection_paths()
+            paths = list(connection_analysis.iterate_connection_paths())
+
+            # Assertions
+            self.assertEqual(len(paths), number_paths)
+            self.assertEqual(max(map(len, paths)), longest_length)
+            self.assertEqual(min(map(len, paths)), shortest_length)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,134 @@
+# Models
+from neat_python_utility.neat_utility.render_policy import RenderPolicy, drawing_hash
+
+# Utils
+from types import SimpleNamespace
+from os.path import join
+import tempfile
+
+# Testing
+import unittest
+
+
+class RenderPolicyTestCase(unittest.TestCase):
+    @staticmethod
+    def create_genome(weights, fitness=1.0, enabled=True):
+        # Genome with one hidden node, weights of (-1, 1), (-2, 1) and (1, 0)
+        return SimpleNamespace(
+            fitness=fitness,
+            nodes={
+                node_id: SimpleNamespace(key=node_id, bias=0.0, response=1.0, activation="sigmoid",
+                                         aggregation="sum")
+                for node_id in [0, 1]
+            },
+            connections={
+                key: SimpleNamespace(key=key, weight=weight, enabled=enabled if key == (1, 0) else True)
+                for key, weight in zip([(-1, 1), (-2, 1), (1, 0)], weights)
+            }
+        )
+
+    def test_drawing_hash(self):
+        genome = self.create_genome(weights=[0.5, -0.5, 1.0])
+        reversed_genome = self.create_genome(weights=[0.5, -0.5, 1.0])
+        reversed_genome.connections = dict(reversed(list(reversed_genome.connections.items())))
+
+        # Assertions
+        self.assertEqual(drawing_hash(genome), drawing_hash(reversed_genome))
+        self.assertEqual(drawing_hash(genome), drawing_hash(self.create_genome(weights=[2.0, 2.0, 2.0])))
+        self.assertNotEqual(drawing_hash(genome), drawing_hash(self.create_genome(weights=[0.5, -0.5, 1.0],
+                                                                                   enabled=False)))
+
+        # Weights within the same bucket hash the same
+        self.assertEqual(drawing_hash(genome, weight_bucket=1.0),
+                         drawing_hash(self.create_genome(weights=[0.9, -0.1, 1.5]), weight_bucket=1.0))
+        self.assertNotEqual(drawing_hash(genome, weight_bucket=1.0),
+                            drawing_hash(self.create_genome(weights=[1.1, -0.5, 1.0]), weight_bucket=1.0))
+
+    def test_topology_change(self):
+        render_policy = RenderPolicy()
+        rendered = list(
+            map(
+                lambda x: render_policy.update(generation=x[0], genome=x[1], file="genome_{}.svg".format(x[0])),
+                enumerate([
+                    self.create_genome(weights=[0.5, 0.5, 0.5]), self.create_genome(weights=[1.5, 0.5, 0.5]),
+                    self.create_genome(weights=[1.5, 0.5, 0.5], enabled=False),
+                    self.create_genome(weights=[1.5, 0.5, 0.5], enabled=False),
+                    self.create_genome(weights=[1.5, 0.5, 0.5]),
+                ])
+            )
+        )
+
+        # Assertions
+        self.assertEqual([True, False, True, False, True], rendered)
+        self.assertEqual((3, 2), (render_policy.rendered, render_policy.skipped))
+
+    def test_every_generations_and_fitness(self):
+        render_policy = RenderPolicy(every_generations=3, fitness_threshold=1.0)
+        fitness_values = [0.0, 0.5, 1.2, 1.5, 1.9, 2.0, 2.1]
+        rendered = list(
+            map(
+                lambda x: render_policy.update(generation=x[0], genome=self.create_genome(weights=[1.0, 1.0, 1.0],
+                                                                                          fitness=x[1]),
+                                               file="genome_{}.svg".format(x[0])),
+                enumerate(fitness_values)
+            )
+        )
+
+        # Generation 2 improved by 1.2, generation 5 comes 3 generations after it
+        self.assertEqual([True, False, True, False, False, True, False], rendered)
+
+    def test_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            render_policy = RenderPolicy(index_path=join(directory, "render_index.jsonl"))
+            for generation, enabled in enumerate([True, True, False]):
+                file = join(directory, "genome_{}.svg".format(generation))
+                if render_policy.update(generation=generation,
+                                        genome=self.create_genome(weights=[1.0, 1.0, 1.0], enabled=enabled),
+                                        file=file):
+                    render_policy.render_done(file=file)
+
+            index = render_policy.read_index()
+
+        # Every generation points to the drawing of its fittest genome
+        self.assertEqual([0, 1, 2], list(map(lambda x: x["generation"], index)))
+        self.assertEqual(["genome_0.svg", "genome_0.svg", "genome_2.svg"], list(map(lambda x: x["file"], index)))
+        self.assertEqual([RenderPolicy.REASON_TOPOLOGY, None, RenderPolicy.REASON_TOPOLOGY],
+                         list(map(lambda x: x["reason"], index)))
+        self.assertEqual(index[0]["hash"], index[1]["hash"])
+
+    def test_index_waits_for_rendering(self):
+        with tempfile.TemporaryDirectory() as directory:
+            render_policy = RenderPolicy(index_path=join(directory, "render_index.jsonl"))
+            render_policy.reset()
+            genomes = [self.create_genome(weights=[1.0, 1.0, 1.0]), self.create_genome(weights=[1.0, 1.0, 1.0]),
+                       self.create_genome(weights=[1.0, 1.0, 1.0], enabled=False),
+                       self.create_genome(weights=[1.0, 1.0, 1.0], enabled=False)]
+            rendered = list(map(lambda x: render_policy.update(generation=x[0], genome=x[1],
+                                                               file="genome_{}.svg".format(x[0])),
+                                enumerate(genomes[:3])))
+
+            # Nothing is indexed until the first drawing is written
+            self.assertEqual([True, False, True], rendered)
+            self.assertEqual([], render_policy.read_index())
+            render_policy.render_done(file="genome_0.svg")
+            self.assertEqual([0, 1], list(map(lambda x: x["generation"], render_policy.read_index())))
+
+            # The drawing of generation 2 was dropped, so the same genome is rendered again
+            render_policy.render_done(file="genome_2.svg", written=False)
+            self.assertTrue(render_policy.update(generation=3, genome=genomes[3], file="genome_3.svg"))
+            render_policy.render_done(file="genome_3.svg")
+            index = render_policy.read_index()
+            dropped = render_policy.dropped
+
+            # A run starts with an empty index
+            render_policy.reset()
+            self.assertEqual([], render_policy.read_index())
+
+        # Assertions
+        self.assertEqual(["genome_0.svg", "genome_0.svg", None, "genome_3.svg"], list(map(lambda x: x["file"], index)))
+        self.assertEqual([True, False, False, True], list(map(lambda x: x["rendered"], index)))
+        self.assertEqual(1, dropped)
+
+
+if __name__ == '__main__':
+    unittest.main()
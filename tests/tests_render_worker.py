@@ -0,0 +1,127 @@
+# Models
+from neat_python_utility.neat_utility.render_worker import RenderWorker
+
+# Utils
+from types import SimpleNamespace
+from os.path import join, exists
+import tempfile
+import threading
+import json
+import time
+
+# Testing
+import unittest
+
+
+def write_snapshot(payload, input_keys, output_keys, filename, options):
+    # Stand-in of draw_net: writes the snapshot instead of drawing it, after waiting for the release event if any
+    if options.get("release") is not None:
+        options["release"].wait(timeout=5.0)
+    if options.get("fail"):
+        raise RuntimeError("Rendering failed")
+
+    with open(filename, "w") as file:
+        json.dump({"payload": payload, "input_keys": input_keys, "output_keys": output_keys}, file)
+
+
+class RenderWorkerTestCase(unittest.TestCase):
+    CONFIG = SimpleNamespace(genome_config=SimpleNamespace(input_keys=[-1, -2], output_keys=[0]))
+
+    @staticmethod
+    def create_genome(genome_id):
+        return SimpleNamespace(
+            key=genome_id, fitness=None,
+            nodes={0: SimpleNamespace(key=0, bias=0.5, response=1.0, activation="sigmoid", aggregation="sum")},
+            connections={(-1, 0): SimpleNamespace(key=(-1, 0), weight=float(genome_id), enabled=True)}
+        )
+
+    def wait_in_flight(self, render_worker):
+        deadline = time.monotonic() + 5.0
+        while render_worker._in_flight == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(1, render_worker._in_flight)
+
+    def run_backpressure(self, policy, expected_genome_ids):
+        release = threading.Event()
+        # Whether each genome was written, as reported by the callbacks
+        reported = {}
+        with tempfile.TemporaryDirectory() as directory:
+            render_worker = RenderWorker(max_queue_size=2, policy=policy, use_processes=False,
+                                         render_function=write_snapshot)
+            with render_worker:
+                # The first genome keeps the only worker busy, the others wait in the queue
+                render_worker.submit(genome=self.create_genome(0), config=RenderWorkerTestCase.CONFIG,
+                                     filename=join(directory, "genome_0"), release=release,
+                                     callback=lambda written: reported.update({0: written}))
+                self.wait_in_flight(render_worker=render_worker)
+                for genome_id in range(1, 6):
+                    render_worker.submit(genome=self.create_genome(genome_id), config=RenderWorkerTestCase.CONFIG,
+                                         filename=join(directory, "genome_{}".format(genome_id)),
+                                         callback=lambda written, x=genome_id: reported.update({x: written}))
+
+                release.set()
+                self.assertTrue(render_worker.flush(timeout=5.0))
+
+            # Assertions
+            rendered_genome_ids = list(filter(lambda x: exists(join(directory, "genome_{}".format(x))), range(6)))
+            self.assertEqual(expected_genome_ids, rendered_genome_ids)
+            self.assertEqual((6, 3, 3, 0), (render_worker.submitted, render_worker.rendered, render_worker.dropped,
+                                            render_worker.failed))
+            self.assertEqual(list(range(6)), sorted(reported.keys()))
+            self.assertEqual(expected_genome_ids, sorted(filter(lambda x: reported[x], reported)))
+
+    def test_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with RenderWorker(number_workers=2, max_queue_size=8, render_function=write_snapshot) as render_worker:
+                for genome_id in range(4):
+                    render_worker.submit(genome=self.create_genome(genome_id), config=RenderWorkerTestCase.CONFIG,
+                                         filename=join(directory, "genome_{}".format(genome_id)))
+                self.assertTrue(render_worker.flush(timeout=30.0))
+
+            # Assertions
+            self.assertEqual(4, render_worker.rendered)
+            for genome_id in range(4):
+                with open(join(directory, "genome_{}".format(genome_id))) as file:
+                    snapshot = json.load(file)
+                self.assertEqual([-1, -2], snapshot["input_keys"])
+                self.assertEqual([0], snapshot["output_keys"])
+                self.assertEqual(genome_id, snapshot["payload"]["key"])
+                self.assertEqual([[-1, 0, float(genome_id), True]], snapshot["payload"]["connections"])
+
+    def test_coalesce(self):
+        # The most recent genomes replace the ones waiting in the queue
+        self.run_backpressure(policy=RenderWorker.POLICY_COALESCE, expected_genome_ids=[0, 4, 5])
+
+    def test_drop(self):
+        # Genomes submitted while the queue is full are dropped
+        self.run_backpressure(policy=RenderWorker.POLICY_DROP, expected_genome_ids=[0, 1, 2])
+
+    def test_snapshot(self):
+        genome = self.create_genome(3)
+        payload, input_keys, output_keys = RenderWorker.snapshot(genome=genome, config=RenderWorkerTestCase.CONFIG)
+
+        # The snapshot does not change with the genome
+        genome.connections[(-1, 0)].weight = 10.0
+        self.assertEqual([[-1, 0, 3.0, True]], payload["connections"])
+        self.assertEqual(([-1, -2], [0]), (input_keys, output_keys))
+
+    def test_failure(self):
+        reported = {}
+        with tempfile.TemporaryDirectory() as directory:
+            with RenderWorker(use_processes=False, render_function=write_snapshot) as render_worker:
+                render_worker.submit(genome=self.create_genome(0), config=RenderWorkerTestCase.CONFIG,
+                                     filename=join(directory, "genome_0"), fail=True,
+                                     callback=lambda written: reported.update({0: written}))
+                render_worker.submit(genome=self.create_genome(1), config=RenderWorkerTestCase.CONFIG,
+                                     filename=join(directory, "genome_1"),
+                                     callback=lambda written: reported.update({1: written}))
+                self.assertTrue(render_worker.flush(timeout=5.0))
+
+            # Assertions
+            self.assertEqual((1, 1), (render_worker.rendered, render_worker.failed))
+            self.assertEqual({0: False, 1: True}, reported)
+            self.assertTrue(exists(join(directory, "genome_1")))
+
+
+if __name__ == '__main__':
+    unittest.main()
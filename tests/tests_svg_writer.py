@@ -0,0 +1,106 @@
+# Models
+from neat_python_utility.neat_utility.svg_writer import draw_net_svg, genome_columns
+from neat_python_utility.neat_utility.render_worker import RenderWorker, render_genome, render_snapshot_svg
+
+# Utils
+from types import SimpleNamespace
+from os.path import join, exists
+from os import listdir
+import xml.etree.ElementTree as ElementTree
+import tempfile
+
+# Testing
+import unittest
+
+
+SVG_NAMESPACE = "{http://www.w3.org/2000/svg}"
+
+
+class SvgWriterTestCase(unittest.TestCase):
+    CONFIG = SimpleNamespace(genome_config=SimpleNamespace(input_keys=[-1, -2], output_keys=[0, 1]))
+
+    @staticmethod
+    def create_genome():
+        # 5 is useful, 7 is only reached from the inputs and 9 has no connections
+        connections = [
+            ((-1, 5), 0.5, True), ((-2, 5), -1.0, True), ((5, 0), 2.0, True), ((-2, 1), 1.5, False),
+            ((5, 1), -0.5, True), ((-1, 7), 1.0, True),
+        ]
+        return SimpleNamespace(
+            key=1,
+            nodes={
+                node_id: SimpleNamespace(key=node_id, bias=0.0, response=1.0, activation="sigmoid",
+                                         aggregation="sum")
+                for node_id in [0, 1, 5, 7, 9]
+            },
+            connections={
+                key: SimpleNamespace(key=key, weight=weight, enabled=enabled) for key, weight, enabled in connections
+            }
+        )
+
+    def test_columns(self):
+        columns = genome_columns(config=SvgWriterTestCase.CONFIG, genome=self.create_genome())
+
+        # Assertions
+        self.assertEqual([[-1, -2], [5], [7, 9], [0, 1]], columns)
+
+    def test_draw(self):
+        svg = draw_net_svg(config=SvgWriterTestCase.CONFIG, genome=self.create_genome(),
+                           node_names={-1: "a<b", 0: "output"})
+        root = ElementTree.fromstring(svg)
+        lines = root.findall(SVG_NAMESPACE + "line")
+
+        # Assertions
+        self.assertEqual(2, len(root.findall(SVG_NAMESPACE + "rect")))
+        self.assertEqual(5, len(root.findall(SVG_NAMESPACE + "circle")))
+        self.assertEqual(6, len(lines))
+        self.assertEqual(["green", "red", "green", "green", "red", "green"],
+                         list(map(lambda x: x.get("stroke"), lines)))
+        self.assertAlmostEqual(0.5, float(lines[2].get("stroke-width")))
+        self.assertEqual([None, None, None, "2,2", None, None],
+                         list(map(lambda x: x.get("stroke-dasharray"), lines)))
+        self.assertIn("a<b", list(map(lambda x: x.text, root.findall(SVG_NAMESPACE + "text"))))
+
+        # Nodes of the same column are aligned, columns go from the inputs to the outputs
+        x_values = dict(map(lambda x: (x.text, float(x.get("x"))), root.findall(SVG_NAMESPACE + "text")))
+        self.assertEqual(x_values["a<b"], x_values["-2"])
+        self.assertEqual(x_values["7"], x_values["9"])
+        self.assertEqual(x_values["output"], x_values["1"])
+        self.assertLess(x_values["-2"], x_values["5"])
+        self.assertLess(x_values["5"], x_values["7"])
+        self.assertLess(x_values["7"], x_values["1"])
+
+    def test_hide_disabled(self):
+        svg = draw_net_svg(config=SvgWriterTestCase.CONFIG, genome=self.create_genome(), show_disabled=False)
+        lines = ElementTree.fromstring(svg).findall(SVG_NAMESPACE + "line")
+
+        # Assertions
+        self.assertEqual(5, len(lines))
+        self.assertTrue(all(map(lambda x: x.get("stroke-dasharray") is None, lines)))
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            svg = draw_net_svg(config=SvgWriterTestCase.CONFIG, genome=self.create_genome(),
+                               filename=join(directory, "genome"))
+
+            # Same file draw_net renders
+            with open(join(directory, "genome.svg")) as svg_file:
+                self.assertEqual(svg, svg_file.read())
+
+            # Background rendering
+            with RenderWorker(render_function=render_snapshot_svg) as render_worker:
+                render_worker.submit(genome=self.create_genome(), config=SvgWriterTestCase.CONFIG,
+                                     filename=join(directory, "background"), show_disabled=True)
+                self.assertTrue(render_worker.flush(timeout=30.0))
+
+            self.assertEqual(1, render_worker.rendered)
+            self.assertTrue(exists(join(directory, "background.svg")))
+
+            # Rendered under a temporary name, only the complete drawing is left
+            render_genome(config=SvgWriterTestCase.CONFIG, genome=self.create_genome(),
+                          filename=join(directory, "rendered"), native_svg=True)
+            self.assertEqual(["background.svg", "genome.svg", "rendered.svg"], sorted(listdir(directory)))
+
+
+if __name__ == '__main__':
+    unittest.main()
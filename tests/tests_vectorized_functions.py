@@ -0,0 +1,81 @@
+# Functions
+from neat_python_utility.neat_utility.vectorized_functions import ACTIVATION_FUNCTIONS, AGGREGATION_FUNCTIONS, \
+    get_activation_function, get_aggregation_function, register_config_functions
+
+# AI
+from neat.activations import ActivationFunctionSet
+from neat.aggregations import AggregationFunctionSet
+
+# Utils
+from types import SimpleNamespace
+import numpy as np
+
+# Testing
+import unittest
+
+
+class VectorizedFunctionsTestCase(unittest.TestCase):
+    def test_activation_functions(self):
+        neat_functions = ActivationFunctionSet().functions
+        values = np.concatenate([np.linspace(-20.0, 20.0, 401), [0.0, 1e-9, -1e-9, 100.0, -100.0]])
+
+        # Every neat-python activation function has a vectorized version
+        self.assertTrue(set(neat_functions).issubset(ACTIVATION_FUNCTIONS))
+
+        for name, neat_function in neat_functions.items():
+            # Test
+            with np.errstate(over='ignore'):
+                vectorized_values = get_activation_function(name)(values)
+
+            # Assertions
+            expected_values = np.array(list(map(neat_function, values.tolist())))
+            self.assertTrue(np.allclose(expected_values, vectorized_values, equal_nan=True), name)
+
+    def test_aggregation_functions(self):
+        neat_functions = AggregationFunctionSet().functions
+        random_generator = np.random.default_rng(seed=3)
+        weighted_inputs = random_generator.normal(size=[6, 5, 7])
+        mask = random_generator.uniform(size=[6, 5, 7]) < 0.6
+        mask[0, 0, :] = False
+
+        # Every neat-python aggregation function has a vectorized version
+        self.assertTrue(set(neat_functions).issubset(AGGREGATION_FUNCTIONS))
+
+        for name, neat_function in neat_functions.items():
+            # Test
+            vectorized_values = get_aggregation_function(name)(weighted_inputs, mask)
+
+            # Assertions
+            expected_values = np.empty(weighted_inputs.shape[:-1])
+            for index in np.ndindex(expected_values.shape):
+                expected_values[index] = neat_function(list(weighted_inputs[index][mask[index]]))
+            self.assertTrue(np.allclose(expected_values, vectorized_values), name)
+
+    def test_config_functions(self):
+        # Configuration with user defined functions
+        activation_function_set = ActivationFunctionSet()
+        activation_function_set.add("test_double", lambda z: 2.0 * z)
+        aggregation_function_set = AggregationFunctionSet()
+        aggregation_function_set.add("test_count", lambda x: float(len(x)))
+        config = SimpleNamespace(
+            genome_config=SimpleNamespace(
+                activation_defs=activation_function_set, aggregation_function_defs=aggregation_function_set
+            )
+        )
+
+        # Test
+        register_config_functions(config=config)
+
+        # Assertions
+        self.assertEqual([2.0, -4.0], get_activation_function("test_double")(np.array([1.0, -2.0])).tolist())
+        self.assertEqual(
+            [2.0, 0.0],
+            get_aggregation_function("test_count")(
+                np.ones([2, 3]), np.array([[True, False, True], [False, False, False]])
+            ).tolist()
+        )
+        self.assertRaises(ValueError, get_activation_function, "test_unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+# Models
+from neat_python_utility.neat_utility.models.genome_analyzer import GenomeAnalyzer
+from neat_python_utility.neat_utility.models.connection import GenomeConnection
+from neat_python_utility.neat_utility.models.node import GenomeNode
+from neat_python_utility.neat_utility.genome_compiler import analyze_genome, refresh_genome
+from neat_python_utility.tests.utils.tests_constants import TestCases
+
+# Utils
+from types import SimpleNamespace
+import numpy as np
+
+# Testing
+import unittest
+
+
+class WeightsRefreshTestCase(unittest.TestCase):
+    TEST_CASES = [
+        TestCases.SIMPLE_NN, TestCases.ABANDONED_NODES_ONE_NN, TestCases.ABANDONED_NODES_TWO_NN,
+        TestCases.ABANDONED_NODES_THREE_NN, TestCases.WEIRD_TOPOLOGY_ONE_NN, TestCases.WEIRD_TOPOLOGY_TWO_NN,
+        TestCases.WEIRD_TOPOLOGY_THREE_NN, TestCases.WEIRD_TOPOLOGY_FOUR_NN, TestCases.ASYMMETRIC_TOPOLOGY_ONE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_TWO_NN, TestCases.ASYMMETRIC_TOPOLOGY_THREE_NN,
+        TestCases.ASYMMETRIC_TOPOLOGY_FOUR_NN,
+    ]
+
+    @staticmethod
+    def analyze(test_case, connections, nodes):
+        genome_analyzer = GenomeAnalyzer(
+            id_inputs=test_case.id_inputs, id_outputs=test_case.id_outputs, connections=connections, nodes=nodes
+        )
+        genome_analyzer.filter_useful_connections()
+        genome_analyzer.construct_layers()
+        genome_analyzer.construct_sparse_matrices()
+        genome_analyzer.construct_matrices()
+
+        return genome_analyzer
+
+    @staticmethod
+    def mutate(test_case, random_generator, toggle_connections):
+        # Same structure, with other weights, biases and functions
+        connections = list(
+            map(
+                lambda x: GenomeConnection(
+                    identification_number=x.identification_number,
+                    enabled=(not x.enabled) if toggle_connections and random_generator.random() < 0.3 else x.enabled,
+                    weight=random_generator.uniform(-2.0, 2.0)
+                ),
+                test_case.connections
+            )
+        )
+        nodes = list(
+            map(
+                lambda x: GenomeNode(
+                    node_id=x.node_id, bias=random_generator.uniform(-1.0, 1.0),
+                    activation_function=random_generator.choice(["sigmoid", "relu", "tanh"]),
+                    aggregation_function=random_generator.choice(["sum", "max"]),
+                    response=random_generator.uniform(0.5, 1.5)
+                ),
+                test_case.nodes
+            )
+        )
+
+        return connections, nodes
+
+    def assert_same_matrices(self, expected_genome_analyzer, genome_analyzer):
+        for expected_weights, weights in zip(expected_genome_analyzer.weights_arrays, genome_analyzer.weights_arrays):
+            self.assertTrue(np.array_equal(expected_weights, weights))
+        for expected_masks, masks in zip(
+                expected_genome_analyzer.connection_masks_arrays, genome_analyzer.connection_masks_arrays):
+            self.assertTrue(np.array_equal(expected_masks, masks))
+        for expected_sparse_weights, sparse_weights in zip(
+                expected_genome_analyzer.sparse_weights_arrays, genome_analyzer.sparse_weights_arrays):
+            for expected_array, array in zip(expected_sparse_weights, sparse_weights):
+                self.assertTrue(np.array_equal(expected_array, array))
+        for expected_biases, biases in zip(expected_genome_analyzer.biases_arrays, genome_analyzer.biases_arrays):
+            self.assertTrue(np.array_equal(expected_biases, biases))
+        for expected_responses, responses in zip(
+                expected_genome_analyzer.responses_arrays, genome_analyzer.responses_arrays):
+            self.assertTrue(np.array_equal(expected_responses, responses))
+
+        self.assertEqual(expected_genome_analyzer.weights_matrix, genome_analyzer.weights_matrix)
+        self.assertEqual(expected_genome_analyzer.biases_matrix, genome_analyzer.biases_matrix)
+        self.assertEqual(expected_genome_analyzer.responses_matrix, genome_analyzer.responses_matrix)
+        self.assertEqual(
+            expected_genome_analyzer.activation_functions_matrix, genome_analyzer.activation_functions_matrix
+        )
+        self.assertEqual(
+            expected_genome_analyzer.aggregation_functions_matrix, genome_analyzer.aggregation_functions_matrix
+        )
+
+    def run_test(self, toggle_connections):
+        random_generator = np.random.default_rng(seed=41)
+        for test_case in WeightsRefreshTestCase.TEST_CASES:
+            genome_analyzer = WeightsRefreshTestCase.analyze(
+                test_case=test_case, connections=test_case.connections, nodes=test_case.nodes
+            )
+            weights_arrays = list(genome_analyzer.weights_arrays)
+            biases_arrays = list(genome_analyzer.biases_arrays)
+
+            for _ in range(3):
+                # Test
+                connections, nodes = WeightsRefreshTestCase.mutate(
+                    test_case=test_case, random_generator=random_generator, toggle_connections=toggle_connections
+                )
+                genome_analyzer.refresh_weights(connections=list(reversed(connections)), nodes=nodes)
+
+                # Assertions
+                self.assert_same_matrices(
+                    expected_genome_analyzer=WeightsRefreshTestCase.analyze(
+                        test_case=test_case, connections=connections, nodes=nodes
+                    ),
+                    genome_analyzer=genome_analyzer
+                )
+
+            # Assertions: The arrays are filled up in place
+            self.assertTrue(all(map(lambda x: x[0] is x[1], zip(weights_arrays, genome_analyzer.weights_arrays))))
+            self.assertTrue(all(map(lambda x: x[0] is x[1], zip(biases_arrays, genome_analyzer.biases_arrays))))
+
+    def test_refresh_weights(self):
+        self.run_test(toggle_connections=False)
+
+    def test_refresh_enabled_connections(self):
+        self.run_test(toggle_connections=True)
+
+    def test_different_structure(self):
+        test_case = TestCases.WEIRD_TOPOLOGY_FOUR_NN
+        genome_analyzer = WeightsRefreshTestCase.analyze(
+            test_case=test_case, connections=test_case.connections, nodes=test_case.nodes
+        )
+
+        # Assertions
+        with self.assertRaises(AssertionError):
+            genome_analyzer.refresh_weights(connections=test_case.connections[1:], nodes=test_case.nodes)
+
+    def test_refresh_genome(self):
+        test_case = TestCases.ASYMMETRIC_TOPOLOGY_FOUR_NN
+        config = SimpleNamespace(
+            genome_config=SimpleNamespace(input_keys=test_case.id_inputs, output_keys=test_case.id_outputs)
+        )
+
+        def create_genome(weight_scale):
+            return SimpleNamespace(
+                nodes={
+                    node.node_id: SimpleNamespace(
+                        key=node.node_id, bias=node.bias, activation=node.activation_function, aggregation="sum",
+                        response=1.0
+                    ) for node in test_case.nodes
+                },
+                connections={
+                    connection.identification_number: SimpleNamespace(
+                        key=connection.identification_number, enabled=connection.enabled,
+                        weight=connection.weight * weight_scale
+                    ) for connection in test_case.connections
+                }
+            )
+
+        # Test
+        genome_analyzer = analyze_genome(genome=create_genome(weight_scale=1.0), config=config)
+        refresh_genome(genome_analyzer=genome_analyzer, genome=create_genome(weight_scale=-3.0), config=config)
+        expected_genome_analyzer = analyze_genome(genome=create_genome(weight_scale=-3.0), config=config)
+
+        # Assertions
+        for expected_weights, weights in zip(expected_genome_analyzer.weights_arrays, genome_analyzer.weights_arrays):
+            self.assertTrue(np.array_equal(expected_weights, weights))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import neat
+
+from os.path import dirname, join
+import random
+
+
+CONFIG_FILE = join(dirname(dirname(dirname(__file__))), 'example', 'artificial_intelligence', 'config-feedforward.txt')
+XOR_CASES = [((0.0, 0.0), 0.0), ((0.0, 1.0), 1.0), ((1.0, 0.0), 1.0), ((1.0, 1.0), 0.0)]
+
+
+def evolved_genomes(generations=10, pop_size=60, seed=3):
+    '''
+        Every genome evaluated while evolving a population on XOR with the example configuration. Evolved genomes have
+        the topologies the hand-made test cases miss, such as nodes whose incoming connections were deleted.
+
+        Returns config, [<Genome>]
+    '''
+    random.seed(seed)
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                         neat.DefaultStagnation, CONFIG_FILE)
+    config.pop_size = pop_size
+
+    genomes = {}
+
+    def evaluate_genomes(population_genomes, config):
+        for genome_id, genome in population_genomes:
+            network = neat.nn.FeedForwardNetwork.create(genome, config)
+            genome.fitness = 4.0 - sum(map(lambda x: (network.activate(x[0])[0] - x[1]) ** 2, XOR_CASES))
+            genomes[genome_id] = genome
+
+    neat.Population(config).run(evaluate_genomes, generations)
+
+    return config, list(genomes.values())